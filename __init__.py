@@ -34,6 +34,7 @@ from sverchok_open3d import settings
 from sverchok_open3d import sockets
 from sverchok_open3d.nodes_index import nodes_index
 from sverchok_open3d.utils import show_welcome
+from sverchok_open3d.utils import profiling
 
 DOCS_LINK = 'https://github.com/vicdoval/sverchok-open3d/tree/master/utils'
 MODULE_NAME = 'open3d'
@@ -129,6 +130,7 @@ def register():
     sv_logger.debug("Registering sverchok-open3d")
 
     add_node_menu.register()
+    profiling.register()
     settings.register()
     icons.register()
     sockets.register()
@@ -152,4 +154,5 @@ def unregister():
     sockets.unregister()
     icons.unregister()
     settings.unregister()
+    profiling.unregister()
     #add_node_menu.unregister() - do not unregister!!! See sverchok\ui\nodeview_space_menu.py module's comments 
@@ -0,0 +1,183 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from core.triangle_mesh import VertexFaceIncidence, calc_vertex_normals, face_normals, face_centers, calc_tris_areas
+from core.topology import MeshTopology, unique_edges
+from core.attributes import spread_face_attrib
+from core.poke import poke_triangles, poke_triangles_batch, poke_triangles_iterative
+from core.transform import vector_transform, number_transform
+from core.join import join_triangle_meshes
+from core.mask import remove_triangles_by_mask, remove_vertices_by_mask, MaskEngine
+from core.streaming import VoxelAccumulator
+from core.spatial_index import SpatialIndex, cKDTree, point_statistics
+from core.lod import PointPyramid, select_points
+from core.separate import split_by_cluster
+from core.instancing import expand_instances
+
+from meshes import grid_mesh
+
+
+def test_vertex_normals(benchmark, mesh):
+    _, v_normals = benchmark(calc_vertex_normals, mesh['vertices'], mesh['triangles'])
+    assert v_normals.shape == mesh['vertices'].shape
+
+@pytest.mark.parametrize('weighting', ['NONE', 'AREA', 'ANGLE'])
+def test_vertex_normals_reused_incidence(benchmark, mesh, weighting):
+    incidence = VertexFaceIncidence(mesh['triangles'], len(mesh['vertices']))
+    out = np.empty_like(mesh['vertices'])
+    benchmark(calc_vertex_normals, mesh['vertices'], mesh['triangles'], incidence=incidence, weighting=weighting, out=out)
+    assert np.allclose(np.linalg.norm(out, axis=1), 1)
+
+def test_vertex_normals_float32(benchmark, mesh):
+    verts = mesh['vertices'].astype(np.float32)
+    incidence = VertexFaceIncidence(mesh['triangles'], len(verts))
+    out = np.empty_like(verts)
+    benchmark(calc_vertex_normals, verts, mesh['triangles'], incidence=incidence, out=out)
+    assert out.dtype == np.float32
+
+def test_face_normals(benchmark, mesh):
+    result = benchmark(face_normals, mesh['vertices'], mesh['triangles'])
+    assert len(result) == len(mesh['triangles'])
+
+def test_face_centers(benchmark, mesh):
+    result = benchmark(face_centers, mesh['vertices'], mesh['triangles'])
+    assert len(result) == len(mesh['triangles'])
+
+def test_face_areas(benchmark, mesh):
+    result = benchmark(lambda: calc_tris_areas(mesh['vertices'][mesh['triangles']]))
+    assert len(result) == len(mesh['triangles'])
+
+def test_unique_edges(benchmark, mesh):
+    edges = benchmark(unique_edges, mesh['triangles'], len(mesh['vertices']))
+    # Euler characteristic of a grid (a disk)
+    assert len(mesh['vertices']) - len(edges) + len(mesh['triangles']) == 1
+
+def test_topology_build(benchmark, mesh):
+    def build():
+        topology = MeshTopology(mesh['triangles'], len(mesh['vertices']))
+        return topology.one_ring, topology.boundary_verts
+    benchmark(build)
+
+def test_poke(benchmark, mesh):
+    mask = np.arange(len(mesh['triangles'])) % 2 == 0
+    arrays, new_vecs, _, _ = benchmark(poke_triangles, mesh, mask, [0.1], [], [])
+    assert len(arrays['triangles']) == len(mesh['triangles']) + 2 * len(new_vecs)
+
+@pytest.mark.parametrize('batch', [False, True], ids=['loop', 'batch'])
+def test_poke_many_meshes(benchmark, batch):
+    # 500 small meshes, the batch runs them in one pass
+    meshes = [grid_mesh(200) for _ in range(500)]
+    items = [(m, [1, 0], [0.1], [], []) for m in meshes]
+    if batch:
+        results = benchmark(poke_triangles_batch, items)
+    else:
+        results = benchmark(lambda: [poke_triangles(*item) for item in items])
+    assert len(results) == len(meshes)
+
+def test_poke_iterative(benchmark, mesh):
+    # 3 iterations over 1/9 of the faces, about the faces of one poke of the whole mesh
+    mask = np.arange(len(mesh['triangles'])) % 9 == 0
+    arrays, _, _, new_faces_idx = benchmark(poke_triangles_iterative, mesh, mask, [0.1], [], [], 3)
+    assert len(new_faces_idx) == 27 * np.count_nonzero(mask)
+
+def test_spread_face_attrib(benchmark, mesh):
+    arrays = dict(mesh, triangle_normals=face_normals(mesh['vertices'], mesh['triangles']))
+    mask = np.arange(len(mesh['triangles'])) % 2 == 0
+    benchmark(lambda: spread_face_attrib(dict(arrays), mask, 'triangle_normals', 3))
+
+def test_matrix_transform(benchmark, mesh):
+    matrix = np.eye(4)
+    matrix[:3, 3] = [1, 2, 3]
+    verts = mesh['vertices'].copy()
+    benchmark(vector_transform, verts, matrix, 'MATRIX', 1, [1.0])
+
+def test_number_transform(benchmark, mesh):
+    topology = MeshTopology(mesh['triangles'], len(mesh['vertices']))
+    verts = mesh['vertices'].copy()
+    benchmark(number_transform, topology, [0.001], verts, [], False, 5, [1.0])
+
+def test_join(benchmark, mesh):
+    joined = benchmark(join_triangle_meshes, [mesh] * 4, compute_vertex_normals=True)
+    assert len(joined['triangles']) == 4 * len(mesh['triangles'])
+
+def test_join_instances(benchmark):
+    # 10k moved copies of a small mesh sharing its triangles buffer
+    small = grid_mesh(100)
+    meshes = [{'vertices': small['vertices'] + i, 'triangles': small['triangles']} for i in range(10000)]
+    joined = benchmark(join_triangle_meshes, meshes)
+    assert len(joined['triangles']) == 10000 * len(small['triangles'])
+
+def test_expand_instances(benchmark):
+    # what joining 10k instances costs, built only when a node needs flat buffers
+    small = grid_mesh(100)
+    matrices = np.tile(np.eye(4), (10000, 1, 1))
+    matrices[:, :3, 3] = np.arange(10000)[:, np.newaxis]
+    expanded = benchmark(expand_instances, small, matrices)
+    assert len(expanded['vertices']) == 10000 * len(small['vertices'])
+
+def test_remove_triangles_by_mask(benchmark, mesh):
+    full_mask = np.arange(len(mesh['triangles'])) % 3 == 0
+    result = benchmark(remove_triangles_by_mask, mesh, full_mask, True)
+    assert result['triangles'].max() < len(result['vertices'])
+
+def test_remove_vertices_by_mask(benchmark, mesh):
+    full_mask = np.arange(len(mesh['vertices'])) % 7 == 0
+    result = benchmark(remove_vertices_by_mask, mesh, full_mask)
+    assert len(result['vertices']) == np.count_nonzero(~full_mask)
+
+def test_split_by_cluster(benchmark, mesh):
+    # many small fragments, as shattered debris
+    clusters = np.arange(len(mesh['triangles'])) // 20
+    parts = benchmark(split_by_cluster, mesh, clusters)
+    assert sum(len(part['triangles']) for part in parts) == len(mesh['triangles'])
+
+def test_mask_engine_single_vertex(benchmark, mesh):
+    # dragging the index slider: one vertex removed, a new mask on every update
+    engine = MaskEngine(mesh['triangles'], len(mesh['vertices']))
+    masks = [np.arange(len(mesh['vertices'])) == i for i in range(2)]
+    def update():
+        masks.reverse()
+        return engine.gather(mesh, *engine.view('VERTS', masks[0]))
+    result = benchmark(update)
+    assert len(result['vertices']) == len(mesh['vertices']) - 1
+
+@pytest.mark.skipif(cKDTree is None, reason='needs SciPy')
+def test_spatial_index_build(benchmark, mesh):
+    index = benchmark(SpatialIndex, mesh['vertices'])
+    assert len(index) == len(mesh['vertices'])
+
+@pytest.mark.skipif(cKDTree is None, reason='needs SciPy')
+def test_spatial_index_nearest_distance(benchmark, mesh):
+    index = SpatialIndex(mesh['vertices'])
+    distances = benchmark(index.nearest_neighbor_distance)
+    assert np.all(distances > 0)
+
+@pytest.mark.skipif(cKDTree is None, reason='needs SciPy')
+def test_point_statistics(benchmark, mesh):
+    index = SpatialIndex(mesh['vertices'])
+    _, _, _, density, _ = benchmark(point_statistics, index)
+    assert len(density) == len(mesh['vertices'])
+
+def test_voxel_accumulator(benchmark, mesh):
+    # the points come in 4 chunks, as read from a stream
+    chunks = np.array_split(mesh['vertices'], 4)
+    def accumulate():
+        accumulator = VoxelAccumulator(0.05)
+        for chunk in chunks:
+            accumulator.add({'points': chunk})
+        return accumulator.result()
+    result = benchmark(accumulate)
+    assert 0 < len(result['points']) <= len(mesh['vertices'])
+
+def test_lod_pyramid_build(benchmark, mesh):
+    pyramid = benchmark(PointPyramid, {'points': mesh['vertices']}, 10)
+    assert pyramid.levels[-1]['counts'].sum() == len(mesh['vertices'])
+
+def test_lod_select(benchmark, mesh):
+    pyramid = PointPyramid({'points': mesh['vertices']}, 10)
+    budget = len(mesh['vertices']) // 10
+    eye = mesh['vertices'][0]
+    arrays, levels = benchmark(select_points, pyramid, budget, eye)
+    assert 0 < len(arrays['points']) <= budget
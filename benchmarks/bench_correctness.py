@@ -0,0 +1,469 @@
+import numpy as np
+import pytest
+
+from core.transform import vector_transform
+from core.join import join_triangle_meshes
+from core.instancing import expand_instances
+from core.triangle_mesh import VertexFaceIncidence, calc_vertex_normals, face_normals
+from core.poke import poke_triangles, poke_triangles_batch, poke_triangles_iterative
+from core.mask import remove_triangles_by_mask, remove_vertices_by_mask, MaskEngine
+from core.separate import split_by_cluster
+from core.spatial_index import SpatialIndex, cKDTree
+from core.lod import PointPyramid, select_points
+from core.array_store import save_arrays, load_arrays
+from core.native_format import write_native, read_native
+from core.streaming import StreamedPoints, VoxelAccumulator, read_tiles, read_whole, voxel_average, voxel_origin
+from core.open3d_ops import o3d, geometry_from_arrays, smooth_triangle_mesh
+
+from meshes import grid_mesh
+
+# Value checks of the core kernels, the benchmarks only check the shapes.
+# Run without timing: pytest benchmarks --benchmark-disable
+
+requires_open3d = pytest.mark.skipif(o3d is None, reason='Open3D is not available')
+
+def read_only(arrays):
+    '''Attributes as the read-only views the geometry handles share'''
+    views = {}
+    for name, arr in arrays.items():
+        views[name] = arr.view()
+        views[name].flags.writeable = False
+    return views
+
+def write_ply_points(path, points, colors):
+    '''Binary PLY with float xyz and uchar rgb vertices'''
+    records = np.zeros(len(points), dtype=[('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+                                           ('red', 'u1'), ('green', 'u1'), ('blue', 'u1')])
+    for i, field in enumerate('xyz'):
+        records[field] = points[:, i]
+    for i, field in enumerate(['red', 'green', 'blue']):
+        records[field] = colors[:, i]
+    header = ('ply\nformat binary_little_endian 1.0\n'
+              f'element vertex {len(points)}\n'
+              'property float x\nproperty float y\nproperty float z\n'
+              'property uchar red\nproperty uchar green\nproperty uchar blue\nend_header\n')
+    with open(path, 'wb') as f:
+        f.write(header.encode('ascii'))
+        records.tofile(f)
+    return records
+
+def sorted_rows(arrays):
+    '''Attributes sorted by point, to compare voxels listed in another order'''
+    order = np.lexsort(arrays['points'].T)
+    return {name: arr[order] for name, arr in arrays.items()}
+
+
+@requires_open3d
+def test_open3d_from_read_only_arrays():
+    mesh = read_only(grid_mesh(200))
+    matrix = np.eye(4)
+    matrix[:3, 3] = [1, 2, 3]
+    # the transform writes a copy of the vertices, the triangles stay shared
+    moved = dict(mesh, vertices=vector_transform(mesh['vertices'].copy(), matrix, 'MATRIX', 1, [1.0]))
+    geometry = geometry_from_arrays('TriangleMesh', moved)
+    assert np.allclose(np.asarray(geometry.vertices), mesh['vertices'] + [1, 2, 3])
+    assert np.array_equal(np.asarray(geometry.triangles), mesh['triangles'])
+    smoothed = smooth_triangle_mesh(geometry, 'simple', 1)
+    assert isinstance(smoothed, o3d.geometry.TriangleMesh)
+    assert len(smoothed.vertices) == len(mesh['vertices'])
+
+@requires_open3d
+@pytest.mark.parametrize('kind, extension', [('TriangleMesh', '.ply'), ('TriangleMesh', '.off'), ('PointCloud', '.ply')])
+def test_export_read_only_arrays(tmp_path, kind, extension):
+    from core.open3d_ops import write_geometry, read_geometry, geometry_to_arrays
+
+    mesh = grid_mesh(200)
+    if kind == 'PointCloud':
+        arrays = read_only({'points': mesh['vertices'], 'colors': np.abs(mesh['vertices'])})
+    else:
+        arrays = read_only(mesh)
+    path = str(tmp_path / f'geometry{extension}')
+    write_geometry(path, kind, arrays, write_ascii=True)
+    geometry, _ = read_geometry(path, 'point_cloud' if kind == 'PointCloud' else 'triangle_mesh')
+    read_kind, read_arrays = geometry_to_arrays(geometry)
+    assert read_kind == kind
+    for name, arr in arrays.items():
+        # colors are written as 8 bit values
+        assert np.allclose(read_arrays[name], arr, atol=1 / 255 if name == 'colors' else 1e-5), name
+
+@pytest.mark.parametrize('layout', ['no_triangles', 'mixed', 'instances', 'empty_triangles'])
+def test_join_without_triangles(layout):
+    mesh = grid_mesh(50)
+    points = {'vertices': mesh['vertices']}
+    empty = {'vertices': mesh['vertices'], 'triangles': np.empty((0, 3), dtype=np.int32)}
+    meshes = {
+        'no_triangles': [points, points],
+        'mixed': [points, mesh, points, mesh],
+        'instances': [empty] * 3,
+        'empty_triangles': [empty, mesh],
+    }[layout]
+    joined = join_triangle_meshes(meshes, compute_vertex_normals=True, compute_faces_normals=True)
+    assert np.array_equal(joined['vertices'], np.concatenate([arrays['vertices'] for arrays in meshes]))
+    offsets = np.cumsum([0] + [len(arrays['vertices']) for arrays in meshes])
+    expected = [arrays['triangles'] + offset for arrays, offset in zip(meshes, offsets) if 'triangles' in arrays]
+    expected = np.concatenate(expected) if expected else np.empty((0, 3))
+    assert joined['triangles'].dtype == np.int32
+    assert np.array_equal(joined['triangles'], expected.reshape(-1, 3))
+    assert len(joined['triangle_normals']) == len(joined['triangles'])
+    assert len(joined['vertex_normals']) == len(joined['vertices'])
+
+def test_expand_instances_without_triangles():
+    mesh = grid_mesh(50)
+    matrices = np.tile(np.eye(4), (3, 1, 1))
+    matrices[:, :3, 3] = np.arange(3)[:, np.newaxis]
+    for arrays in ({'vertices': mesh['vertices']},
+                   {'vertices': mesh['vertices'], 'triangles': np.empty((0, 3), dtype=np.int32)}):
+        expanded = expand_instances(arrays, matrices)
+        assert np.allclose(expanded['vertices'], np.concatenate([mesh['vertices'] + i for i in range(3)]))
+        assert len(expanded.get('triangles', ())) == 0
+
+@requires_open3d
+@pytest.mark.parametrize('source', ['disk_cache', 'native', 'native_compressed'])
+def test_open3d_from_imported_arrays(tmp_path, source):
+    from core.open3d_ops import write_geometry, read_geometry
+
+    mesh = grid_mesh(200)
+    if source == 'disk_cache':
+        save_arrays(str(tmp_path), 'key', 'TriangleMesh', mesh)
+        kind, arrays = load_arrays(str(tmp_path), 'key')
+    else:
+        path = str(tmp_path / 'mesh.svo3d')
+        write_native(path, 'TriangleMesh', mesh, compress=source == 'native_compressed')
+        kind, arrays = read_native(path)
+    assert kind == 'TriangleMesh'
+    assert not arrays['vertices'].flags.writeable
+
+    smoothed = smooth_triangle_mesh(geometry_from_arrays(kind, arrays), 'simple', 1)
+    assert len(smoothed.vertices) == len(mesh['vertices'])
+    path = str(tmp_path / 'export.ply')
+    write_geometry(path, kind, arrays)
+    geometry, _ = read_geometry(path, 'triangle_mesh')
+    assert np.allclose(np.asarray(geometry.vertices), mesh['vertices'])
+    assert np.array_equal(np.asarray(geometry.triangles), mesh['triangles'])
+
+@pytest.mark.parametrize('method', ['NONE', 'UNIFORM'])
+def test_read_tiles(tmp_path, method):
+    rng = np.random.default_rng(0)
+    points = rng.random((20000, 3)) * [40, 20, 1]
+    points[::97, 0] = np.nan
+    points[::89, 2] = np.inf
+    colors = rng.integers(0, 256, (len(points), 3))
+    path = str(tmp_path / 'points.ply')
+    records = write_ply_points(path, points, colors)
+    stream = StreamedPoints(path)
+    indices = [0, 7, 3, 7, 10000, -1]
+    tiles = read_tiles(stream, indices, 5.0, 3000, method=method, every_nth=3)
+
+    # tiles of every point computed at once, in file order
+    xyz = np.stack([records['x'], records['y'], records['z']], axis=1).astype(np.float64)
+    finite = np.isfinite(xyz).all(axis=1)
+    origin = np.nanmin(xyz[:, :2], axis=0)
+    tiles_x, tiles_y = np.ceil((np.nanmax(xyz[:, :2], axis=0) - origin) / 5.0).astype(int)
+    cells = np.floor((np.nan_to_num(xyz[:, :2]) - origin) / 5.0).astype(int)
+    cells = np.minimum(cells, [tiles_x - 1, tiles_y - 1])
+    point_tile = np.where(np.isfinite(xyz[:, :2]).all(axis=1), cells[:, 0] + cells[:, 1] * tiles_x, -1)
+    if method == 'UNIFORM':
+        point_tile[np.arange(len(xyz)) % 3 != 0] = -1
+    for index, arrays in zip(indices, tiles):
+        keep = (point_tile == index) & finite & (index >= 0)
+        if not keep.any():
+            assert arrays == {}
+            continue
+        assert np.array_equal(arrays['points'], xyz[keep])
+        assert np.allclose(arrays['colors'], colors[keep] / 255)
+
+def voxel_cloud(count=50000):
+    rng = np.random.default_rng(1)
+    return {
+        'points': rng.random((count, 3)) * [5, 5, 1] + 0.013,
+        'colors': rng.random((count, 3)),
+        'normals': rng.normal(size=(count, 3)),
+    }
+
+def test_voxel_accumulator_chunks():
+    # the chunks of a stream average to the voxels of the whole cloud, voxels numbered by chunk
+    arrays = voxel_cloud()
+    accumulator = VoxelAccumulator(0.1, voxel_origin(arrays['points'].min(axis=0), 0.1))
+    voxels = np.concatenate([accumulator.add({name: arr[start:start + 7000] for name, arr in arrays.items()})
+                             for start in range(0, len(arrays['points']), 7000)])
+    result = accumulator.result()
+    expected = voxel_average(arrays, 0.1)
+    assert len(accumulator) == len(expected['points'])
+    got, expected = sorted_rows(result), sorted_rows(expected)
+    for name in arrays:
+        assert np.allclose(got[name], expected[name]), name
+    counts = np.bincount(voxels)
+    assert np.allclose(np.bincount(voxels, weights=arrays['points'][:, 0]) / counts, result['points'][:, 0])
+    first_chunk = np.unique(voxels, return_index=True)[1] // 7000
+    assert np.all(np.diff(first_chunk) >= 0)
+
+@requires_open3d
+def test_voxel_average_as_open3d(tmp_path):
+    arrays = voxel_cloud()
+    cloud = geometry_from_arrays('PointCloud', arrays)
+    expected = sorted_rows({name: np.asarray(getattr(cloud.voxel_down_sample(0.1), name)) for name in arrays})
+    for got in (voxel_average(arrays, 0.1), None):
+        if got is None:
+            # the whole file streamed through the accumulator
+            path = str(tmp_path / 'points.ply')
+            write_ply_points(path, arrays['points'], np.zeros((len(arrays['points']), 3)))
+            got, _ = read_whole(StreamedPoints(path), 7000, method='VOXEL', voxel_size=0.1)
+            points = StreamedPoints(path).read(0, len(arrays['points']))['points']
+            expected = {'points': np.asarray(geometry_from_arrays('PointCloud', {'points': points}).voxel_down_sample(0.1).points)}
+            expected = sorted_rows(expected)
+        got = sorted_rows(got)
+        assert len(got['points']) == len(expected['points'])
+        for name in expected:
+            assert np.allclose(got[name], expected[name]), name
+
+def mesh_with_attributes(triangle_count):
+    '''Grid with vertex colors, material ids and uvs'''
+    mesh = grid_mesh(triangle_count)
+    rng = np.random.default_rng(2)
+    mesh['vertex_colors'] = rng.random(mesh['vertices'].shape)
+    mesh['triangle_material_ids'] = rng.integers(0, 4, len(mesh['triangles'])).astype(np.int32)
+    mesh['triangle_uvs'] = mesh['vertices'][mesh['triangles']][:, :, :2].reshape(-1, 2)
+    return mesh
+
+def reference_poke(arrays, mask, offset, relative_offset=False):
+    '''The poke of the Triangle Mesh Poke node before the vectorized kernel, one mesh at a time'''
+    verts, tris = arrays['vertices'], arrays['triangles']
+    v_pols = verts[tris[mask]]
+    normals = np.cross(v_pols[:, 1] - v_pols[:, 0], v_pols[:, 2] - v_pols[:, 0])
+    if relative_offset:
+        # calc_tris_areas of the node gives half of the triangle area
+        offset = offset * np.linalg.norm(normals, axis=1) / 4
+    normals /= np.linalg.norm(normals, axis=1)[:, np.newaxis]
+    new_vecs = v_pols.mean(axis=1) + normals * np.reshape(offset, (-1, 1))
+    new_faces = np.zeros((len(new_vecs), 3, 3), dtype=np.int32)
+    new_faces[:, :, 0] = tris[mask]
+    new_faces[:, :, 1] = np.roll(tris[mask], -1, axis=1)
+    new_faces[:, :, 2] = (np.arange(len(new_vecs)) + len(verts))[:, np.newaxis]
+    poked = {
+        'vertices': np.concatenate([verts, new_vecs]),
+        'triangles': np.concatenate([tris[~mask], new_faces.reshape(-1, 3)]),
+        'vertex_colors': np.concatenate([arrays['vertex_colors'], arrays['vertex_colors'][tris[mask]].mean(axis=1)]),
+        'triangle_material_ids': np.concatenate([arrays['triangle_material_ids'][~mask],
+                                                 np.repeat(arrays['triangle_material_ids'][mask], 3)]),
+    }
+    uvs = arrays['triangle_uvs'].reshape(-1, 3, 2)
+    new_uvs = np.stack([uvs[mask], np.roll(uvs[mask], -1, axis=1),
+                        np.repeat(uvs[mask].mean(axis=1)[:, np.newaxis], 3, axis=1)], axis=2)
+    poked['triangle_uvs'] = np.concatenate([uvs[~mask].reshape(-1, 2), new_uvs.reshape(-1, 2)])
+    return poked
+
+def assert_same_arrays(got, expected):
+    assert got.keys() >= expected.keys()
+    for name, arr in expected.items():
+        assert np.shape(got[name]) == np.shape(arr), name
+        assert np.allclose(got[name], arr), name
+
+@pytest.mark.parametrize('relative_offset', [False, True])
+def test_poke_as_reference(relative_offset):
+    meshes = [mesh_with_attributes(count) for count in (200, 50, 200)]
+    rng = np.random.default_rng(3)
+    masks = [rng.random(len(mesh['triangles'])) > 0.4 for mesh in meshes]
+    offsets = [rng.random(np.count_nonzero(mask)) for mask in masks]
+    items = [(mesh, mask, offset, [], []) for mesh, mask, offset in zip(meshes, masks, offsets)]
+    results = poke_triangles_batch(items, relative_offset=relative_offset)
+    for mesh, mask, offset, (arrays, new_vecs, new_verts_idx, new_faces_idx) in zip(meshes, masks, offsets, results):
+        expected = reference_poke(mesh, mask, offset, relative_offset)
+        assert_same_arrays(arrays, expected)
+        assert np.allclose(new_vecs, expected['vertices'][len(mesh['vertices']):])
+        assert np.array_equal(new_verts_idx, np.arange(len(mesh['vertices']), len(expected['vertices'])))
+        assert np.array_equal(new_faces_idx, np.arange(np.count_nonzero(~mask), len(expected['triangles'])))
+        # the same poke one mesh at a time, with the face normals given
+        single = poke_triangles(mesh, mask, offset, [], [], relative_offset=relative_offset,
+                                all_face_normals=face_normals(mesh['vertices'], mesh['triangles']))
+        assert_same_arrays(single[0], expected)
+
+def test_poke_iterative_as_reference():
+    mesh = mesh_with_attributes(200)
+    mask = np.arange(len(mesh['triangles'])) % 3 == 0
+    offset = np.linspace(0.1, 0.5, np.count_nonzero(mask))
+    arrays, new_vecs, _, new_faces_idx = poke_triangles_iterative(mesh, mask, offset, [], [], 3)
+    # every iteration pokes the faces of the previous one, listed at the end
+    expected, level_mask, level_offset = mesh, mask, offset
+    for _ in range(3):
+        expected = reference_poke(expected, level_mask, level_offset)
+        poked_num = 3 * np.count_nonzero(level_mask)
+        level_mask = np.arange(len(expected['triangles'])) >= len(expected['triangles']) - poked_num
+        level_offset = np.repeat(level_offset, 3)
+    assert_same_arrays(arrays, expected)
+    assert np.allclose(new_vecs, expected['vertices'][len(mesh['vertices']):])
+    assert np.array_equal(new_faces_idx, np.flatnonzero(level_mask))
+
+def reference_mask(arrays, keep_tris, keep_verts):
+    '''Mesh of the kept triangles with all their vertices kept, vertices renumbered in order'''
+    keep_tris = keep_tris & keep_verts[arrays['triangles']].all(axis=1)
+    new_index = np.cumsum(keep_verts) - 1
+    result = {'vertices': arrays['vertices'][keep_verts],
+              'vertex_colors': arrays['vertex_colors'][keep_verts],
+              'triangles': new_index[arrays['triangles'][keep_tris]],
+              'triangle_material_ids': arrays['triangle_material_ids'][keep_tris]}
+    result['triangle_uvs'] = arrays['triangle_uvs'].reshape(-1, 3, 2)[keep_tris].reshape(-1, 2)
+    return result
+
+@pytest.mark.parametrize('method', ['TRIANGLES', 'TRIANGLES_UNREFERENCED', 'VERTS'])
+@pytest.mark.parametrize('removed', [0.05, 0.6])
+def test_mask_as_reference(method, removed):
+    mesh = mesh_with_attributes(2000)
+    rng = np.random.default_rng(4)
+    keep_verts = np.ones(len(mesh['vertices']), dtype=bool)
+    keep_tris = np.ones(len(mesh['triangles']), dtype=bool)
+    if method == 'VERTS':
+        keep_verts = rng.random(len(keep_verts)) > removed
+        full_mask = ~keep_verts
+    else:
+        keep_tris = rng.random(len(keep_tris)) > removed
+        full_mask = ~keep_tris
+        if method == 'TRIANGLES_UNREFERENCED':
+            keep_verts = np.zeros(len(keep_verts), dtype=bool)
+            keep_verts[mesh['triangles'][keep_tris]] = True
+    expected = reference_mask(mesh, keep_tris, keep_verts)
+
+    unreferenced = method == 'TRIANGLES_UNREFERENCED'
+    if method == 'VERTS':
+        assert_same_arrays(remove_vertices_by_mask(mesh, full_mask), expected)
+    else:
+        assert_same_arrays(remove_triangles_by_mask(mesh, full_mask, unreferenced), expected)
+    engine = MaskEngine(mesh['triangles'], len(mesh['vertices']))
+    view_method = 'VERTS' if method == 'VERTS' else 'TRIANGLES'
+    triangle_indices, vertex_indices = engine.view(view_method, full_mask, unreferenced)
+    assert np.array_equal(triangle_indices, np.flatnonzero(keep_tris & keep_verts[mesh['triangles']].all(axis=1)))
+    assert np.array_equal(vertex_indices, np.flatnonzero(keep_verts))
+    # the view is cached for the next update with the same mask
+    assert not triangle_indices.flags.writeable and not vertex_indices.flags.writeable
+    assert engine.view(view_method, full_mask, unreferenced)[0] is triangle_indices
+    assert_same_arrays(engine.gather(mesh, triangle_indices, vertex_indices), expected)
+
+@requires_open3d
+@pytest.mark.parametrize('method', ['TRIANGLES', 'VERTS'])
+def test_mask_as_open3d(method):
+    mesh = grid_mesh(2000)
+    mask = np.random.default_rng(5).random(len(mesh['triangles' if method == 'TRIANGLES' else 'vertices'])) > 0.7
+    geometry = geometry_from_arrays('TriangleMesh', mesh)
+    if method == 'TRIANGLES':
+        geometry.remove_triangles_by_mask(mask)
+        geometry.remove_unreferenced_vertices()
+        got = remove_triangles_by_mask(mesh, mask, True)
+    else:
+        geometry.remove_vertices_by_mask(mask)
+        got = remove_vertices_by_mask(mesh, mask)
+    assert np.allclose(got['vertices'], np.asarray(geometry.vertices))
+    assert np.array_equal(got['triangles'], np.asarray(geometry.triangles))
+
+def test_split_by_cluster_as_reference():
+    mesh = mesh_with_attributes(500)
+    rng = np.random.default_rng(6)
+    cluster_ids = rng.integers(0, 5, len(mesh['triangles']))
+    cluster_ids[cluster_ids == 3] = 4
+    parts = split_by_cluster(mesh, cluster_ids)
+    assert len(parts) == 5
+    for cluster, part in enumerate(parts):
+        # triangles of the cluster in their order, vertices of those triangles in their order
+        keep_tris = cluster_ids == cluster
+        keep_verts = np.zeros(len(mesh['vertices']), dtype=bool)
+        keep_verts[mesh['triangles'][keep_tris]] = True
+        expected = reference_mask(mesh, keep_tris, keep_verts)
+        assert_same_arrays(part, expected)
+        assert part['triangles'].dtype == np.int32
+
+@requires_open3d
+def test_split_by_connected_clusters():
+    from core.open3d_ops import cluster_connected_triangles
+
+    # three copies of the grid in one mesh, with the triangles shuffled
+    meshes = [grid_mesh(200) for _ in range(3)]
+    joined = join_triangle_meshes(meshes)
+    order = np.random.default_rng(7).permutation(len(joined['triangles']))
+    joined['triangles'] = joined['triangles'][order]
+    cluster_ids, counts, _ = cluster_connected_triangles(geometry_from_arrays('TriangleMesh', joined))
+    parts = split_by_cluster(joined, cluster_ids, len(counts))
+    assert len(parts) == 3
+    # every part has the triangles of one copy, compared by their corner coordinates
+    def corners(arrays):
+        rows = arrays['vertices'][arrays['triangles']].reshape(-1, 9)
+        return rows[np.lexsort(rows.T)]
+    for part in parts:
+        assert len(part['vertices']) == len(meshes[0]['vertices'])
+        assert np.allclose(corners(part), corners(meshes[0]))
+
+def reference_vertex_normals(verts, tris, weighting):
+    '''Face normals accumulated per vertex with np.add.at'''
+    corners = verts[tris]
+    cross = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    f_normals = cross / np.linalg.norm(cross, axis=1)[:, np.newaxis]
+    if weighting == 'AREA':
+        weights = np.repeat(np.linalg.norm(cross, axis=1)[:, np.newaxis], 3, axis=1)
+    elif weighting == 'ANGLE':
+        weights = np.empty((len(tris), 3))
+        for i in range(3):
+            a = corners[:, (i + 1) % 3] - corners[:, i]
+            b = corners[:, (i + 2) % 3] - corners[:, i]
+            cos = np.einsum('ij,ij->i', a, b) / np.linalg.norm(a, axis=1) / np.linalg.norm(b, axis=1)
+            weights[:, i] = np.arccos(np.clip(cos, -1, 1))
+    else:
+        weights = np.ones((len(tris), 3))
+    v_normals = np.zeros_like(verts)
+    for i in range(3):
+        np.add.at(v_normals, tris[:, i], f_normals * weights[:, i, np.newaxis])
+    return f_normals, v_normals / np.linalg.norm(v_normals, axis=1)[:, np.newaxis]
+
+@pytest.mark.parametrize('weighting', ['NONE', 'AREA', 'ANGLE'])
+def test_vertex_normals_as_reference(weighting):
+    mesh = grid_mesh(2000)
+    expected_faces, expected_verts = reference_vertex_normals(mesh['vertices'], mesh['triangles'], weighting)
+    incidence = VertexFaceIncidence(mesh['triangles'], len(mesh['vertices']))
+    for dtype, tolerance in ((None, 1e-8), (np.float32, 1e-5)):
+        f_normals, v_normals = calc_vertex_normals(mesh['vertices'], mesh['triangles'], incidence=incidence,
+                                                   weighting=weighting, dtype=dtype)
+        assert np.allclose(f_normals, expected_faces, atol=tolerance)
+        assert np.allclose(v_normals, expected_verts, atol=tolerance)
+    assert np.allclose(face_normals(mesh['vertices'], mesh['triangles']), expected_faces)
+
+@requires_open3d
+def test_normals_as_open3d():
+    mesh = grid_mesh(2000)
+    geometry = geometry_from_arrays('TriangleMesh', mesh)
+    geometry.compute_vertex_normals()
+    # Open3D adds the not normalized face normals: the AREA weighting
+    f_normals, v_normals = calc_vertex_normals(mesh['vertices'], mesh['triangles'], weighting='AREA')
+    assert np.allclose(f_normals, np.asarray(geometry.triangle_normals))
+    assert np.allclose(v_normals, np.asarray(geometry.vertex_normals))
+
+@pytest.mark.skipif(cKDTree is None, reason='SciPy is not available')
+@pytest.mark.parametrize('max_neighbors', [0, 5])
+def test_radius_dense_cluster(monkeypatch, max_neighbors):
+    import core.spatial_index as spatial_index
+
+    # one dense cluster among sparse points: its queries find many more neighbors than the rest
+    rng = np.random.default_rng(8)
+    points = np.concatenate([rng.random((3000, 3)) * 10, rng.random((500, 3)) * 0.01 + 5])
+    index = SpatialIndex(points)
+    expected = index.radius(0.3, max_neighbors=max_neighbors)
+    # a budget smaller than a query on the cluster, every sub-chunk gets one query
+    monkeypatch.setattr(spatial_index, 'QUERY_BUDGET', 100)
+    monkeypatch.setattr(spatial_index, 'QUERY_CHUNK', 1024)
+    indices, distances, offsets = index.radius(0.3, max_neighbors=max_neighbors)
+    assert np.array_equal(offsets, expected[2])
+    assert np.array_equal(indices, expected[0])
+    assert np.array_equal(distances, expected[1])
+    for i in [0, 1000, 3000, 3499]:
+        found = np.flatnonzero(np.linalg.norm(points - points[i], axis=1) <= 0.3)
+        neighbors = indices[offsets[i]:offsets[i + 1]]
+        if max_neighbors:
+            assert len(neighbors) == min(max_neighbors, len(found))
+        else:
+            assert np.array_equal(np.sort(neighbors), found)
+        assert np.all(np.diff(distances[offsets[i]:offsets[i + 1]]) >= 0)
+
+def test_select_points_small_budget_eye_inside():
+    points = np.random.default_rng(9).random((200000, 3))
+    pyramid = PointPyramid({'points': points}, 8)
+    level_arrays, level = select_points(pyramid, 10)
+    # the cells around the eye can not be refined to the leaf within 10 points
+    arrays, levels = select_points(pyramid, 10, eye=[0.5, 0.5, 0.5])
+    assert 0 < len(levels) <= 10
+    assert np.array_equal(levels, level)
+    assert np.allclose(arrays['points'], level_arrays['points'])
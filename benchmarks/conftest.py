@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# The core package is imported as a top level package, without Blender
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ADDON_DIR not in sys.path:
+    sys.path.insert(0, ADDON_DIR)
+
+from meshes import grid_mesh
+
+# Meshes over one million triangles take minutes and several GB,
+# run them with SV_O3D_BENCH_LARGE=1
+SIZES = [1_000, 100_000]
+LARGE_SIZES = [1_000_000, 10_000_000]
+if os.environ.get('SV_O3D_BENCH_LARGE'):
+    SIZES += LARGE_SIZES
+
+@pytest.fixture(scope='session', params=SIZES, ids=lambda size: f'{size // 1000}k_tris')
+def mesh_data(request):
+    return grid_mesh(request.param)
+
+@pytest.fixture
+def mesh(mesh_data):
+    '''Synthetic mesh as a dict of attributes, the arrays are shared between benchmarks'''
+    return dict(mesh_data)
@@ -0,0 +1,13 @@
+import numpy as np
+
+def grid_mesh(triangle_count):
+    '''Wavy grid with about triangle_count triangles, as a dict of mesh attributes'''
+    side = max(int(np.sqrt(triangle_count / 2)) + 1, 2)
+    x, y = np.meshgrid(np.linspace(0, 1, side), np.linspace(0, 1, side))
+    z = 0.1 * np.sin(x * 20) * np.cos(y * 20)
+    verts = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+    idx = np.arange(side * side).reshape(side, side)
+    a, b = idx[:-1, :-1].ravel(), idx[:-1, 1:].ravel()
+    c, d = idx[1:, 1:].ravel(), idx[1:, :-1].ravel()
+    faces = np.concatenate([np.stack([a, b, c], axis=1), np.stack([a, c, d], axis=1)]).astype(np.int32)
+    return {'vertices': verts, 'triangles': faces}
@@ -0,0 +1,90 @@
+'''
+Vertex normals microbenchmark: np.add.at implementation against the incidence kernel.
+Runs without Blender:
+
+    python benchmarks/normals_benchmark.py --sizes 10000 200000 2000000 --iterations 50
+'''
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import core.triangle_mesh as tm
+
+def legacy_normals(np_verts, np_faces):
+    '''calc_normals before the incidence kernel'''
+    def normalize_v3(arr):
+        lens = np.sqrt(arr[:, 0]**2 + arr[:, 1]**2 + arr[:, 2]**2)
+        arr[:, 0] /= lens
+        arr[:, 1] /= lens
+        arr[:, 2] /= lens
+        return arr
+    norm = np.zeros(np_verts.shape, dtype=np_verts.dtype)
+    v_pols = np_verts[np_faces]
+    face_normals = np.cross(v_pols[::, 1] - v_pols[::, 0], v_pols[::, 2] - v_pols[::, 0])
+    normalize_v3(face_normals)
+    for i in range(np_faces.shape[1]):
+        np.add.at(norm, np_faces[:, i], face_normals)
+    return face_normals, normalize_v3(norm)
+
+def grid_mesh(vertex_count):
+    '''Wavy grid with about vertex_count vertices'''
+    side = max(int(np.sqrt(vertex_count)), 2)
+    x, y = np.meshgrid(np.linspace(0, 1, side), np.linspace(0, 1, side))
+    z = 0.1 * np.sin(x * 20) * np.cos(y * 20)
+    verts = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+    idx = np.arange(side * side).reshape(side, side)
+    a, b = idx[:-1, :-1].ravel(), idx[:-1, 1:].ravel()
+    c, d = idx[1:, 1:].ravel(), idx[1:, :-1].ravel()
+    faces = np.concatenate([np.stack([a, b, c], axis=1), np.stack([a, c, d], axis=1)]).astype(np.int32)
+    return verts, faces
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def run(sizes, iterations, repeat):
+    backend = 'scipy.sparse' if tm.csr_matrix is not None else 'np.bincount'
+    print(f'accumulation backend: {backend}, {iterations} iterations per run, best of {repeat}')
+    header = f'{"vertices":>10} {"faces":>10} {"variant":<28} {"seconds":>10} {"speedup":>8}'
+    print(header)
+    print('-' * len(header))
+    for size in sizes:
+        verts, faces = grid_mesh(size)
+        verts32 = verts.astype(np.float32)
+        _, reference = legacy_normals(verts, faces)
+        _, result = tm.calc_vertex_normals(verts, faces)
+        assert np.allclose(reference, result), 'kernel result differs from the legacy code'
+
+        incidence = tm.VertexFaceIncidence(faces, len(verts))
+        out64 = np.empty_like(verts)
+        out32 = np.empty_like(verts32)
+
+        variants = [
+            ('legacy np.add.at', lambda: [legacy_normals(verts, faces) for _ in range(iterations)]),
+            ('kernel, new incidence', lambda: [tm.calc_vertex_normals(verts, faces) for _ in range(iterations)]),
+            ('kernel, reused incidence', lambda: [tm.calc_vertex_normals(verts, faces, incidence=incidence, out=out64)
+                                                  for _ in range(iterations)]),
+            ('kernel, reused, float32', lambda: [tm.calc_vertex_normals(verts32, faces, incidence=incidence, out=out32)
+                                                 for _ in range(iterations)]),
+            ('kernel, reused, area', lambda: [tm.calc_vertex_normals(verts, faces, incidence=incidence, weighting='AREA', out=out64)
+                                              for _ in range(iterations)]),
+            ('kernel, reused, angle', lambda: [tm.calc_vertex_normals(verts, faces, incidence=incidence, weighting='ANGLE', out=out64)
+                                               for _ in range(iterations)]),
+        ]
+        base = None
+        for name, func in variants:
+            seconds = best_time(func, repeat)
+            if base is None:
+                base = seconds
+            print(f'{len(verts):>10} {len(faces):>10} {name:<28} {seconds:>10.4f} {base / seconds:>7.2f}x')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 200000, 1000000])
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.iterations, args.repeat)
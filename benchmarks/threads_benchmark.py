@@ -0,0 +1,80 @@
+'''
+Thread pool benchmark: the Open3D calls of the Smooth, Sharpen, Point Cloud Downsample
+and Point Cloud Calc Normals nodes run through SvO3ParallelNode.map_objects in the Serial
+and in the Threads parallel modes, with copy-on-write handles as inputs, as the nodes get them
+(their conversion to Open3D on the main thread is timed too).
+Needs Blender with Sverchok and the add-on enabled:
+
+    blender -b --python benchmarks/threads_benchmark.py -- --objects 1 4 16 64 --workers 8
+'''
+import argparse
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+import numpy as np
+
+from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.core import open3d_ops as ops
+from sverchok_open3d.utils.cow import CowTriangleMesh, CowPointCloud
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.utils.parallel import set_worker_count, get_worker_count, shutdown_pool
+
+def sphere_mesh(resolution):
+    return o3d.geometry.TriangleMesh.create_sphere(radius=1.0, resolution=resolution)
+
+def sphere_cloud(points_num):
+    return sphere_mesh(100).sample_points_uniformly(number_of_points=points_num)
+
+def operations(resolution, points_num):
+    '''(name, function, function building the (args, kwargs) of the object i)'''
+    mesh = sphere_mesh(resolution)
+    mesh_arrays = {'vertices': np.asarray(mesh.vertices), 'triangles': np.asarray(mesh.triangles)}
+    points = np.asarray(sphere_cloud(points_num).points)
+    # new handles on every run, as every update of an upstream node gives
+    new_mesh = lambda: CowTriangleMesh.from_arrays(**mesh_arrays)
+    new_pcd = lambda: CowPointCloud.from_arrays(points=points)
+    return [
+        ('smooth taubin x10', ops.smooth_triangle_mesh, lambda i: ((new_mesh(), 'taubin', 10), {})),
+        ('sharpen x10', ops.sharpen_triangle_mesh, lambda i: ((new_mesh(), 10, 0.5), {})),
+        ('voxel downsample', ops.downsample_point_cloud,
+         lambda i: ((new_pcd(), 'VOXEL', 2, 0.02, None, None, False), {})),
+        ('estimate normals', ops.point_cloud_normals, lambda i: ((points, None, 30, 'STANDARD'), {})),
+    ]
+
+def mapped(mode, func, make_call, count):
+    node = SimpleNamespace(parallel_mode=mode)
+    return SvO3ParallelNode.map_objects(node, func, [make_call(i) for i in range(count)])
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def run(object_counts, workers, resolution, points_num, repeat):
+    set_worker_count(workers)
+    print(f'open3d {o3d.__version__}, {get_worker_count()} threads, {os.cpu_count()} CPUs, best of {repeat}')
+    header = f'{"operation":<20} {"objects":>8} {"serial (s)":>11} {"threads (s)":>12} {"speedup":>8}'
+    print(header)
+    print('-' * len(header))
+    try:
+        for name, func, make_call in operations(resolution, points_num):
+            for count in object_counts:
+                serial_time = best_time(lambda: mapped('NONE', func, make_call, count), repeat)
+                thread_time = best_time(lambda: mapped('THREADS', func, make_call, count), repeat)
+                print(f'{name:<20} {count:>8} {serial_time:>11.4f} {thread_time:>12.4f} {serial_time / thread_time:>7.2f}x')
+    finally:
+        shutdown_pool()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objects', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--resolution', type=int, default=100, help='sphere resolution of the meshes')
+    parser.add_argument('--points', type=int, default=100000, help='points of the point clouds')
+    parser.add_argument('--repeat', type=int, default=3)
+    # Blender passes the arguments of the script after --
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    args = parser.parse_args(argv)
+    if o3d is None:
+        sys.exit('open3d is not installed')
+    run(args.objects, args.workers, args.resolution, args.points, args.repeat)
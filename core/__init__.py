@@ -0,0 +1,6 @@
+# Geometry kernels of Sverchok-Open3d.
+# This package must not import bpy, mathutils or sverchok and uses only
+# relative imports, so it can be imported from a plain Python process
+# (see benchmarks/ and the worker processes of parallel.py) as well as from
+# the add-on (sverchok_open3d.core). Only open3d_ops.py uses open3d.
+# Meshes and point clouds are dicts of NumPy arrays named as the Open3D attributes.
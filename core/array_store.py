@@ -0,0 +1,70 @@
+import os
+import json
+import shutil
+import hashlib
+
+import numpy as np
+
+# On disk store of geometry as raw .npy blocks, one folder per entry:
+#   <root>/<key hash>/meta.json and one <attribute>.npy per attribute.
+# Loading maps the blocks in memory, so it costs almost nothing compared
+# with parsing the original file.
+
+META_FILE = 'meta.json'
+
+def key_hash(key):
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+def save_arrays(root, key, kind, arrays):
+    '''Write the arrays of the entry, the folder appears complete or not at all'''
+    folder = os.path.join(root, key_hash(key))
+    if os.path.isdir(folder):
+        return folder
+    os.makedirs(root, exist_ok=True)
+    tmp_folder = f'{folder}.{os.getpid()}.tmp'
+    os.makedirs(tmp_folder, exist_ok=True)
+    try:
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp_folder, f'{name}.npy'), np.ascontiguousarray(arr))
+        with open(os.path.join(tmp_folder, META_FILE), 'w') as f:
+            json.dump({'key': repr(key), 'kind': kind, 'attributes': list(arrays)}, f)
+        os.replace(tmp_folder, folder)
+    except OSError:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        if not os.path.isdir(folder):
+            raise
+    return folder
+
+def load_arrays(root, key):
+    '''(kind, dict of read-only memory mapped arrays) of the entry or None'''
+    folder = os.path.join(root, key_hash(key))
+    try:
+        with open(os.path.join(folder, META_FILE)) as f:
+            meta = json.load(f)
+        if meta['key'] != repr(key):
+            return None
+        arrays = {name: np.load(os.path.join(folder, f'{name}.npy'), mmap_mode='r')
+                  for name in meta['attributes']}
+    except (OSError, ValueError, KeyError):
+        return None
+    # the access time drives the pruning
+    os.utime(folder)
+    return meta['kind'], arrays
+
+def folder_size(folder):
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+def prune(root, max_bytes):
+    '''Remove the entries used less recently until the store fits in max_bytes'''
+    if not os.path.isdir(root):
+        return
+    entries = []
+    for entry in os.scandir(root):
+        if entry.is_dir() and not entry.name.endswith('.tmp'):
+            entries.append((entry.stat().st_mtime, folder_size(entry.path), entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
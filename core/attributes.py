@@ -0,0 +1,85 @@
+import numpy as np
+
+# Geometry data in the core is a dict of NumPy arrays named as the Open3D attributes.
+# (dtype, width) of every attribute
+TRIANGLE_MESH_ATTRIBUTES = {
+    'vertices': (np.float64, 3),
+    'vertex_normals': (np.float64, 3),
+    'vertex_colors': (np.float64, 3),
+    'triangles': (np.int32, 3),
+    'triangle_normals': (np.float64, 3),
+    'triangle_uvs': (np.float64, 2),
+    'triangle_material_ids': (np.int32, 1),
+}
+
+POINT_CLOUD_ATTRIBUTES = {
+    'points': (np.float64, 3),
+    'normals': (np.float64, 3),
+    'colors': (np.float64, 3),
+}
+
+# attribute: (attribute it is aligned with, items per element of it)
+ATTRIBUTE_DOMAINS = {
+    'vertex_normals': ('vertices', 1),
+    'vertex_colors': ('vertices', 1),
+    'triangles': ('vertices', None),
+    'triangle_normals': ('triangles', 1),
+    'triangle_uvs': ('triangles', 3),
+    'triangle_material_ids': ('triangles', 1),
+    'normals': ('points', 1),
+    'colors': ('points', 1),
+}
+
+VERTEX_ATTRIBUTES = ['vertex_normals', 'vertex_colors']
+TRIANGLE_ATTRIBUTES = ['triangle_normals', 'triangle_material_ids']
+
+def has_attribute(arrays, name):
+    '''Same meaning as the has_* methods of Open3D geometries'''
+    arr = arrays.get(name)
+    if arr is None or len(arr) == 0:
+        return False
+    domain = ATTRIBUTE_DOMAINS.get(name)
+    if domain is None:
+        return True
+    base, factor = domain
+    if not has_attribute(arrays, base):
+        return False
+    return factor is None or len(arr) == factor * len(arrays[base])
+
+def spread_vertex_attrib(arrays, np_faces_masked, attribute):
+    '''Append the average of the attribute over the given faces (one new vertex per face)'''
+    if has_attribute(arrays, attribute):
+        np_attrib = arrays[attribute]
+        attrib_center = np.sum(np_attrib[np_faces_masked], axis=1) / 3
+        arrays[attribute] = np.concatenate([np_attrib, attrib_center])
+
+def spread_face_attrib(arrays, mask, attribute, attrib_len):
+    '''Move the attribute of the masked faces to the end, repeated for the three faces they are split in'''
+    if has_attribute(arrays, attribute):
+        np_attrib = arrays[attribute]
+        np_attrib_masked = np_attrib[mask]
+        if attrib_len == 1:
+            attrib_center = np.repeat(np_attrib_masked, 3, axis=0).flatten()
+        else:
+            attrib_center = np.repeat(np_attrib_masked, 3, axis=0).reshape(-1, attrib_len)
+        arrays[attribute] = np.concatenate([np_attrib[np.invert(mask)], attrib_center])
+
+def take_rows(arr, keep):
+    '''arr[keep] for a boolean mask or an index array, np.compress / np.take are about twice as fast'''
+    keep = np.asarray(keep)
+    if keep.dtype == bool:
+        return np.compress(keep, arr, axis=0)
+    return np.take(arr, keep, axis=0)
+
+def slice_triangle_attribs(arrays, keep):
+    for attribute in TRIANGLE_ATTRIBUTES:
+        if has_attribute(arrays, attribute):
+            arrays[attribute] = take_rows(arrays[attribute], keep)
+    if has_attribute(arrays, 'triangle_uvs'):
+        arrays['triangle_uvs'] = take_rows(arrays['triangle_uvs'].reshape(-1, 3, 2), keep).reshape(-1, 2)
+
+def slice_vertex_attribs(arrays, keep):
+    for attribute in VERTEX_ATTRIBUTES:
+        if has_attribute(arrays, attribute):
+            arrays[attribute] = take_rows(arrays[attribute], keep)
+    arrays['vertices'] = take_rows(arrays['vertices'], keep)
@@ -0,0 +1,70 @@
+import numpy as np
+
+# Instanced geometry: one base geometry (dict of attributes) and an (N, 4, 4)
+# matrix per instance. The flat buffers of all the instances are built by
+# expand_instances with one batched matmul per attribute, positions by the
+# matrices, normals by their cofactor matrices, triangles offset by broadcasting
+# and the rest of the attributes repeated.
+
+POSITION_ATTRIBUTES = ['vertices', 'points']
+NORMAL_ATTRIBUTES = ['vertex_normals', 'triangle_normals', 'normals']
+
+def as_matrices(matrices):
+    '''(N, 4, 4) float64 array of a matrix or a list of matrices (mathutils.Matrix or array like)'''
+    np_matrices = np.asarray(matrices, dtype=np.float64)
+    return np_matrices.reshape(-1, 4, 4)
+
+def normal_matrices(matrices):
+    '''
+    Cofactor matrices of the 3x3 part: they transform normals as the inverse transpose
+    (up to scale, normals are normalized later) and exist for singular matrices too
+    '''
+    columns = matrices[:, :3, :3].transpose(0, 2, 1)
+    c0, c1, c2 = columns[:, 0], columns[:, 1], columns[:, 2]
+    return np.stack([np.cross(c1, c2), np.cross(c2, c0), np.cross(c0, c1)], axis=2)
+
+def _transform(arr, linear, translation=None):
+    out = np.matmul(arr, linear.transpose(0, 2, 1))
+    if translation is not None:
+        out += translation[:, np.newaxis, :]
+    return out.reshape(-1, 3)
+
+def expand_instances(arrays, matrices):
+    '''Attribute dict of all the instances of the base attributes, in matrices order'''
+    matrices = as_matrices(matrices)
+    count = len(matrices)
+    expanded = {}
+    normal_linear = None
+    for name, arr in arrays.items():
+        arr = np.asarray(arr)
+        if name in POSITION_ATTRIBUTES:
+            expanded[name] = _transform(arr, matrices[:, :3, :3], matrices[:, :3, 3])
+        elif name in NORMAL_ATTRIBUTES:
+            if normal_linear is None:
+                normal_linear = normal_matrices(matrices)
+            normals = _transform(arr, normal_linear)
+            lengths = np.linalg.norm(normals, axis=1)
+            lengths[lengths == 0] = 1
+            normals /= lengths[:, np.newaxis]
+            expanded[name] = normals
+        elif name == 'triangles':
+            arr = arr.reshape(-1, 3)
+            offsets = np.arange(count, dtype=np.int64) * len(arrays.get('vertices', ()))
+            triangles = np.empty((count,) + arr.shape, dtype=np.int32)
+            np.add(arr, offsets[:, np.newaxis, np.newaxis], out=triangles, casting='unsafe')
+            expanded[name] = triangles.reshape(-1, 3)
+        else:
+            expanded[name] = np.broadcast_to(arr, (count,) + arr.shape).reshape((-1,) + arr.shape[1:])
+    return expanded
+
+def iterated_matrix(matrix, iterations=1, coeff=(1,)):
+    '''
+    Matrix with the effect of the MATRIX mode of vector_transform:
+    every iteration moves the vertices coeff of the way to their transformed position
+    '''
+    matrix = np.asarray(matrix, dtype=np.float64)
+    result = np.eye(4)
+    for i in range(iterations):
+        c = coeff[i % len(coeff)]
+        result = ((1 - c) * np.eye(4) + c * matrix) @ result
+    return result
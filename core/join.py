@@ -0,0 +1,77 @@
+import numpy as np
+
+from .attributes import has_attribute
+from .triangle_mesh import calc_vertex_normals, face_normals
+
+# Joins allocate every output attribute once from the summed sizes and copy each
+# source into its slice, the triangles get their vertex offset added while copied.
+
+EMPTY_TRIANGLES = np.empty((0, 3), dtype=np.int32)
+
+def _offsets(parts, domain):
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([len(arrays.get(domain, ())) for arrays in parts], out=offsets[1:])
+    return offsets
+
+def _join_attribute(parts, attribute, width, dtype, offsets):
+    '''Attribute of all the parts, zero filled for the parts that do not have it'''
+    joined = np.empty((offsets[-1], width) if width > 1 else offsets[-1], dtype=dtype)
+    for arrays, start, end in zip(parts, offsets[:-1], offsets[1:]):
+        if has_attribute(arrays, attribute):
+            joined[start:end] = arrays[attribute]
+        else:
+            joined[start:end] = 0
+    return joined
+
+def _same_buffer(a, b):
+    return a is b or (a.__array_interface__ == b.__array_interface__)
+
+def _join_triangles(meshes, vertex_offsets, triangle_offsets):
+    joined = np.empty((triangle_offsets[-1], 3), dtype=np.int32)
+    if len(joined) == 0:
+        return joined
+    triangles = [np.asarray(arrays.get('triangles', EMPTY_TRIANGLES)).reshape(-1, 3) for arrays in meshes]
+    first = triangles[0]
+    if all(_same_buffer(tris, first) for tris in triangles[1:]):
+        # instances of one mesh: a single broadcast add
+        np.add(first, vertex_offsets[:-1, np.newaxis, np.newaxis], out=joined.reshape(len(meshes), -1, 3), casting='unsafe')
+        return joined
+    for tris, offset, start, end in zip(triangles, vertex_offsets, triangle_offsets[:-1], triangle_offsets[1:]):
+        np.add(tris, offset, out=joined[start:end], casting='unsafe')
+    return joined
+
+def join_triangle_meshes(meshes, compute_vertex_normals=False, compute_faces_normals=False):
+    '''Join a list of triangle mesh attribute dicts in one'''
+    vertex_offsets = _offsets(meshes, 'vertices')
+    triangle_offsets = _offsets(meshes, 'triangles')
+    joined = {}
+    joined['vertices'] = _join_attribute(meshes, 'vertices', 3, np.float64, vertex_offsets)
+    joined['triangles'] = _join_triangles(meshes, vertex_offsets, triangle_offsets)
+
+    if all(has_attribute(arrays, 'triangle_normals') for arrays in meshes):
+        joined['triangle_normals'] = _join_attribute(meshes, 'triangle_normals', 3, np.float64, triangle_offsets)
+    elif compute_faces_normals:
+        joined['triangle_normals'] = face_normals(joined['vertices'], joined['triangles'])
+
+    if all(has_attribute(arrays, 'vertex_normals') for arrays in meshes):
+        joined['vertex_normals'] = _join_attribute(meshes, 'vertex_normals', 3, np.float64, vertex_offsets)
+    elif compute_vertex_normals:
+        joined['vertex_normals'] = calc_vertex_normals(joined['vertices'], joined['triangles'])[1]
+
+    if any(has_attribute(arrays, 'vertex_colors') for arrays in meshes):
+        joined['vertex_colors'] = _join_attribute(meshes, 'vertex_colors', 3, np.float64, vertex_offsets)
+    if any(has_attribute(arrays, 'triangle_uvs') for arrays in meshes):
+        joined['triangle_uvs'] = _join_attribute(meshes, 'triangle_uvs', 2, np.float64, triangle_offsets * 3)
+    if any(has_attribute(arrays, 'triangle_material_ids') for arrays in meshes):
+        joined['triangle_material_ids'] = _join_attribute(meshes, 'triangle_material_ids', 1, np.int32, triangle_offsets)
+
+    return joined
+
+def join_point_clouds(clouds):
+    '''Join a list of point cloud attribute dicts in one'''
+    offsets = _offsets(clouds, 'points')
+    joined = {'points': _join_attribute(clouds, 'points', 3, np.float64, offsets)}
+    for attribute in ['normals', 'colors']:
+        if any(has_attribute(arrays, attribute) for arrays in clouds):
+            joined[attribute] = _join_attribute(clouds, attribute, 3, np.float64, offsets)
+    return joined
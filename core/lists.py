@@ -0,0 +1,27 @@
+import numpy as np
+
+# List matching helpers with the semantics of sverchok.data_structure,
+# so the core does not need Sverchok to be importable
+
+def has_element(pol_edge):
+    if pol_edge is None:
+        return False
+    if len(pol_edge) > 0 and hasattr(pol_edge[0], '__len__') and len(pol_edge[0]) > 0:
+        return True
+    return False
+
+def full_list(array, desired_length):
+    '''Array with the desired length, repeating the last item'''
+    array = np.asarray(array)
+    length_diff = desired_length - array.shape[0]
+    if length_diff > 0:
+        new_part = np.repeat(array[np.newaxis, -1], length_diff, axis=0)
+        return np.concatenate((array, new_part))
+    return array[:desired_length]
+
+def full_list_cycle(array, desired_length):
+    '''Array with the desired length, cycling the items'''
+    array = np.asarray(array)
+    if array.shape[0] == desired_length:
+        return array
+    return np.resize(array, (desired_length,) + array.shape[1:])
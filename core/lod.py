@@ -0,0 +1,235 @@
+import numpy as np
+
+# Level of detail pyramid of a point cloud: an octree over the bounding cube
+# of the points where level d splits the cube in 2**d cells per axis and every
+# occupied cell keeps the average of the points, colors and normals inside it.
+# The finest level is built from the points, every coarser one from the level
+# below (the parent of a cell is its cell index shifted one bit), so the build
+# is a few np.unique / np.bincount passes.
+# select_points picks at most `budget` points: a cell is refined into its
+# children while it looks bigger than a threshold from the camera, and the
+# threshold is bisected until the cut fits in the budget.
+
+MAX_DEPTH = 20
+SEARCH_STEPS = 64
+SEARCH_TOLERANCE = 1.01
+
+class PointPyramid:
+    def __init__(self, arrays, depth=10):
+        depth = int(min(max(depth, 0), MAX_DEPTH))
+        points = arrays['points']
+        valid = np.isfinite(points).all(axis=1)
+        if not valid.all():
+            arrays = {name: arr[valid] for name, arr in arrays.items()}
+            points = arrays['points']
+        self.depth = depth
+        self.attributes = [name for name in ('points', 'colors', 'normals') if name in arrays]
+        self.levels = []
+        if len(points) == 0:
+            self.origin, self.size = np.zeros(3), 1.0
+            return
+        self.origin = points.min(axis=0)
+        extent = float((points.max(axis=0) - self.origin).max())
+        self.size = extent * (1 + 1e-9) if extent > 0 else 1.0
+
+        resolution = 2**depth
+        cells = np.floor((points - self.origin) / self.size * resolution).astype(np.int64)
+        np.clip(cells, 0, resolution - 1, out=cells)
+        keys = self._keys(cells, depth)
+        unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        sums = {name: self._sum(inverse, arrays[name], len(unique_keys)) for name in self.attributes}
+        cells = self._cells(unique_keys, depth)
+        counts = counts.astype(np.int32)
+        levels = []
+        for d in range(depth, -1, -1):
+            level = {'cells': cells.astype(np.int32), 'counts': counts}
+            for name, summed in sums.items():
+                level[name] = summed / counts[:, np.newaxis]
+            if 'normals' in level:
+                lens = np.linalg.norm(level['normals'], axis=1)
+                lens[lens == 0] = 1
+                level['normals'] /= lens[:, np.newaxis]
+            levels.append(level)
+            if d == 0:
+                break
+            parent_keys, parent = np.unique(self._keys(cells >> 1, d - 1), return_inverse=True)
+            parent = parent.ravel()
+            level['parent'] = parent
+            counts = np.bincount(parent, weights=counts, minlength=len(parent_keys)).astype(np.int32)
+            sums = {name: self._sum(parent, summed, len(parent_keys)) for name, summed in sums.items()}
+            cells = self._cells(parent_keys, d - 1)
+        self.levels = levels[::-1]
+
+        # children of every cell as CSR over the next level
+        for d in range(depth):
+            parent = self.levels[d + 1]['parent']
+            self.levels[d]['children'] = np.argsort(parent, kind='stable').astype(np.int32)
+            offsets = np.zeros(len(self.levels[d]['cells']) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(parent, minlength=len(self.levels[d]['cells'])), out=offsets[1:])
+            self.levels[d]['child_offsets'] = offsets
+        for level in self.levels:
+            level.pop('parent', None)
+        self.nbytes = sum(arr.nbytes for level in self.levels for arr in level.values())
+
+    @staticmethod
+    def _keys(cells, depth):
+        bits = max(depth, 1)
+        return (cells[:, 0] << 2 * bits) | (cells[:, 1] << bits) | cells[:, 2]
+
+    @staticmethod
+    def _cells(keys, depth):
+        bits = max(depth, 1)
+        mask = (1 << bits) - 1
+        return np.stack([keys >> 2 * bits, (keys >> bits) & mask, keys & mask], axis=1)
+
+    @staticmethod
+    def _sum(inverse, values, count):
+        return np.stack([np.bincount(inverse, weights=values[:, i], minlength=count) for i in range(3)], axis=1)
+
+    def __len__(self):
+        return len(self.levels[-1]['cells']) if self.levels else 0
+
+    def cell_size(self, d):
+        return self.size / 2**d
+
+    def cell_centers(self, d, indices=None):
+        cells = self.levels[d]['cells'] if indices is None else self.levels[d]['cells'][indices]
+        return self.origin + (cells + 0.5) * self.cell_size(d)
+
+    def level_arrays(self, d, indices=None):
+        level = self.levels[d]
+        if indices is None:
+            return {name: level[name] for name in self.attributes}
+        return {name: level[name][indices] for name in self.attributes}
+
+def frustum_planes(camera_matrix, fov, aspect=1.0, near=0.01, far=1000.0):
+    '''
+    Inward planes (normal, offset) in world space of the view of a camera looking down its -Z axis.
+    fov is the angle (radians) along the larger side of the image, aspect is width / height
+    '''
+    matrix = np.asarray(camera_matrix, dtype=np.float64)
+    tan_x = np.tan(fov / 2)
+    tan_y = tan_x / aspect
+    if aspect < 1:
+        tan_y = np.tan(fov / 2)
+        tan_x = tan_y * aspect
+    # camera space planes, points inside have dot(normal, p) + offset >= 0
+    local = [
+        (np.array([0.0, 0.0, -1.0]), -near),
+        (np.array([0.0, 0.0, 1.0]), far),
+        (np.array([-1.0, 0.0, -tan_x]), 0.0),
+        (np.array([1.0, 0.0, -tan_x]), 0.0),
+        (np.array([0.0, -1.0, -tan_y]), 0.0),
+        (np.array([0.0, 1.0, -tan_y]), 0.0),
+    ]
+    rotation, location = matrix[:3, :3], matrix[:3, 3]
+    normal_matrix = np.linalg.inv(rotation).T
+    normals, offsets = [], []
+    for normal, offset in local:
+        world_normal = normal_matrix @ normal
+        length = np.linalg.norm(world_normal)
+        # a point on the plane moved to world space gives the new offset
+        point_on_plane = rotation @ (-offset * normal / np.dot(normal, normal)) + location
+        world_normal /= length
+        normals.append(world_normal)
+        offsets.append(-np.dot(world_normal, point_on_plane))
+    return np.array(normals), np.array(offsets)
+
+def _visible(centers, radius, planes):
+    if planes is None:
+        return np.ones(len(centers), dtype=bool)
+    normals, offsets = planes
+    return ((centers @ normals.T + offsets) >= -radius).all(axis=1)
+
+def _apparent_size(pyramid, d, indices, eye):
+    '''Cell size over the distance from the eye to the cell box, infinite for the cells around the eye'''
+    half = pyramid.cell_size(d) / 2
+    gap = np.maximum(np.abs(pyramid.cell_centers(d, indices) - eye) - half, 0)
+    distance = np.linalg.norm(gap, axis=1)
+    with np.errstate(divide='ignore'):
+        return np.where(distance > 0, 2 * half / distance, np.inf)
+
+def _cut(pyramid, threshold, eye, planes, budget):
+    '''Cells (level, indices) of the cut for the threshold, None if it exceeds the budget'''
+    frontier = np.flatnonzero(_visible(pyramid.cell_centers(0), pyramid.cell_size(0) * 0.8661, planes))
+    selected, total = [], 0
+    for d, level in enumerate(pyramid.levels):
+        if len(frontier) == 0:
+            break
+        if d == pyramid.depth:
+            refine = np.zeros(len(frontier), dtype=bool)
+        else:
+            refine = _apparent_size(pyramid, d, frontier, eye) > threshold
+        keep = frontier[~refine]
+        total += len(keep)
+        # every refined cell ends in at least one selected cell
+        if total + np.count_nonzero(refine) > budget:
+            return None
+        if len(keep):
+            selected.append((d, keep))
+        parents = frontier[refine]
+        if len(parents) == 0:
+            break
+        starts = level['child_offsets'][parents]
+        counts = level['child_offsets'][parents + 1] - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        children = level['children'][positions]
+        child_radius = pyramid.cell_size(d + 1) * 0.8661
+        frontier = children[_visible(pyramid.cell_centers(d + 1, children), child_radius, planes)]
+    return selected
+
+def _whole_level(pyramid, budget, planes, empty):
+    '''Visible cells of the deepest level that fits in the budget'''
+    best = None
+    for d in range(pyramid.depth + 1):
+        visible = np.flatnonzero(_visible(pyramid.cell_centers(d), pyramid.cell_size(d) * 0.8661, planes))
+        if len(visible) > budget:
+            break
+        best = (d, visible)
+    if best is None:
+        return empty
+    d, visible = best
+    return pyramid.level_arrays(d, visible), np.full(len(visible), d, dtype=np.int32)
+
+def select_points(pyramid, budget, eye=None, planes=None):
+    '''
+    (attributes, level of every point) of at most budget points.
+    Without eye the deepest whole level that fits is returned (culled by the planes if given),
+    with eye the cells close to it are refined more than the far ones, when the budget
+    is too small to refine the cells around the eye to the finest level the deepest
+    whole level is returned too
+    '''
+    empty = {name: np.empty((0, 3)) for name in pyramid.attributes}, np.empty(0, dtype=np.int32)
+    if not pyramid.levels or budget < 1:
+        return empty
+    if eye is None:
+        return _whole_level(pyramid, budget, planes, empty)
+
+    eye = np.asarray(eye, dtype=np.float64)
+    # thresholds are apparent sizes, bisected in log scale: bigger ones refine less
+    low, high = 1e-9, 1e9
+    best = _cut(pyramid, high, eye, planes, budget)
+    if best is None:
+        # the cells around the eye are always refined to the finest level,
+        # with smaller budgets a whole coarser level is better than nothing
+        return _whole_level(pyramid, budget, planes, empty)
+    finest = _cut(pyramid, low, eye, planes, budget)
+    if finest is not None:
+        best = finest
+    else:
+        for _ in range(SEARCH_STEPS):
+            if high < low * SEARCH_TOLERANCE:
+                break
+            middle = np.sqrt(low * high)
+            cut = _cut(pyramid, middle, eye, planes, budget)
+            if cut is None:
+                low = middle
+            else:
+                high, best = middle, cut
+    parts = [pyramid.level_arrays(d, indices) for d, indices in best]
+    if not parts:
+        return empty
+    arrays = {name: np.concatenate([part[name] for part in parts]) for name in pyramid.attributes}
+    levels = np.concatenate([np.full(len(indices), d, dtype=np.int32) for d, indices in best])
+    return arrays, levels
@@ -0,0 +1,154 @@
+import numpy as np
+
+from .attributes import slice_triangle_attribs, slice_vertex_attribs, take_rows
+from .lists import full_list
+
+def calc_full_mask(mask, index, filter_method, invert, length):
+    '''Boolean mask of the elements to remove'''
+    if filter_method == 'INDEX':
+        if invert:
+            full_mask = np.zeros(length, dtype='bool')
+            full_mask[np.array(index)] = True
+        else:
+            full_mask = np.ones(length, dtype='bool')
+            full_mask[np.array(index)] = False
+    else:
+        if invert:
+            full_mask = full_list(np.array(mask).astype(bool), length)
+        else:
+            full_mask = full_list(np.invert(np.array(mask).astype(bool)), length)
+    return full_mask
+
+def reindex_vertices(arrays, tris, keep_verts):
+    new_index = np.cumsum(keep_verts, dtype=np.int32) - 1
+    slice_vertex_attribs(arrays, keep_verts)
+    return new_index[tris]
+
+def remove_triangles_by_mask(arrays, full_mask, remove_unreferenced_vertices):
+    '''
+    Same as TriangleMesh.remove_triangles_by_mask over a dict of attributes.
+    Vertex buffers are returned untouched unless unreferenced vertices are removed
+    '''
+    arrays = dict(arrays)
+    keep = np.invert(full_mask)
+    tris = arrays['triangles'][keep]
+    slice_triangle_attribs(arrays, keep)
+    if remove_unreferenced_vertices:
+        used = np.zeros(len(arrays['vertices']), dtype='bool')
+        used[tris] = True
+        tris = reindex_vertices(arrays, tris, used)
+    arrays['triangles'] = tris
+    return arrays
+
+def remove_vertices_by_mask(arrays, full_mask):
+    '''Same as TriangleMesh.remove_vertices_by_mask over a dict of attributes'''
+    arrays = dict(arrays)
+    keep_verts = np.invert(full_mask)
+    tris = arrays['triangles']
+    keep = keep_verts[tris].all(axis=1)
+    tris = tris[keep]
+    slice_triangle_attribs(arrays, keep)
+    arrays['triangles'] = reindex_vertices(arrays, tris, keep_verts)
+    return arrays
+
+class MaskEngine:
+    '''
+    Removal of triangles or vertices by mask for one topology, to be reused while only
+    the mask or the vertex attributes change (see derived_attributes.mask_engine).
+    view() gives the source indices of the kept elements, gather() builds the arrays of
+    the filtered mesh from them. Work buffers are kept between calls, the outputs are new
+    arrays as they are shared with other meshes.
+    '''
+    def __init__(self, triangles, vertex_count):
+        # own copy, so caches holding the engine do not keep the triangles buffer alive
+        self.triangles = np.array(triangles)
+        self.vertex_count = vertex_count
+        self._vertex_triangles = None
+        self._keep_triangles = np.empty(len(self.triangles), dtype=bool)
+        self._used = np.empty(vertex_count, dtype=bool)
+        self._new_index = np.empty(vertex_count, dtype=self.triangles.dtype)
+        self._last_key = None
+        self._last_view = None
+
+    @property
+    def vertex_triangles(self):
+        '''Triangles of every vertex in CSR layout: (indptr, indices)'''
+        if self._vertex_triangles is None:
+            corners = self.triangles.ravel()
+            order = np.argsort(corners, kind='stable')
+            indptr = np.zeros(self.vertex_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(corners, minlength=self.vertex_count), out=indptr[1:])
+            self._vertex_triangles = (indptr, (order // 3).astype(np.int32))
+        return self._vertex_triangles
+
+    @property
+    def nbytes(self):
+        arrays = [self.triangles, self._keep_triangles, self._used, self._new_index]
+        if self._vertex_triangles is not None:
+            arrays.extend(self._vertex_triangles)
+        if self._last_view is not None:
+            arrays.extend(self._last_view)
+        return sum(arr.nbytes for arr in arrays)
+
+    def _triangles_of(self, vertices):
+        indptr, indices = self.vertex_triangles
+        starts = indptr[vertices]
+        counts = indptr[vertices + 1] - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return indices[positions]
+
+    def _keep_by_vertices(self, full_mask):
+        '''Mask of the triangles with all their vertices kept'''
+        removed = np.flatnonzero(full_mask)
+        keep = self._keep_triangles
+        if len(removed) * 6 < len(self.triangles):
+            # few removed vertices: only their triangles are touched
+            keep.fill(True)
+            keep[self._triangles_of(removed)] = False
+        else:
+            np.logical_not(full_mask, out=self._used)
+            np.all(self._used[self.triangles], axis=1, out=keep)
+        return keep
+
+    def view(self, method, full_mask, remove_unreferenced_vertices=False):
+        '''
+        (triangle indices, vertex indices) of the source kept by remove_triangles_by_mask
+        (method 'TRIANGLES') or remove_vertices_by_mask (method 'VERTS'), as read-only arrays
+        '''
+        full_mask = np.asarray(full_mask, dtype=bool)
+        key = (method, remove_unreferenced_vertices, len(full_mask), hash(np.packbits(full_mask).tobytes()))
+        if key == self._last_key:
+            return self._last_view
+        if method == 'TRIANGLES':
+            triangle_indices = np.flatnonzero(~full_mask)
+            if remove_unreferenced_vertices:
+                self._used.fill(False)
+                self._used[self.triangles[triangle_indices]] = True
+                vertex_indices = np.flatnonzero(self._used)
+            else:
+                vertex_indices = np.arange(self.vertex_count)
+        else:
+            triangle_indices = np.flatnonzero(self._keep_by_vertices(full_mask))
+            vertex_indices = np.flatnonzero(~full_mask)
+        # the view is returned again for the same mask, nobody must change it
+        triangle_indices.flags.writeable = False
+        vertex_indices.flags.writeable = False
+        self._last_key = key
+        self._last_view = (triangle_indices, vertex_indices)
+        return self._last_view
+
+    def gather(self, arrays, triangle_indices, vertex_indices):
+        '''Arrays of the mesh made of the given source elements, untouched buffers stay shared'''
+        arrays = dict(arrays)
+        if len(triangle_indices) < len(self.triangles):
+            tris = take_rows(self.triangles, triangle_indices)
+            slice_triangle_attribs(arrays, triangle_indices)
+        else:
+            tris = arrays['triangles']
+        if len(vertex_indices) < self.vertex_count:
+            new_index = self._new_index
+            new_index[vertex_indices] = np.arange(len(vertex_indices), dtype=new_index.dtype)
+            tris = np.take(new_index, tris)
+            slice_vertex_attribs(arrays, vertex_indices)
+        arrays['triangles'] = tris
+        return arrays
@@ -0,0 +1,109 @@
+import json
+import zlib
+
+import numpy as np
+
+from .attributes import TRIANGLE_MESH_ATTRIBUTES, POINT_CLOUD_ATTRIBUTES
+
+# Native binary format of the add-on (.svo3d), made to save and reload
+# intermediate geometry fast:
+#   8 bytes magic, uint32 little-endian length of the header, JSON header,
+#   then one block per attribute aligned to 64 bytes.
+# Blocks are little-endian arrays with the dtype of the Open3D attribute, so
+# the uncompressed ones are memory mapped and used without copies.
+# The header lists: kind, and per block name, dtype, shape, offset, size and compression.
+
+MAGIC = b'SVO3D\x00\x00\x01'
+EXTENSION = '.svo3d'
+ALIGNMENT = 64
+VERSION = 1
+
+KIND_ATTRIBUTES = {
+    'TriangleMesh': TRIANGLE_MESH_ATTRIBUTES,
+    'PointCloud': POINT_CLOUD_ATTRIBUTES,
+}
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def write_native(path, kind, arrays, compress=False, level=1):
+    '''
+    Save the dict of attributes of a geometry of the given kind ('TriangleMesh' or 'PointCloud').
+    compress: zlib every block (kept raw when it does not get smaller)
+    '''
+    attributes = KIND_ATTRIBUTES[kind]
+    blocks, payloads = [], []
+    for name, arr in arrays.items():
+        if name not in attributes or len(arr) == 0:
+            continue
+        dtype, _ = attributes[name]
+        arr = np.ascontiguousarray(arr, dtype=np.dtype(dtype).newbyteorder('<'))
+        data = memoryview(arr).cast('B')
+        compression = None
+        if compress:
+            packed = zlib.compress(data, level)
+            if len(packed) < arr.nbytes:
+                data, compression = packed, 'zlib'
+        blocks.append({
+            'name': name,
+            'dtype': arr.dtype.str,
+            'shape': list(arr.shape),
+            'nbytes': len(data),
+            'compression': compression,
+        })
+        payloads.append(data)
+
+    header = {'version': VERSION, 'kind': kind, 'blocks': blocks}
+    # offsets depend on the header length, that depends on the offsets: reserve room for them
+    for block in blocks:
+        block['offset'] = 2**62
+    header_len = len(json.dumps(header).encode('utf-8'))
+    offset = _aligned(len(MAGIC) + 4 + header_len)
+    for block in blocks:
+        block['offset'] = offset
+        offset = _aligned(offset + block['nbytes'])
+    header_bytes = json.dumps(header).encode('utf-8').ljust(header_len)
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.array(header_len, dtype='<u4').tobytes())
+        f.write(header_bytes)
+        for block, data in zip(blocks, payloads):
+            f.seek(block['offset'])
+            f.write(data)
+        f.truncate(offset if blocks else f.tell())
+
+def read_native_header(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a {EXTENSION} file')
+        header_len = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    if header['version'] > VERSION:
+        raise ValueError(f'{path}: {EXTENSION} version {header["version"]} is newer than this add-on')
+    return header
+
+def read_native(path, mmap=True):
+    '''
+    (kind, dict of attributes) of a .svo3d file.
+    With mmap the uncompressed blocks are read-only memory maps of the file
+    '''
+    header = read_native_header(path)
+    arrays = {}
+    with open(path, 'rb') as f:
+        for block in header['blocks']:
+            dtype, shape = np.dtype(block['dtype']), tuple(block['shape'])
+            if block['compression'] == 'zlib':
+                f.seek(block['offset'])
+                data = zlib.decompress(f.read(block['nbytes']))
+                arr = np.frombuffer(data, dtype=dtype).reshape(shape)
+            elif mmap:
+                arr = np.memmap(path, dtype=dtype, mode='r', offset=block['offset'], shape=shape)
+            else:
+                f.seek(block['offset'])
+                arr = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+            arrays[block['name']] = arr
+    return header['kind'], arrays
+
+def is_native(path):
+    return str(path).lower().endswith(EXTENSION)
@@ -0,0 +1,209 @@
+import copy
+import time
+
+import numpy as np
+try:
+    import open3d as o3d
+except ImportError:
+    o3d = None
+
+from .attributes import TRIANGLE_MESH_ATTRIBUTES, POINT_CLOUD_ATTRIBUTES
+from .profiling import native_call
+
+# Per object Open3D operations of the nodes.
+# They take and return Open3D geometries and never modify their input,
+# so the nodes can run them serially or in worker processes (see parallel.py).
+
+GEOMETRY_ATTRIBUTES = {
+    'TriangleMesh': TRIANGLE_MESH_ATTRIBUTES,
+    'PointCloud': POINT_CLOUD_ATTRIBUTES,
+}
+
+def o3d_vector(arr, dtype, width):
+    '''Open3D vector of a buffer. Open3D refuses read-only arrays, those are copied too'''
+    arr = np.asarray(arr)
+    if arr.dtype != dtype or not arr.flags.c_contiguous or not arr.flags.writeable:
+        arr = np.array(arr, dtype=dtype, order='C')
+    if width == 1:
+        return o3d.utility.IntVector(arr)
+    if width == 2:
+        return o3d.utility.Vector2dVector(arr)
+    if dtype == np.int32:
+        return o3d.utility.Vector3iVector(arr)
+    return o3d.utility.Vector3dVector(arr)
+
+def geometry_from_arrays(kind, arrays):
+    '''Open3D geometry (the data is copied) from a dict of attributes'''
+    geometry = getattr(o3d.geometry, kind)()
+    attributes = GEOMETRY_ATTRIBUTES[kind]
+    for name, arr in arrays.items():
+        dtype, width = attributes[name]
+        setattr(geometry, name, o3d_vector(arr, dtype, width))
+    return geometry
+
+def geometry_to_arrays(geometry):
+    '''(kind, dict of attributes) of an Open3D geometry, None for other values'''
+    kind = type(geometry).__name__
+    if kind not in GEOMETRY_ATTRIBUTES or not isinstance(geometry, o3d.geometry.Geometry):
+        return None
+    arrays = {}
+    for name in GEOMETRY_ATTRIBUTES[kind]:
+        arr = np.asarray(getattr(geometry, name))
+        if len(arr) > 0:
+            arrays[name] = arr
+    return kind, arrays
+
+
+@native_call
+def read_geometry(path, import_type, remove_nan_points=True, remove_infinite_points=True,
+                  enable_post_processing=False, print_progress=False):
+    '''Point cloud or triangle mesh of the file and the seconds spent reading it'''
+    start = time.perf_counter()
+    if import_type == 'point_cloud':
+        geometry = o3d.io.read_point_cloud(
+            path,
+            remove_nan_points=remove_nan_points,
+            remove_infinite_points=remove_infinite_points,
+            print_progress=print_progress)
+    else:
+        geometry = o3d.io.read_triangle_mesh(
+            path,
+            enable_post_processing=enable_post_processing,
+            print_progress=print_progress)
+    return geometry, time.perf_counter() - start
+
+def write_geometry(path, kind, arrays, write_ascii=False, compressed=False, print_progress=False, **mesh_options):
+    '''
+    Write the geometry given as a dict of attributes with Open3D.
+    mesh_options: write_vertex_normals, write_vertex_colors and write_triangle_uvs of triangle meshes
+    '''
+    geometry = geometry_from_arrays(kind, arrays)
+    if kind == 'PointCloud':
+        written = o3d.io.write_point_cloud(
+            path, geometry,
+            write_ascii=write_ascii,
+            compressed=compressed,
+            print_progress=print_progress)
+    else:
+        written = o3d.io.write_triangle_mesh(
+            path, geometry,
+            write_ascii=write_ascii,
+            compressed=compressed,
+            print_progress=print_progress,
+            **mesh_options)
+    if not written:
+        raise IOError(f'Open3D could not write {path}')
+
+@native_call
+def calc_point_cloud_normals(pcd, quality, method):
+    s_p = o3d.geometry.KDTreeSearchParamKNN(quality)
+    pcd.estimate_normals(search_param=s_p)
+    if method == 'TANGENT':
+        pcd.orient_normals_consistent_tangent_plane(quality)
+
+@native_call
+def point_cloud_normals(points, normals, quality, method):
+    '''
+    Normals estimated from the points array. The previous normals (or None)
+    are used to keep the orientation
+    '''
+    work_pcd = o3d.geometry.PointCloud()
+    work_pcd.points = o3d_vector(points, np.float64, 3)
+    if normals is not None:
+        work_pcd.normals = o3d_vector(normals, np.float64, 3)
+    calc_point_cloud_normals(work_pcd, quality, method)
+    return np.array(work_pcd.normals)
+
+@native_call
+def downsample_point_cloud(pcd, method, nth, voxel_size, min_bound, max_bound, approximate_class):
+    '''Downsampled point cloud and the traced indices (empty for the methods without trace)'''
+    if method == 'UNIFORM':
+        return pcd.uniform_down_sample(nth), []
+    if method == 'VOXEL':
+        return pcd.voxel_down_sample(voxel_size), []
+    new_pcd, new_index, _ = pcd.voxel_down_sample_and_trace(voxel_size, min_bound, max_bound, approximate_class=approximate_class)
+    return new_pcd, np.asarray(new_index)
+
+@native_call
+def cluster_connected_triangles(mesh):
+    '''(cluster of every triangle, triangles per cluster, area per cluster) as NumPy arrays'''
+    indexes, number, area = mesh.cluster_connected_triangles()
+    return np.asarray(indexes), np.asarray(number), np.asarray(area)
+
+@native_call
+def smooth_triangle_mesh(mesh, method, iterations):
+    if method == 'simple':
+        return mesh.filter_smooth_simple(number_of_iterations=iterations)
+    if method == 'laplacian':
+        return mesh.filter_smooth_laplacian(number_of_iterations=iterations)
+    return mesh.filter_smooth_taubin(number_of_iterations=iterations)
+
+@native_call
+def sharpen_triangle_mesh(mesh, iterations, strength):
+    return mesh.filter_sharpen(number_of_iterations=iterations, strength=strength)
+
+@native_call
+def simplify_triangle_mesh(mesh, method, num_of_triangles, boundary_weight, voxel_size, distance, contraction):
+    if method == 'quadric_decimation':
+        return mesh.simplify_quadric_decimation(num_of_triangles, boundary_weight=boundary_weight)
+    if method == 'vertex_clustering':
+        if contraction == 'Average':
+            contraction_method = o3d.geometry.SimplificationContraction.Average
+        else:
+            contraction_method = o3d.geometry.SimplificationContraction.Quadric
+        return mesh.simplify_vertex_clustering(voxel_size, contraction=contraction_method)
+    # merge_close_vertices works in place
+    mesh_new = copy.deepcopy(mesh)
+    mesh_new = mesh_new.merge_close_vertices(distance)
+    mesh_new = mesh_new.remove_degenerate_triangles()
+    mesh_new = mesh_new.remove_duplicated_triangles()
+    return mesh_new
+
+@native_call
+def subdivide_triangle_mesh(mesh, method, iterations):
+    if method == 'loop':
+        return mesh.subdivide_loop(number_of_iterations=iterations)
+    return mesh.subdivide_midpoint(number_of_iterations=iterations)
+
+@native_call
+def sample_triangle_mesh(mesh, method, normal_method, points_num, seed, init_factor):
+    if normal_method == 'TRIANGLES':
+        use_triangle_normal = True
+    elif normal_method == 'VERTEX':
+        use_triangle_normal = False
+        mesh = copy.deepcopy(mesh)
+        mesh.compute_vertex_normals()
+    else:
+        use_triangle_normal = False
+    if method == 'POISSON':
+        return mesh.sample_points_poisson_disk(
+            points_num,
+            init_factor=init_factor,
+            use_triangle_normal=use_triangle_normal,
+            seed=seed)
+    return mesh.sample_points_uniformly(
+        number_of_points=points_num,
+        use_triangle_normal=use_triangle_normal,
+        seed=seed)
+
+@native_call
+def triangle_mesh_from_point_cloud(pcd, method, alpha, radius, depth, scale, density_filter, n_threads):
+    '''Reconstructed mesh and Poisson densities (empty for the other methods)'''
+    vals = []
+    if method != 'ALPHA' and not pcd.has_normals():
+        # estimate normals over a copy, the input point cloud is shared with other nodes
+        pcd = copy.deepcopy(pcd)
+        pcd.estimate_normals()
+    if method == 'ALPHA':
+        mesh = o3d.geometry.TriangleMesh.create_from_point_cloud_alpha_shape(pcd, alpha)
+    elif method == 'BALL_PIVOTING':
+        radi = o3d.utility.DoubleVector(np.array([radius]))
+        mesh = o3d.geometry.TriangleMesh.create_from_point_cloud_ball_pivoting(pcd, radi)
+    else:
+        mesh, vals = o3d.geometry.TriangleMesh.create_from_point_cloud_poisson(pcd, depth=depth, scale=scale, n_threads=n_threads)
+        vals = np.array(vals)
+        if density_filter > 0:
+            mask = vals < density_filter
+            mesh.remove_vertices_by_mask(mask)
+            vals = vals[np.invert(mask)]
+    return mesh, vals
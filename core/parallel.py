@@ -0,0 +1,113 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Transport of geometry between processes.
+# The arguments and results of a task are walked, geometries and NumPy arrays are
+# replaced by small references and their buffers are packed in one shared memory
+# block, so only the references (and scalars) are pickled.
+
+ALIGNMENT = 64
+
+class ArrayRef:
+    def __init__(self, index):
+        self.index = index
+
+class GeometryRef:
+    def __init__(self, kind, names, first):
+        self.kind = kind
+        self.names = names
+        self.first = first
+
+def pack_arrays(arrays):
+    '''Copy the arrays into a new shared memory block. Returns the block and the layout to read them'''
+    layout, size = [], 0
+    for arr in arrays:
+        size = -(-size // ALIGNMENT) * ALIGNMENT
+        layout.append((arr.dtype.str, arr.shape, size))
+        size += arr.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for arr, (dtype, shape, offset) in zip(arrays, layout):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = arr
+    return shm, layout
+
+def unpack_arrays(shm, layout):
+    '''Views of the arrays in the block, delete them before closing it'''
+    return [np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset) for dtype, shape, offset in layout]
+
+def encode(value, arrays, describe):
+    '''
+    Replace geometries and arrays with references, their buffers are appended to arrays.
+    describe(value) returns (kind, dict of attributes) for geometries and None otherwise
+    '''
+    description = describe(value)
+    if description is not None:
+        kind, attributes = description
+        ref = GeometryRef(kind, list(attributes), len(arrays))
+        arrays.extend(np.asarray(arr) for arr in attributes.values())
+        return ref
+    if isinstance(value, np.ndarray):
+        arrays.append(value)
+        return ArrayRef(len(arrays) - 1)
+    if isinstance(value, tuple):
+        return tuple(encode(v, arrays, describe) for v in value)
+    if isinstance(value, list):
+        return [encode(v, arrays, describe) for v in value]
+    if isinstance(value, dict):
+        return {k: encode(v, arrays, describe) for k, v in value.items()}
+    return value
+
+def decode(value, arrays, build):
+    '''
+    Inverse of encode. build(kind, dict of attributes) must copy the views it receives,
+    arrays are copied here
+    '''
+    if isinstance(value, GeometryRef):
+        return build(value.kind, dict(zip(value.names, arrays[value.first:value.first + len(value.names)])))
+    if isinstance(value, ArrayRef):
+        return np.array(arrays[value.index])
+    if isinstance(value, tuple):
+        return tuple(decode(v, arrays, build) for v in value)
+    if isinstance(value, list):
+        return [decode(v, arrays, build) for v in value]
+    if isinstance(value, dict):
+        return {k: decode(v, arrays, build) for k, v in value.items()}
+    return value
+
+def encode_shared(value, describe):
+    '''(encoded value, shared memory block or None, layout)'''
+    arrays = []
+    encoded = encode(value, arrays, describe)
+    if not arrays:
+        return encoded, None, []
+    shm, layout = pack_arrays(arrays)
+    return encoded, shm, layout
+
+def decode_shared(encoded, shm_name, layout, build, unlink=False):
+    if shm_name is None:
+        return decode(encoded, [], build)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arrays = unpack_arrays(shm, layout)
+        value = decode(encoded, arrays, build)
+        del arrays
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+    return value
+
+def call_shared(func, encoded_args, shm_name, layout):
+    '''
+    Worker side of a task: rebuild the Open3D geometries, call func(*args, **kwargs)
+    and send the result back through a new block the caller must unlink
+    '''
+    from .open3d_ops import geometry_from_arrays, geometry_to_arrays
+    args, kwargs = decode_shared(encoded_args, shm_name, layout, geometry_from_arrays)
+    result = func(*args, **kwargs)
+    encoded, shm, out_layout = encode_shared(result, geometry_to_arrays)
+    if shm is None:
+        return encoded, None, []
+    name = shm.name
+    shm.close()
+    return encoded, name, out_layout
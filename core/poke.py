@@ -0,0 +1,350 @@
+import numpy as np
+
+from .attributes import has_attribute
+from .lists import has_element, full_list
+from .triangle_mesh import face_normals, calc_tris_areas
+
+# Poke of many meshes in one pass: the meshes with the same attributes are
+# concatenated and every step works over all their triangles at once, the
+# results are split back using the offset tables of the group.
+
+POKE_ATTRIBUTES = ['vertex_colors', 'vertex_normals', 'triangle_normals', 'triangle_material_ids', 'triangle_uvs']
+
+def _offsets(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+def _segment_ids(counts):
+    '''Index of the segment of every item'''
+    return np.repeat(np.arange(len(counts)), counts)
+
+def _local_index(counts):
+    '''Index of every item inside its segment'''
+    offsets = _offsets(counts)
+    return np.arange(offsets[-1]) - np.repeat(offsets[:-1], counts)
+
+def _full_lists(values, positions, segments):
+    '''
+    Item full_list(values[s], n)[p] for every (p, s) of positions and segments:
+    the position is clamped to the last item of its list
+    '''
+    values = [np.asarray(v) for v in values]
+    lengths = np.array([len(v) for v in values], dtype=np.int64)
+    if np.any(lengths[segments] == 0):
+        raise ValueError('Empty list given to poke')
+    starts = _offsets(lengths)[:-1]
+    non_empty = [v for v in values if len(v) > 0]
+    if not non_empty:
+        return np.zeros(0)
+    return np.concatenate(non_empty)[starts[segments] + np.minimum(positions, lengths[segments] - 1)]
+
+def _split(arr, offsets):
+    '''Views of arr between the offsets (np.split is slow for many small pieces)'''
+    offsets = offsets.tolist()
+    return [arr[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+def _signature(arrays, v_color, mat_id, all_face_normals):
+    return (tuple(name for name in POKE_ATTRIBUTES if has_attribute(arrays, name)),
+            has_element(v_color),
+            len(mat_id) > 0,
+            all_face_normals is not None)
+
+class _PokeLayout:
+    '''Offset tables of a group of concatenated meshes and the scatter to the poked layout'''
+    def __init__(self, v_counts, f_counts, face_mask):
+        face_mesh = _segment_ids(f_counts)
+        self.masked = np.flatnonzero(face_mask)
+        self.unmasked = np.flatnonzero(~face_mask)
+        self.masked_mesh = face_mesh[self.masked]
+        self.k_counts = np.bincount(self.masked_mesh, minlength=len(f_counts))
+        self.u_counts = f_counts - self.k_counts
+        self.v_counts, self.f_counts = v_counts, f_counts
+        self.v_offsets, self.f_offsets = _offsets(v_counts), _offsets(f_counts)
+        self.k_offsets, self.u_offsets = _offsets(self.k_counts), _offsets(self.u_counts)
+        # rank of the masked faces in their mesh
+        self.rank = _local_index(self.k_counts)
+
+    @staticmethod
+    def _interleave(old, new, old_offsets, new_offsets):
+        pieces = []
+        for old_piece, new_piece in zip(_split(old, old_offsets), _split(new, new_offsets)):
+            pieces += [old_piece, new_piece]
+        return np.concatenate(pieces)
+
+    def scatter_vertices(self, old, new):
+        '''Per mesh: its old vertex items followed by one new item per masked face'''
+        return self._interleave(old, new, self.v_offsets, self.k_offsets)
+
+    def scatter_faces(self, old, new):
+        '''Per mesh: items of the unmasked faces followed by three items per masked face'''
+        return self._interleave(old, new, self.u_offsets, 3 * self.k_offsets)
+
+    def split_vertices(self, arr):
+        return _split(arr, self.v_offsets + self.k_offsets)
+
+    def split_faces(self, arr):
+        return _split(arr, self.f_offsets + 2 * self.k_offsets)
+
+def _poke_group(items, relative_offset):
+    '''items: (arrays, mask_in, offset_in, v_color, mat_id, all_face_normals) with the same signature'''
+    arrays_list = [item[0] for item in items]
+    first = arrays_list[0]
+    v_counts = np.array([len(a['vertices']) for a in arrays_list], dtype=np.int64)
+    f_counts = np.array([len(a['triangles']) for a in arrays_list], dtype=np.int64)
+
+    def concat(name):
+        return np.concatenate([a[name] for a in arrays_list])
+
+    np_verts = concat('vertices')
+    np_faces = concat('triangles')
+    mask = np.concatenate([full_list(item[1], f_count) for item, f_count in zip(items, f_counts)]).astype('bool')
+    layout = _PokeLayout(v_counts, f_counts, mask)
+    masked, masked_mesh, rank = layout.masked, layout.masked_mesh, layout.rank
+
+    faces_masked = np_faces[masked]
+    faces_masked_global = faces_masked + layout.v_offsets[masked_mesh, np.newaxis]
+    v_pols = np_verts[faces_masked_global]
+    center = np.sum(v_pols, axis=1) / 3
+    if has_attribute(first, 'triangle_normals'):
+        normals = concat('triangle_normals')[masked]
+    elif items[0][5] is not None:
+        normals = np.concatenate([item[5] for item in items])[masked]
+    else:
+        normals = face_normals(np_verts, faces_masked_global)
+
+    # offset per masked face: one per masked face, one per face or one for all
+    offsets_in = [np.asarray(item[2], dtype='float').ravel() for item in items]
+    off_counts = np.array([len(o) for o in offsets_in], dtype=np.int64)[masked_mesh]
+    face_position = masked - layout.f_offsets[masked_mesh]
+    positions = np.where(off_counts == layout.k_counts[masked_mesh], rank,
+                         np.where(off_counts > 1, face_position, 0))
+    offset = _full_lists(offsets_in, positions, masked_mesh)[:, np.newaxis]
+    if relative_offset:
+        offset = offset * calc_tris_areas(v_pols)[:, np.newaxis]
+    new_vecs = center + normals * offset
+
+    new_faces = np.empty((len(masked), 3, 3), dtype=np_faces.dtype)
+    new_faces[:, :, 0] = faces_masked
+    new_faces[:, :, 1] = np.roll(faces_masked, -1, axis=1)
+    new_faces[:, :, 2] = (v_counts[masked_mesh] + rank)[:, np.newaxis]
+    new_faces_shaped = new_faces.reshape(-1, 3)
+    new_face_mesh = np.repeat(masked_mesh, 3)
+
+    out = {}
+    out['vertices'] = layout.split_vertices(layout.scatter_vertices(np_verts, new_vecs))
+    all_faces = layout.scatter_faces(np_faces[layout.unmasked], new_faces_shaped).astype(np.int32, copy=False)
+    out['triangles'] = layout.split_faces(all_faces)
+
+    def spread_vertex_attrib(name):
+        np_attrib = concat(name)
+        attrib_center = np.sum(np_attrib[faces_masked_global], axis=1) / 3
+        out[name] = layout.split_vertices(layout.scatter_vertices(np_attrib, attrib_center))
+
+    def spread_face_attrib(name):
+        np_attrib = concat(name)
+        attrib = layout.scatter_faces(np_attrib[layout.unmasked], np.repeat(np_attrib[masked], 3, axis=0))
+        out[name] = layout.split_faces(attrib)
+
+    if has_attribute(first, 'vertex_colors'):
+        if has_element(items[0][3]):
+            v_colors = [np.asarray(item[3])[:, :3] for item in items]
+            new_colors = _full_lists(v_colors, rank, masked_mesh)
+            out['vertex_colors'] = layout.split_vertices(layout.scatter_vertices(concat('vertex_colors'), new_colors))
+        else:
+            spread_vertex_attrib('vertex_colors')
+    if has_attribute(first, 'vertex_normals'):
+        spread_vertex_attrib('vertex_normals')
+    if has_attribute(first, 'triangle_normals'):
+        spread_face_attrib('triangle_normals')
+
+    mat_ids = [item[4] for item in items]
+    if len(mat_ids[0]) > 0:
+        if has_attribute(first, 'triangle_material_ids'):
+            new_ids = _full_lists(mat_ids, _local_index(3 * layout.k_counts), new_face_mesh)
+            ids = layout.scatter_faces(concat('triangle_material_ids')[layout.unmasked], new_ids)
+        else:
+            out_counts = f_counts + 2 * layout.k_counts
+            ids = _full_lists(mat_ids, _local_index(out_counts), _segment_ids(out_counts))
+        out['triangle_material_ids'] = layout.split_faces(ids.astype(np.int32))
+    elif has_attribute(first, 'triangle_material_ids'):
+        spread_face_attrib('triangle_material_ids')
+
+    if has_attribute(first, 'triangle_uvs'):
+        uvs = concat('triangle_uvs').reshape(-1, 3, 2)
+        uvs_masked = uvs[masked]
+        new_uvs = np.empty((len(masked), 3, 3, 2), dtype='float')
+        new_uvs[:, :, 0] = uvs_masked
+        new_uvs[:, :, 1] = np.roll(uvs_masked, -1, axis=1)
+        new_uvs[:, :, 2] = (np.sum(uvs_masked, axis=1) / 3)[:, np.newaxis, :]
+        all_uvs = layout.scatter_faces(uvs[layout.unmasked], new_uvs.reshape(-1, 3, 2))
+        out['triangle_uvs'] = [uv.reshape(-1, 2) for uv in layout.split_faces(all_uvs)]
+
+    new_vecs_split = _split(new_vecs, layout.k_offsets)
+    results = []
+    for i, arrays in enumerate(arrays_list):
+        arrays = dict(arrays)
+        for name, split in out.items():
+            arrays[name] = split[i]
+        v_count, u_count, k_count = v_counts[i], layout.u_counts[i], layout.k_counts[i]
+        results.append((arrays,
+                        new_vecs_split[i],
+                        np.arange(v_count, v_count + k_count),
+                        np.arange(u_count, u_count + 3 * k_count)))
+    return results
+
+def poke_triangles_batch(items, relative_offset=False):
+    '''
+    Poke of many meshes, see poke_triangles.
+    items: (arrays, mask_in, offset_in, v_color, mat_id) or with all_face_normals as sixth item
+    returns: list with the result of poke_triangles for every item
+    '''
+    groups = {}
+    for i, item in enumerate(items):
+        item = tuple(item) + (None,) * (6 - len(item))
+        arrays, _, _, v_color, mat_id, all_face_normals = item
+        groups.setdefault(_signature(arrays, v_color, mat_id, all_face_normals), []).append((i, item))
+    results = [None] * len(items)
+    for group in groups.values():
+        for (i, _), result in zip(group, _poke_group([item for _, item in group], relative_offset)):
+            results[i] = result
+    return results
+
+def poke_triangles(arrays, mask_in, offset_in, v_color, mat_id, relative_offset=False, all_face_normals=None):
+    '''
+    Split the masked triangles in three adding a vertex at their centers
+    moved along the face normal.
+    arrays: dict of the mesh attributes, it is not modified
+    returns: new dict (attributes not rewritten are the same objects), new vertices,
+    new vertices indices and new faces indices
+    '''
+    items = [(arrays, mask_in, offset_in, v_color, mat_id, all_face_normals)]
+    return poke_triangles_batch(items, relative_offset=relative_offset)[0]
+
+def _masked_offsets(offset_in, mask):
+    '''Offset of every masked face, with the rules of poke_triangles'''
+    offset_in = np.asarray(offset_in, dtype='float').ravel()
+    faces_num = np.count_nonzero(mask)
+    if len(offset_in) == faces_num:
+        return offset_in
+    if len(offset_in) > 1:
+        return full_list(offset_in, len(mask))[mask]
+    return np.full(faces_num, offset_in[0])
+
+FACE_ITEM_SHAPES = {
+    'triangles': (3,),
+    'triangle_normals': (3,),
+    'triangle_material_ids': (),
+    'triangle_uvs': (3, 2),
+}
+
+def poke_triangles_iterative(arrays, mask_in, offset_in, v_color, mat_id, iterations,
+                             relative_offset=False, all_face_normals=None):
+    '''
+    Poke repeated iterations times, every iteration pokes the faces created by the previous one
+    (they keep the offset of the face they come from).
+    After the first iteration the geometry is written in buffers allocated once with the final size,
+    the poked faces grow 3x per iteration.
+    returns: as poke_triangles, the new vertices of all the iterations and the faces of the last one
+    '''
+    faces_num = len(arrays['triangles'])
+    result = poke_triangles(arrays, mask_in, offset_in, v_color, mat_id,
+                            relative_offset=relative_offset, all_face_normals=all_face_normals)
+    masked_num = len(result[1])
+    if iterations < 2 or masked_num == 0:
+        return result
+    arrays = result[0]
+    orig_verts_num = len(arrays['vertices']) - masked_num
+    unmasked_num = faces_num - masked_num
+    mask = full_list(mask_in, faces_num).astype('bool')
+    offset = np.repeat(_masked_offsets(offset_in, mask), 3)
+
+    growth = 3 ** iterations
+    verts_num = orig_verts_num + masked_num * (growth - 1) // 2
+    last_faces_num = growth * masked_num
+    vertex_names = ['vertices'] + [name for name in ['vertex_colors', 'vertex_normals'] if has_attribute(arrays, name)]
+    face_names = [name for name in FACE_ITEM_SHAPES if has_attribute(arrays, name)]
+    face_arrays = {name: arrays[name].reshape((-1,) + FACE_ITEM_SHAPES[name]) for name in face_names}
+
+    # vertex buffers with the final size, faces of the last iteration are written in the face buffers
+    # and the ones of the iterations in between alternate in two scratch buffers
+    vert_buffers, face_buffers, scratch = {}, {}, [{}, {}]
+    for name in vertex_names:
+        vert_buffers[name] = np.empty((verts_num, 3), dtype=arrays[name].dtype)
+        vert_buffers[name][:orig_verts_num + masked_num] = arrays[name]
+    for name in face_names:
+        shape = FACE_ITEM_SHAPES[name]
+        face_buffers[name] = np.empty((unmasked_num + last_faces_num,) + shape, dtype=arrays[name].dtype)
+        face_buffers[name][:unmasked_num] = face_arrays[name][:unmasked_num]
+        if iterations > 2:
+            for buffers in scratch:
+                buffers[name] = np.empty((growth // 3 * masked_num,) + shape, dtype=arrays[name].dtype)
+
+    verts = vert_buffers['vertices']
+    active = {name: arr[unmasked_num:] for name, arr in face_arrays.items()}
+    v_start = orig_verts_num + masked_num
+    mat_id_given = len(mat_id) > 0
+    v_color_given = has_element(v_color)
+    for level in range(2, iterations + 1):
+        tris = active['triangles']
+        poked_num = len(tris)
+        v_end = v_start + poked_num
+        if level == iterations:
+            target = {name: arr[unmasked_num:] for name, arr in face_buffers.items()}
+        else:
+            target = {name: arr[:3 * poked_num] for name, arr in scratch[level % 2].items()}
+
+        center = verts[v_start:v_end]
+        np.add(verts[tris[:, 0]], verts[tris[:, 1]], out=center)
+        center += verts[tris[:, 2]]
+        center /= 3
+        if 'triangle_normals' in active:
+            normals = active['triangle_normals']
+        else:
+            normals = face_normals(verts, tris)
+        if relative_offset:
+            level_offset = offset * calc_tris_areas(verts[tris])
+        else:
+            level_offset = offset
+        center += normals * level_offset[:, np.newaxis]
+
+        for name in vertex_names[1:]:
+            if name == 'vertex_colors' and v_color_given:
+                vert_buffers[name][v_start:v_end] = full_list(v_color, poked_num)[:, :3]
+            else:
+                attrib = vert_buffers[name]
+                attrib_center = attrib[v_start:v_end]
+                np.add(attrib[tris[:, 0]], attrib[tris[:, 1]], out=attrib_center)
+                attrib_center += attrib[tris[:, 2]]
+                attrib_center /= 3
+
+        new_faces = target['triangles'].reshape(-1, 3, 3)
+        new_faces[:, :, 0] = tris
+        new_faces[:, :, 1] = np.roll(tris, -1, axis=1)
+        new_faces[:, :, 2] = np.arange(v_start, v_end)[:, np.newaxis]
+        if 'triangle_normals' in active:
+            target['triangle_normals'].reshape(-1, 3, 3)[...] = active['triangle_normals'][:, np.newaxis]
+        if 'triangle_material_ids' in active:
+            if mat_id_given:
+                target['triangle_material_ids'][...] = full_list(mat_id, 3 * poked_num)
+            else:
+                target['triangle_material_ids'].reshape(-1, 3)[...] = active['triangle_material_ids'][:, np.newaxis]
+        if 'triangle_uvs' in active:
+            uvs = active['triangle_uvs']
+            new_uvs = target['triangle_uvs'].reshape(-1, 3, 3, 2)
+            new_uvs[:, :, 0] = uvs
+            new_uvs[:, :, 1] = np.roll(uvs, -1, axis=1)
+            new_uvs[:, :, 2] = (np.sum(uvs, axis=1) / 3)[:, np.newaxis]
+
+        active = target
+        offset = np.repeat(offset, 3)
+        v_start = v_end
+
+    arrays = dict(arrays)
+    arrays.update(vert_buffers)
+    for name, arr in face_buffers.items():
+        arrays[name] = arr.reshape(-1, 2) if name == 'triangle_uvs' else arr
+    return (arrays,
+            verts[orig_verts_num:],
+            np.arange(orig_verts_num, verts_num),
+            np.arange(unmasked_num, unmasked_num + last_faces_num))
@@ -0,0 +1,126 @@
+import csv
+import json
+import time
+import threading
+import tracemalloc
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Per node profiling of the updates. Every record holds the wall time of the
+# update, the time spent in Open3D calls (native), the objects and elements
+# read and produced and the peak of the memory traced during the update
+# (NumPy buffers and Python objects, not the Open3D C++ allocations).
+# Disabled by default, then the nodes only pay for a flag check.
+
+FIELDS = ['tree', 'node', 'bl_idname', 'update', 'timestamp',
+          'wall_time', 'native_time',
+          'objects_in', 'elements_in', 'objects_out', 'elements_out',
+          'peak_bytes']
+
+_enabled = False
+_started_tracemalloc = False
+_history = 32
+_records = OrderedDict()
+_updates = {}
+
+_native_lock = threading.Lock()
+_native_seconds = 0.0
+_native_depth = threading.local()
+
+def set_profiling(enabled, history=32):
+    '''Turn the recording on or off, history is the number of updates kept per node'''
+    global _enabled, _history, _started_tracemalloc
+    _history = max(1, history)
+    for key, records in _records.items():
+        _records[key] = deque(records, maxlen=_history)
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    elif not enabled and _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    _enabled = enabled
+
+def is_profiling():
+    return _enabled
+
+@contextmanager
+def native_time():
+    '''Count the time of the block as native, nested blocks are counted once'''
+    global _native_seconds
+    depth = getattr(_native_depth, 'value', 0)
+    if not _enabled or depth:
+        yield
+        return
+    _native_depth.value = 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _native_depth.value = 0
+        with _native_lock:
+            _native_seconds += elapsed
+
+def native_call(func):
+    '''Decorator of the functions calling Open3D'''
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        with native_time():
+            return func(*args, **kwargs)
+    return wrapper
+
+class Measure:
+    '''Wall time, native time and memory peak of a block'''
+    def __enter__(self):
+        self.native_start = _native_seconds
+        self.memory_start = 0
+        if tracemalloc.is_tracing():
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall_time = time.perf_counter() - self.start
+        self.native_time = _native_seconds - self.native_start
+        self.peak_bytes = 0
+        if tracemalloc.is_tracing():
+            self.peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - self.memory_start)
+        return False
+
+def record(tree, node, bl_idname, **values):
+    key = (tree, node)
+    update = _updates.get(key, 0)
+    _updates[key] = update + 1
+    entry = dict(tree=tree, node=node, bl_idname=bl_idname, update=update, timestamp=time.time())
+    entry.update(values)
+    if key not in _records:
+        _records[key] = deque(maxlen=_history)
+    _records[key].append(entry)
+    return entry
+
+def last_record(tree, node):
+    records = _records.get((tree, node))
+    return records[-1] if records else None
+
+def all_records():
+    return [entry for records in _records.values() for entry in records]
+
+def clear():
+    _records.clear()
+    _updates.clear()
+
+def export_json(path):
+    with open(path, 'w') as f:
+        json.dump(all_records(), f, indent=1)
+
+def export_csv(path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(all_records())
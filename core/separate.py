@@ -0,0 +1,53 @@
+import numpy as np
+
+from .attributes import VERTEX_ATTRIBUTES, TRIANGLE_ATTRIBUTES, has_attribute, take_rows
+
+def split_by_cluster(arrays, cluster_ids, cluster_count=None):
+    '''
+    Attribute dicts of every cluster of triangles, without unreferenced vertices.
+    The triangles are sorted by cluster once and every vertex used by a cluster gets its
+    local index from one np.unique over (cluster, vertex) pairs, so the cost does not
+    grow with the number of clusters. The parts are views of the sorted buffers
+    '''
+    tris = np.asarray(arrays['triangles'])
+    vertex_count = len(arrays['vertices'])
+    cluster_ids = np.asarray(cluster_ids, dtype=np.int64)
+    if cluster_count is None:
+        cluster_count = int(cluster_ids.max()) + 1 if len(cluster_ids) else 0
+
+    order = np.argsort(cluster_ids, kind='stable')
+    tri_offsets = np.zeros(cluster_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cluster_ids, minlength=cluster_count), out=tri_offsets[1:])
+    sorted_tris = take_rows(tris, order)
+
+    # (cluster, vertex) keys of every corner, sorted by cluster and then by vertex
+    corner_clusters = np.repeat(np.take(cluster_ids, order), 3)
+    keys = corner_clusters * vertex_count + sorted_tris.ravel()
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    vert_offsets = np.zeros(cluster_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(unique_keys // vertex_count, minlength=cluster_count), out=vert_offsets[1:])
+    local_tris = (inverse.ravel() - vert_offsets[corner_clusters]).astype(np.int32).reshape(-1, 3)
+    source_verts = unique_keys % vertex_count
+
+    vertex_buffers = {'vertices': take_rows(arrays['vertices'], source_verts)}
+    for attribute in VERTEX_ATTRIBUTES:
+        if has_attribute(arrays, attribute):
+            vertex_buffers[attribute] = take_rows(arrays[attribute], source_verts)
+    triangle_buffers = {'triangles': local_tris}
+    for attribute in TRIANGLE_ATTRIBUTES:
+        if has_attribute(arrays, attribute):
+            triangle_buffers[attribute] = take_rows(arrays[attribute], order)
+    uvs = None
+    if has_attribute(arrays, 'triangle_uvs'):
+        uvs = take_rows(arrays['triangle_uvs'].reshape(-1, 3, 2), order)
+
+    parts = []
+    for i in range(cluster_count):
+        v_start, v_end = vert_offsets[i], vert_offsets[i + 1]
+        t_start, t_end = tri_offsets[i], tri_offsets[i + 1]
+        part = {name: buffer[v_start:v_end] for name, buffer in vertex_buffers.items()}
+        part.update({name: buffer[t_start:t_end] for name, buffer in triangle_buffers.items()})
+        if uvs is not None:
+            part['triangle_uvs'] = uvs[t_start:t_end].reshape(-1, 2)
+        parts.append(part)
+    return parts
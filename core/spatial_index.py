@@ -0,0 +1,157 @@
+import numpy as np
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+try:
+    import open3d as o3d
+except ImportError:
+    o3d = None
+
+# KD-tree over the points of a point cloud, built once and shared by the nodes
+# through the derived attributes cache (see utils.derived_attributes).
+# SciPy cKDTree answers whole arrays of queries at once, without SciPy the
+# Open3D KDTreeFlann is used one query at a time.
+# Open3D methods such as estimate_normals build their own tree and can not
+# take this one, the nodes cache their results by the same points fingerprint.
+
+QUERY_CHUNK = 2**16
+# neighbors of a padded radius query (distances and indices take 16 bytes each)
+QUERY_BUDGET = 2**22
+
+class SpatialIndex:
+    '''KD-tree of a points array. Queries over the indexed points include the point itself'''
+    def __init__(self, points, leafsize=16):
+        # own copy: the index must not keep the buffers of the point cloud alive
+        self.points = np.array(points, dtype=np.float64, order='C')
+        if cKDTree is not None:
+            self.tree = cKDTree(self.points, leafsize=leafsize, balanced_tree=False)
+            self.flann = None
+            # points, their permutation and the nodes (about one per leaf)
+            self.nbytes = self.points.nbytes + len(self.points) * 8 + len(self.points) // leafsize * 64
+        else:
+            self.tree = None
+            pcd = o3d.geometry.PointCloud()
+            pcd.points = o3d.utility.Vector3dVector(self.points)
+            self.flann = o3d.geometry.KDTreeFlann(pcd)
+            self.nbytes = 2 * self.points.nbytes
+
+    def __len__(self):
+        return len(self.points)
+
+    def _queries(self, query_points):
+        if query_points is None:
+            return self.points
+        return np.ascontiguousarray(query_points, dtype=np.float64).reshape(-1, 3)
+
+    def knn(self, k, query_points=None, workers=-1):
+        '''(distances, int32 indices) of the k nearest points, shaped (queries, k)'''
+        query_points = self._queries(query_points)
+        k = max(1, min(k, len(self.points)))
+        if self.tree is not None:
+            distances, indices = self.tree.query(query_points, k=[*range(1, k + 1)], workers=workers)
+            return distances, indices.astype(np.int32)
+        distances = np.empty((len(query_points), k))
+        indices = np.empty((len(query_points), k), dtype=np.int32)
+        for i, point in enumerate(query_points):
+            _, found, squared = self.flann.search_knn_vector_3d(point, k)
+            indices[i] = found
+            distances[i] = np.sqrt(squared)
+        return distances, indices
+
+    def radius(self, radius, query_points=None, max_neighbors=0, workers=-1):
+        '''
+        Points within radius of every query, nearest first, as CSR arrays:
+        (int32 indices, distances, offsets), the neighbors of query i are [offsets[i]:offsets[i+1]].
+        max_neighbors > 0 keeps only the nearest ones (hybrid search)
+        '''
+        query_points = self._queries(query_points)
+        if self.tree is None:
+            return self._flann_radius(radius, query_points, max_neighbors)
+        indices, distances, counts = [], [], []
+        for start in range(0, len(query_points), QUERY_CHUNK):
+            chunk = query_points[start:start + QUERY_CHUNK]
+            # the counts give the width of the padded queries, no Python lists are built
+            lengths = self.tree.query_ball_point(chunk, radius, workers=workers, return_length=True)
+            if max_neighbors > 0:
+                lengths = np.minimum(lengths, max_neighbors)
+            # fewer queries at once when some of them find many points, to keep the padding bounded
+            step = max(1, QUERY_BUDGET // max(int(lengths.max(initial=0)), 1))
+            for sub_start in range(0, len(chunk), step):
+                width = int(lengths[sub_start:sub_start + step].max(initial=0))
+                if width == 0:
+                    counts.append(np.zeros(len(chunk[sub_start:sub_start + step]), dtype=np.int64))
+                    continue
+                sub_distances, sub_indices = self.tree.query(
+                    chunk[sub_start:sub_start + step], k=[*range(1, width + 1)],
+                    distance_upper_bound=radius * (1 + 1e-12), workers=workers)
+                found = np.isfinite(sub_distances)
+                counts.append(np.count_nonzero(found, axis=1))
+                indices.append(sub_indices[found].astype(np.int32))
+                distances.append(sub_distances[found])
+        offsets = np.zeros(len(query_points) + 1, dtype=np.int64)
+        if counts:
+            np.cumsum(np.concatenate(counts), out=offsets[1:])
+        return (np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+                np.concatenate(distances) if distances else np.empty(0),
+                offsets)
+
+    def _flann_radius(self, radius, query_points, max_neighbors):
+        indices, distances = [], []
+        offsets = np.zeros(len(query_points) + 1, dtype=np.int64)
+        for i, point in enumerate(query_points):
+            if max_neighbors > 0:
+                count, found, squared = self.flann.search_hybrid_vector_3d(point, radius, max_neighbors)
+            else:
+                count, found, squared = self.flann.search_radius_vector_3d(point, radius)
+            indices.append(np.asarray(found, dtype=np.int32))
+            distances.append(np.sqrt(np.asarray(squared)))
+            offsets[i + 1] = offsets[i] + count
+        return (np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+                np.concatenate(distances) if distances else np.empty(0),
+                offsets)
+
+    def nearest_neighbor_distance(self):
+        '''Distance of every point to the closest other point (as compute_nearest_neighbor_distance)'''
+        if len(self.points) < 2:
+            return np.zeros(len(self.points))
+        distances, _ = self.knn(2)
+        return distances[:, 1]
+
+def knn_to_csr(distances, indices):
+    '''CSR arrays (indices, distances, offsets) of padded knn results'''
+    count, k = indices.shape
+    return indices.ravel(), distances.ravel(), np.arange(0, count * k + 1, k, dtype=np.int64)
+
+def csr_to_padded(indices, distances, offsets, width=None):
+    '''(distances, indices) shaped (queries, width), missing neighbors are inf and -1'''
+    counts = np.diff(offsets)
+    width = int(counts.max(initial=0)) if width is None else width
+    padded_indices = np.full((len(counts), width), -1, dtype=np.int32)
+    padded_distances = np.full((len(counts), width), np.inf)
+    rows = np.repeat(np.arange(len(counts)), counts)
+    columns = np.arange(len(indices)) - np.repeat(offsets[:-1], counts)
+    padded_indices[rows, columns] = indices
+    padded_distances[rows, columns] = distances
+    return padded_distances, padded_indices
+
+def point_statistics(index, density_neighbors=8, percentiles=(5, 25, 50, 75, 95)):
+    '''
+    Statistics of the points from one knn query:
+    (nearest neighbor distances, [mean, std], their percentiles, local density of every point, [min, max] bounds).
+    The density is the density_neighbors nearest points over the volume of the sphere reaching the farthest of them
+    '''
+    points = index.points
+    if len(points) < 2:
+        zeros = np.zeros(len(points))
+        bounds = np.array([points.min(axis=0), points.max(axis=0)]) if len(points) else np.zeros((2, 3))
+        return zeros, np.zeros(2), np.zeros(len(percentiles)), zeros, bounds
+    distances, _ = index.knn(density_neighbors + 1)
+    nn_distance = np.ascontiguousarray(distances[:, 1])
+    reach = distances[:, -1]
+    neighbors = distances.shape[1] - 1
+    with np.errstate(divide='ignore'):
+        density = neighbors / (4 / 3 * np.pi * reach ** 3)
+    mean_std = np.array([nn_distance.mean(), nn_distance.std()])
+    bounds = np.array([points.min(axis=0), points.max(axis=0)])
+    return nn_distance, mean_std, np.percentile(nn_distance, percentiles), density, bounds
@@ -0,0 +1,497 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from .native_format import EXTENSION as NATIVE_EXTENSION, read_native_header
+
+# Streaming reader of binary PLY and PCD point files.
+# The vertex records are memory mapped, so only the chunks (or tiles) being read
+# are loaded in memory, decimated and converted to a dict of point cloud attributes.
+
+PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8',
+}
+
+POINT_FIELDS = {
+    'points': ('x', 'y', 'z'),
+    'normals': ('nx', 'ny', 'nz'),
+    'colors': ('red', 'green', 'blue'),
+}
+
+PCD_FIELD_NAMES = {'normal_x': 'nx', 'normal_y': 'ny', 'normal_z': 'nz'}
+
+def _read_header_lines(path, end_marker, max_lines=10000):
+    '''Header lines and the offset of the data'''
+    lines = []
+    with open(path, 'rb') as f:
+        for _ in range(max_lines):
+            line = f.readline()
+            if not line:
+                raise ValueError(f'{path}: header without {end_marker}')
+            text = line.decode('ascii', errors='replace').strip()
+            lines.append(text)
+            if text.split(' ')[0] == end_marker:
+                return lines, f.tell()
+    raise ValueError(f'{path}: header too long')
+
+def read_ply_header(path):
+    '''
+    (format, elements, offset of the data) of a PLY file.
+    elements: (name, count, [(property, dtype or None for lists)])
+    '''
+    lines, offset = _read_header_lines(path, 'end_header')
+    if lines[0] != 'ply':
+        raise ValueError(f'{path} is not a PLY file')
+    ply_format = None
+    elements = []
+    for line in lines[1:]:
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == 'format':
+            ply_format = words[1]
+        elif words[0] == 'element':
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == 'property':
+            byte_order = '>' if ply_format == 'binary_big_endian' else '<'
+            if words[1] == 'list':
+                elements[-1][2].append((words[4], None))
+            else:
+                elements[-1][2].append((words[2], byte_order + PLY_TYPES[words[1]]))
+    return ply_format, elements, offset
+
+def read_ply_vertex_layout(path):
+    '''(structured dtype, vertex count, offset of the first vertex) of a binary PLY'''
+    ply_format, elements, offset = read_ply_header(path)
+    if ply_format not in ('binary_little_endian', 'binary_big_endian'):
+        raise ValueError(f'{path}: streaming needs a binary PLY, found {ply_format}')
+    for name, count, properties in elements:
+        if any(dtype is None for _, dtype in properties):
+            if name == 'vertex':
+                raise ValueError(f'{path}: list properties in the vertices are not supported')
+            raise ValueError(f'{path}: element {name} with lists before the vertices')
+        dtype = np.dtype(properties)
+        if name == 'vertex':
+            return dtype, count, offset
+        offset += count * dtype.itemsize
+    raise ValueError(f'{path}: no vertex element')
+
+def read_pcd_header(path):
+    '''(dict of the header lines, offset of the data) of a PCD file'''
+    lines, offset = _read_header_lines(path, 'DATA')
+    header = {}
+    for line in lines:
+        words = line.split()
+        if words and not words[0].startswith('#'):
+            header[words[0].upper()] = words[1:]
+    return header, offset
+
+def _pcd_point_count(header):
+    if 'POINTS' in header:
+        return int(header['POINTS'][0])
+    return int(header['WIDTH'][0]) * int(header['HEIGHT'][0])
+
+def read_pcd_vertex_layout(path):
+    '''(structured dtype, point count, offset of the first point) of a binary PCD'''
+    header, offset = read_pcd_header(path)
+    if header['DATA'][0] != 'binary':
+        raise ValueError(f'{path}: streaming needs a binary PCD, found {header["DATA"][0]}')
+    fields = header['FIELDS']
+    sizes = header['SIZE']
+    types = header['TYPE']
+    counts = header.get('COUNT', ['1'] * len(fields))
+    properties = []
+    for i, (name, size, kind, count) in enumerate(zip(fields, sizes, types, counts)):
+        name = PCD_FIELD_NAMES.get(name, name)
+        if name == '_' or name in dict(properties):
+            name = f'_padding_{i}'
+        dtype = '<' + {'F': 'f', 'I': 'i', 'U': 'u'}[kind] + size
+        properties.append((name, dtype, (int(count),)) if int(count) > 1 else (name, dtype))
+    return np.dtype(properties), _pcd_point_count(header), offset
+
+def read_header_counts(path):
+    '''
+    (vertex or point count, triangle count) read from the header of the file,
+    None for the counts the format does not store in its header
+    '''
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == NATIVE_EXTENSION:
+        shapes = {block['name']: block['shape'] for block in read_native_header(path)['blocks']}
+        points = shapes.get('vertices', shapes.get('points', [0]))[0]
+        return points, shapes['triangles'][0] if 'triangles' in shapes else None
+    if extension == '.ply':
+        _, elements, _ = read_ply_header(path)
+        counts = {name: count for name, count, _ in elements}
+        return counts.get('vertex'), counts.get('face')
+    if extension == '.pcd':
+        header, _ = read_pcd_header(path)
+        return _pcd_point_count(header), None
+    if extension == '.off':
+        with open(path, 'rb') as f:
+            words = f.readline().split()
+            if words and words[0].endswith(b'OFF') and len(words) < 3:
+                words = f.readline().split()
+            words = [w for w in words if not w.endswith(b'OFF')]
+            return int(words[0]), int(words[1])
+    if extension == '.stl':
+        # binary STL: 80 bytes header and the triangle count, the vertices are not shared
+        with open(path, 'rb') as f:
+            head = f.read(84)
+        if len(head) == 84:
+            triangles = int(np.frombuffer(head[80:84], dtype='<u4')[0])
+            if os.path.getsize(path) == 84 + 50 * triangles:
+                return 3 * triangles, triangles
+    return None, None
+
+class StreamedPoints:
+    '''Memory mapped point records of a binary PLY or PCD file'''
+    def __init__(self, path):
+        self.path = path
+        if str(path).lower().endswith('.pcd'):
+            dtype, count, offset = read_pcd_vertex_layout(path)
+        else:
+            dtype, count, offset = read_ply_vertex_layout(path)
+        if count > 0:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+        names = dtype.names
+        for field in POINT_FIELDS['points']:
+            if field not in names:
+                raise ValueError(f'{path}: no {field} field')
+        self.has_normals = all(field in names for field in POINT_FIELDS['normals'])
+        self.has_colors = all(field in names for field in POINT_FIELDS['colors'])
+        self.packed_rgb = 'rgb' if 'rgb' in names else ('rgba' if 'rgba' in names else None)
+        self._bounds = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def chunk_count(self, chunk_size):
+        return -(-len(self) // chunk_size)
+
+    def chunk_range(self, index, chunk_size):
+        start = index * chunk_size
+        return start, min(start + chunk_size, len(self))
+
+    @staticmethod
+    def _stack(records, fields):
+        out = np.empty((len(records), 3), dtype=np.float64)
+        for i, field in enumerate(fields):
+            out[:, i] = records[field]
+        return out
+
+    def _colors(self, records):
+        if self.has_colors:
+            colors = self._stack(records, POINT_FIELDS['colors'])
+            if records.dtype[POINT_FIELDS['colors'][0]].kind in 'iu':
+                colors /= 255
+            return colors
+        # PCD packs the colors in a float or an integer, 0x00RRGGBB
+        packed = np.ascontiguousarray(records[self.packed_rgb]).view(np.uint32)
+        return np.stack([(packed >> 16) & 255, (packed >> 8) & 255, packed & 255], axis=1) / 255
+
+    def read(self, start, stop, keep=None):
+        '''Attributes of the records from start to stop, keep: optional mask over them'''
+        records = self.records[start:stop]
+        if keep is not None:
+            records = records[keep]
+        arrays = {'points': self._stack(records, POINT_FIELDS['points'])}
+        if self.has_normals:
+            arrays['normals'] = self._stack(records, POINT_FIELDS['normals'])
+        if self.has_colors or self.packed_rgb:
+            arrays['colors'] = self._colors(records)
+        return arrays
+
+    def xy(self, start, stop):
+        records = self.records[start:stop]
+        return np.stack([records['x'], records['y']], axis=1).astype(np.float64)
+
+    def bounds(self, chunk_size):
+        '''(min, max) of the xy coordinates, read in chunks'''
+        if 'xy' not in self._bounds:
+            low, high = np.full(2, np.inf), np.full(2, -np.inf)
+            for i in range(self.chunk_count(chunk_size)):
+                xy = self.xy(*self.chunk_range(i, chunk_size))
+                xy = xy[np.isfinite(xy).all(axis=1)]
+                if len(xy):
+                    low = np.minimum(low, xy.min(axis=0))
+                    high = np.maximum(high, xy.max(axis=0))
+            self._bounds['xy'] = low, high
+        return self._bounds['xy']
+
+    def min_bound(self, chunk_size):
+        '''Minimum of the finite points, read in chunks'''
+        if 'min' not in self._bounds:
+            low = np.full(3, np.inf)
+            for i in range(self.chunk_count(chunk_size)):
+                start, stop = self.chunk_range(i, chunk_size)
+                points = self._stack(self.records[start:stop], POINT_FIELDS['points'])
+                points = points[np.isfinite(points).all(axis=1)]
+                if len(points):
+                    low = np.minimum(low, points.min(axis=0))
+            self._bounds['min'] = low
+        return self._bounds['min']
+
+_streams = OrderedDict()
+MAX_OPEN_STREAMS = 8
+
+def open_stream(path):
+    '''StreamedPoints of the file, reused while the file does not change (keeps the bounds)'''
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    stream = _streams.pop(key, None)
+    if stream is None:
+        stream = StreamedPoints(path)
+    _streams[key] = stream
+    while len(_streams) > MAX_OPEN_STREAMS:
+        _streams.popitem(last=False)
+    return stream
+
+def remove_invalid_points(arrays, remove_nan, remove_infinite):
+    '''Same filters as the options of open3d.io.read_point_cloud'''
+    keep = _valid_points(arrays['points'], remove_nan, remove_infinite)
+    if keep is None:
+        return arrays
+    return {name: arr[keep] for name, arr in arrays.items()}
+
+def _valid_points(points, remove_nan, remove_infinite):
+    '''Mask of the points to keep, None when all of them are kept'''
+    if not (remove_nan or remove_infinite):
+        return None
+    if remove_nan and remove_infinite:
+        keep = np.isfinite(points).all(axis=1)
+    elif remove_nan:
+        keep = ~np.isnan(points).any(axis=1)
+    else:
+        keep = ~np.isinf(points).any(axis=1)
+    return None if keep.all() else keep
+
+def voxel_origin(min_bound, voxel_size):
+    '''Corner of the voxel grid of PointCloud.voxel_down_sample for the min bound of the points'''
+    return np.asarray(min_bound, dtype=np.float64) - voxel_size / 2
+
+def voxel_average(arrays, voxel_size):
+    '''Average of the attributes of the points in every voxel, as PointCloud.voxel_down_sample'''
+    points = arrays['points']
+    if len(points) == 0:
+        return arrays
+    # Open3D puts the min bound half a voxel inside the first voxel
+    keys = np.floor((points - voxel_origin(points.min(axis=0), voxel_size)) / voxel_size).astype(np.int64)
+    _, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    out = {}
+    for name, arr in arrays.items():
+        summed = np.stack([np.bincount(inverse, weights=arr[:, i], minlength=len(counts)) for i in range(3)], axis=1)
+        # Open3D does not normalize the averaged normals either
+        out[name] = summed / counts[:, np.newaxis]
+    return out
+
+# voxel keys pack the cells of the three axes in 21 bits each, around the first cell seen
+KEY_BITS = 21
+KEY_OFFSET = 2**(KEY_BITS - 1)
+
+class VoxelAccumulator:
+    '''
+    Voxel average of a point cloud given in chunks. Keeps the sum of the attributes and
+    the count of points of every occupied voxel, so the memory depends on the voxels and
+    not on the points. The grid starts at origin (give voxel_origin of the bounds of the
+    whole cloud to get the voxels of PointCloud.voxel_down_sample), without it the voxels
+    are aligned to multiples of the voxel size. The voxels met first in a chunk get the next
+    numbers, in key order.
+    The voxel of a key is found in a few sorted runs of (key, voxel): every chunk adds a run
+    of its new keys and runs are merged while a run is not smaller than half the one before,
+    so there are O(log voxels) runs and every key is merged O(log voxels) times.
+    '''
+    def __init__(self, voxel_size, origin=None):
+        self.voxel_size = voxel_size
+        self.origin = None if origin is None else np.asarray(origin, dtype=np.float64)
+        self._base = None
+        self._runs = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._sums = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def nbytes(self):
+        return (sum(keys.nbytes + ids.nbytes for keys, ids in self._runs) + self._counts.nbytes
+                + sum(arr.nbytes for arr in self._sums.values()))
+
+    def _voxel_keys(self, points):
+        if self.origin is not None:
+            points = points - self.origin
+        cells = np.floor(points / self.voxel_size).astype(np.int64)
+        if self._base is None:
+            self._base = cells.min(axis=0)
+        cells -= self._base - KEY_OFFSET
+        if cells.min() < 0 or cells.max() >= 2**KEY_BITS:
+            raise ValueError(f'The cloud spans more than {2**KEY_BITS} voxels along an axis, use a bigger voxel size')
+        return (cells[:, 0] << 2 * KEY_BITS) | (cells[:, 1] << KEY_BITS) | cells[:, 2]
+
+    def _find(self, keys):
+        '''Voxel of every sorted key, -1 for the keys not met yet'''
+        ids = np.full(len(keys), -1, dtype=np.int32)
+        for run_keys, run_ids in self._runs:
+            position = np.minimum(np.searchsorted(run_keys, keys), len(run_keys) - 1)
+            found = run_keys[position] == keys
+            ids[found] = run_ids[position[found]]
+        return ids
+
+    def _add_run(self, keys, ids):
+        self._runs.append((keys, ids))
+        while len(self._runs) > 1 and 2 * len(self._runs[-1][0]) >= len(self._runs[-2][0]):
+            new_keys, new_ids = self._runs.pop()
+            old_keys, old_ids = self._runs.pop()
+            keys = np.concatenate([old_keys, new_keys])
+            order = np.argsort(keys, kind='stable')
+            self._runs.append((keys[order], np.concatenate([old_ids, new_ids])[order]))
+
+    def _reserve(self, size):
+        capacity = len(self._counts)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 1024)
+        self._counts = np.concatenate([self._counts, np.zeros(capacity - len(self._counts), dtype=np.int64)])
+        for name, arr in self._sums.items():
+            self._sums[name] = np.concatenate([arr, np.zeros((capacity - len(arr), 3))])
+
+    def add(self, arrays):
+        '''Accumulate a chunk of attributes, returns the int32 voxel of every point'''
+        points = arrays['points']
+        if len(points) == 0:
+            return np.empty(0, dtype=np.int32)
+        chunk_keys, inverse = np.unique(self._voxel_keys(points), return_inverse=True)
+        inverse = inverse.ravel()
+        ids = self._find(chunk_keys)
+        new = ids < 0
+        new_count = int(np.count_nonzero(new))
+        if new_count:
+            ids[new] = np.arange(self._size, self._size + new_count, dtype=np.int32)
+            # the new keys come sorted from np.unique
+            self._add_run(chunk_keys[new], ids[new])
+        self._reserve(self._size + new_count)
+        for name in arrays:
+            if name not in self._sums:
+                self._sums[name] = np.zeros((len(self._counts), 3))
+        self._size += new_count
+
+        # ids of the chunk voxels are unique, plain fancy indexing adds them
+        self._counts[ids] += np.bincount(inverse, minlength=len(chunk_keys))
+        for name, arr in arrays.items():
+            self._sums[name][ids] += np.stack(
+                [np.bincount(inverse, weights=arr[:, i], minlength=len(chunk_keys)) for i in range(3)], axis=1)
+        return ids[inverse]
+
+    def result(self):
+        '''Averaged attributes of the voxels (normals are not normalized, as in Open3D)'''
+        counts = self._counts[:self._size, np.newaxis]
+        return {name: arr[:self._size] / counts for name, arr in self._sums.items()}
+
+def read_whole(stream, chunk_size, method='NONE', every_nth=1, voxel_size=1.0,
+               remove_nan=True, remove_infinite=True, trace=False):
+    '''
+    Attributes of the whole stream read chunk by chunk and the voxel trace (or None).
+    With the 'VOXEL' method one VoxelAccumulator averages the voxels of the whole file
+    over the grid of PointCloud.voxel_down_sample (a first pass finds the min bound),
+    the trace is then the int32 voxel of every point of the file (-1 for the dropped ones)
+    '''
+    if method != 'VOXEL':
+        parts = [read_chunk(stream, i, chunk_size, method, every_nth, voxel_size, remove_nan, remove_infinite)
+                 for i in range(stream.chunk_count(chunk_size))]
+        parts = [part for part in parts if len(part.get('points', []))]
+        arrays = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]} if parts else {}
+        return arrays, None
+
+    min_bound = stream.min_bound(chunk_size)
+    origin = voxel_origin(min_bound, voxel_size) if np.isfinite(min_bound).all() else None
+    accumulator = VoxelAccumulator(voxel_size, origin)
+    voxels = np.full(len(stream), -1, dtype=np.int32) if trace else None
+    for i in range(stream.chunk_count(chunk_size)):
+        start, stop = stream.chunk_range(i, chunk_size)
+        arrays = stream.read(start, stop)
+        keep = _valid_points(arrays['points'], remove_nan, remove_infinite)
+        if keep is not None:
+            arrays = {name: arr[keep] for name, arr in arrays.items()}
+        chunk_voxels = accumulator.add(arrays)
+        if trace:
+            if keep is None:
+                voxels[start:stop] = chunk_voxels
+            else:
+                voxels[start:stop][keep] = chunk_voxels
+    return accumulator.result(), voxels
+
+def read_chunk(stream, index, chunk_size, method='NONE', every_nth=1, voxel_size=1.0,
+               remove_nan=True, remove_infinite=True):
+    '''
+    Point cloud attributes of the chunk index of the stream.
+    method: 'NONE', 'UNIFORM' (every nth point of the file) or 'VOXEL' (voxel average inside the chunk)
+    '''
+    start, stop = stream.chunk_range(index, chunk_size)
+    keep = None
+    if method == 'UNIFORM':
+        keep = np.arange(start, stop) % every_nth == 0
+    arrays = remove_invalid_points(stream.read(start, stop, keep), remove_nan, remove_infinite)
+    if method == 'VOXEL':
+        arrays = voxel_average(arrays, voxel_size)
+    return arrays
+
+def tile_grid(stream, tile_size, chunk_size):
+    '''(xy origin, tiles along x, tiles along y) of the square tiles covering the stream'''
+    low, high = stream.bounds(chunk_size)
+    if not np.all(np.isfinite(low)):
+        return np.zeros(2), 0, 0
+    tiles = np.maximum(np.ceil((high - low) / tile_size).astype(np.int64), 1)
+    return low, int(tiles[0]), int(tiles[1])
+
+def read_tiles(stream, indices, tile_size, chunk_size, method='NONE', every_nth=1, voxel_size=1.0,
+               remove_nan=True, remove_infinite=True):
+    '''
+    Point cloud attributes of the tiles of the given indices (x + y * tiles along x).
+    The file is read once in chunks, the kept points of every chunk are sorted by tile
+    once and split in the asked tiles, so the cost does not grow with the number of tiles.
+    '''
+    origin, tiles_x, tiles_y = tile_grid(stream, tile_size, chunk_size)
+    indices = list(indices)
+    wanted = np.unique([index for index in indices if 0 <= index < tiles_x * tiles_y]).astype(np.int64)
+    parts = {index: [] for index in wanted.tolist()}
+    chunks = stream.chunk_count(chunk_size) if len(wanted) else 0
+    for i in range(chunks):
+        start, stop = stream.chunk_range(i, chunk_size)
+        cells = np.floor((stream.xy(start, stop) - origin) / tile_size)
+        valid = np.isfinite(cells).all(axis=1)
+        cells = np.minimum(np.where(valid[:, np.newaxis], cells, 0).astype(np.int64), [tiles_x - 1, tiles_y - 1])
+        tile = cells[:, 0] + cells[:, 1] * tiles_x
+        # position of the tile of every point in wanted, -1 for the points left out
+        slot = np.minimum(np.searchsorted(wanted, tile), len(wanted) - 1)
+        slot[(wanted[slot] != tile) | ~valid] = -1
+        if method == 'UNIFORM':
+            slot[np.arange(start, stop) % every_nth != 0] = -1
+        keep = slot >= 0
+        if not keep.any():
+            continue
+        arrays = stream.read(start, stop, keep)
+        slot = slot[keep]
+        valid_points = _valid_points(arrays['points'], remove_nan, remove_infinite)
+        if valid_points is not None:
+            arrays = {name: arr[valid_points] for name, arr in arrays.items()}
+            slot = slot[valid_points]
+        order = np.argsort(slot, kind='stable')
+        arrays = {name: arr[order] for name, arr in arrays.items()}
+        offsets = np.zeros(len(wanted) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(slot, minlength=len(wanted)), out=offsets[1:])
+        for j in np.flatnonzero(offsets[1:] > offsets[:-1]):
+            parts[int(wanted[j])].append({name: arr[offsets[j]:offsets[j + 1]] for name, arr in arrays.items()})
+    tiles_out = []
+    for index in indices:
+        tile_parts = parts.get(index, [])
+        arrays = {name: np.concatenate([part[name] for part in tile_parts]) for name in tile_parts[0]} if tile_parts else {}
+        if method == 'VOXEL':
+            arrays = voxel_average(arrays, voxel_size) if arrays else arrays
+        tiles_out.append(arrays)
+    return tiles_out
@@ -0,0 +1,112 @@
+import numpy as np
+
+from .triangle_mesh import VertexFaceIncidence, calc_vertex_normals
+
+def unique_edges(triangles, vertex_count, return_counts=False):
+    '''Unique edges (sorted pairs) of the triangles, optionally with the number of faces using them'''
+    tris = np.asarray(triangles, dtype=np.int64)
+    half_edges = np.stack([tris, np.roll(tris, -1, axis=1)], axis=2).reshape(-1, 2)
+    half_edges.sort(axis=1)
+    # one int64 key per edge is much faster to unique than rows
+    keys = half_edges[:, 0] * vertex_count + half_edges[:, 1]
+    if return_counts:
+        keys, counts = np.unique(keys, return_counts=True)
+    else:
+        keys = np.unique(keys)
+    edges = np.stack([keys // vertex_count, keys % vertex_count], axis=1)
+    if return_counts:
+        return edges, counts
+    return edges
+
+class MeshTopology:
+    '''
+    Connectivity of a triangle mesh. It depends only on the triangles buffer,
+    so iterative operations build it once and only redo the geometric part.
+    Get it through derived_attributes.mesh_topology to share it between nodes.
+    Edges, one-ring and boundary data are computed the first time they are asked.
+    '''
+    def __init__(self, triangles, vertex_count):
+        self.vertex_count = vertex_count
+        self.incidence = VertexFaceIncidence(triangles, vertex_count)
+        # a view of the incidence copy, the input buffer is not referenced
+        self.triangles = self.incidence.corners.reshape(-1, 3)
+        self._edges = None
+        self._edge_faces_count = None
+        self._one_ring = None
+        self._boundary_verts = None
+
+    @property
+    def face_count(self):
+        return len(self.triangles)
+
+    def vertex_normals(self, verts, weighting='NONE', out=None):
+        '''Face and vertex normals of the given vertex positions'''
+        return calc_vertex_normals(verts, self.triangles, incidence=self.incidence, weighting=weighting, out=out)
+
+    def _calc_edges(self):
+        self._edges, self._edge_faces_count = unique_edges(self.triangles, self.vertex_count, return_counts=True)
+
+    @property
+    def edges(self):
+        '''Unique edges, shape=(n_edges, 2), sorted'''
+        if self._edges is None:
+            self._calc_edges()
+        return self._edges
+
+    @property
+    def edge_faces_count(self):
+        '''Number of faces using each edge'''
+        if self._edges is None:
+            self._calc_edges()
+        return self._edge_faces_count
+
+    @property
+    def boundary_edges(self):
+        '''Mask of the edges used by only one face'''
+        return self.edge_faces_count == 1
+
+    @property
+    def non_manifold_edges(self):
+        '''Mask of the edges used by more than two faces'''
+        return self.edge_faces_count > 2
+
+    @property
+    def boundary_verts(self):
+        '''Mask of the vertices in a boundary edge'''
+        if self._boundary_verts is None:
+            mask = np.zeros(self.vertex_count, dtype=bool)
+            mask[self.edges[self.boundary_edges].ravel()] = True
+            self._boundary_verts = mask
+        return self._boundary_verts
+
+    @property
+    def one_ring(self):
+        '''
+        Neighbor vertices in CSR layout: (indptr, indices),
+        neighbors of vertex i are indices[indptr[i]:indptr[i + 1]]
+        '''
+        if self._one_ring is None:
+            edges = self.edges
+            starts = np.concatenate([edges[:, 0], edges[:, 1]])
+            ends = np.concatenate([edges[:, 1], edges[:, 0]])
+            order = np.argsort(starts, kind='stable')
+            indptr = np.zeros(self.vertex_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(starts, minlength=self.vertex_count), out=indptr[1:])
+            self._one_ring = (indptr, ends[order])
+        return self._one_ring
+
+    def neighbors(self, vertex):
+        indptr, indices = self.one_ring
+        return indices[indptr[vertex]:indptr[vertex + 1]]
+
+    def valences(self):
+        return np.diff(self.one_ring[0])
+
+    @property
+    def nbytes(self):
+        arrays = [self.incidence.corners, self._edges, self._edge_faces_count, self._boundary_verts]
+        if self._one_ring is not None:
+            arrays.extend(self._one_ring)
+        for name in ['order', 'indptr', 'indices']:
+            arrays.append(getattr(self.incidence, name, None))
+        return sum(arr.nbytes for arr in arrays if arr is not None)
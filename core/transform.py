@@ -0,0 +1,74 @@
+import numpy as np
+
+from .lists import full_list_cycle
+
+def apply_matrix(verts, matrix):
+    '''Apply a 4x4 matrix (mathutils.Matrix or array like) to (n, 3) vertices'''
+    np_matrix = np.asarray(matrix, dtype=np.float64)
+    return verts @ np_matrix[:3, :3].T + np_matrix[:3, 3]
+
+def vector_transform(af_verts, transformation, transformation_mode, iterations, coeff):
+    '''MATRIX, VECTOR and VECTOR_FIELD modes, af_verts is modified in place'''
+    if transformation_mode == 'MATRIX':
+        matrix = transformation
+        for i in range(iterations):
+            af_verts += (apply_matrix(af_verts, matrix)-af_verts)*coeff[i%len(coeff)]
+    elif transformation_mode == 'VECTOR':
+        offset_verts = full_list_cycle(np.array(transformation), af_verts.shape[0])
+        for i in range(iterations):
+            af_verts += offset_verts * coeff[i%len(coeff)]
+    elif transformation_mode == 'VECTOR_FIELD':
+        for i in range(iterations):
+            i_coeff = coeff[i%len(coeff)]
+            xs, ys, zs = transformation.evaluate_grid(af_verts[:, 0], af_verts[:, 1], af_verts[:, 2])
+            af_verts[:, 0] += xs * i_coeff
+            af_verts[:, 1] += ys * i_coeff
+            af_verts[:, 2] += zs * i_coeff
+
+    return af_verts
+
+
+def number_transform(topology, transformation, verts, np_mask, use_mask, iterations, coeff, first_normals=None):
+    '''Move the vertices along their normals by a number per vertex, verts is modified in place'''
+    if len(transformation) == len(verts) and use_mask:
+        offset_vals = (np.array(transformation)[np_mask])[:, np.newaxis]
+    else:
+        if use_mask:
+            offset_vals = full_list_cycle(np.array(transformation), verts[np_mask].shape[0])[:, np.newaxis]
+        else:
+            offset_vals = full_list_cycle(np.array(transformation), verts.shape[0])[:, np.newaxis]
+
+
+    # topology does not change between iterations, only the normals are recomputed
+    normals_buffer = None
+    for i in range(iterations):
+        if i == 0 and first_normals is not None:
+            v_normals = first_normals
+        else:
+            if normals_buffer is None:
+                normals_buffer = np.empty_like(verts)
+            _, v_normals = topology.vertex_normals(verts, out=normals_buffer)
+        if use_mask:
+            verts[np_mask] += v_normals[np_mask] * offset_vals * coeff[i%len(coeff)]
+        else:
+            verts += v_normals * offset_vals * coeff[i%len(coeff)]
+    return verts
+
+def scalar_field_transform(topology, transformation, verts, np_mask, use_mask, iterations, coeff, first_normals=None):
+    '''Move the vertices along their normals by the value of a scalar field, verts is modified in place'''
+    # topology does not change between iterations, only the normals are recomputed
+    normals_buffer = None
+    for i in range(iterations):
+        if i == 0 and first_normals is not None:
+            v_normals = first_normals
+        else:
+            if normals_buffer is None:
+                normals_buffer = np.empty_like(verts)
+            _, v_normals = topology.vertex_normals(verts, out=normals_buffer)
+        if use_mask:
+            offset_vals = transformation.evaluate_grid(verts[np_mask, 0], verts[np_mask, 1], verts[np_mask, 2])
+            verts[np_mask] += v_normals[np_mask] * offset_vals[:, np.newaxis] * coeff[i%len(coeff)]
+        else:
+            offset_vals = transformation.evaluate_grid(verts[:, 0], verts[:, 1], verts[:, 2])
+            verts += v_normals * offset_vals[:, np.newaxis] * coeff[i%len(coeff)]
+    return verts
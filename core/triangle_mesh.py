@@ -0,0 +1,143 @@
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+except ImportError:
+    csr_matrix = None
+
+def normalize_v3(arr):
+    ''' Normalize in place a numpy array of 3 component vectors shape=(n,3), zero length vectors are kept '''
+    lens = np.sqrt(np.einsum('ij,ij->i', arr, arr))
+    lens[lens == 0] = 1
+    arr /= lens[:, np.newaxis]
+    return arr
+
+class VertexFaceIncidence:
+    '''
+    Which triangle corners touch each vertex. Depends only on the topology so it can be
+    built once and reused while the vertices move (iterative transforms).
+    Vertex accumulation is a sparse matrix product (scipy) or np.bincount, never np.add.at
+    '''
+    def __init__(self, np_faces, vertex_count):
+        self.vertex_count = vertex_count
+        self.face_count = len(np_faces)
+        # own copy, so caches holding the incidence do not keep the faces buffer alive
+        self.corners = np.array(np_faces, dtype=np.intp).ravel()
+        if csr_matrix is not None:
+            # corners sorted by vertex give the CSR layout of the (vertices x faces) matrix
+            self.order = np.argsort(self.corners, kind='stable')
+            self.indptr = np.zeros(vertex_count + 1, dtype=np.intp)
+            np.cumsum(np.bincount(self.corners, minlength=vertex_count), out=self.indptr[1:])
+            self.indices = self.order // 3
+            self._unit_matrices = {}
+
+    def matrix(self, corner_weights=None, dtype=np.float64):
+        '''(vertices x faces) sparse matrix, optionally weighted per corner'''
+        if corner_weights is None:
+            unit = self._unit_matrices.get(np.dtype(dtype))
+            if unit is None:
+                data = np.ones(len(self.corners), dtype=dtype)
+                unit = csr_matrix((data, self.indices, self.indptr), shape=(self.vertex_count, self.face_count))
+                self._unit_matrices[np.dtype(dtype)] = unit
+            return unit
+        data = corner_weights.ravel()[self.order].astype(dtype, copy=False)
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.vertex_count, self.face_count))
+
+    def accumulate(self, face_values, corner_weights=None, out=None):
+        '''Sum to each vertex the values (n_faces, 3) of the faces around it'''
+        if csr_matrix is not None:
+            result = self.matrix(corner_weights, face_values.dtype) @ face_values
+        else:
+            contribution = np.repeat(face_values, 3, axis=0)
+            if corner_weights is not None:
+                contribution *= corner_weights.reshape(-1, 1)
+            result = np.empty((self.vertex_count, 3), dtype=face_values.dtype)
+            for i in range(3):
+                result[:, i] = np.bincount(self.corners, weights=contribution[:, i], minlength=self.vertex_count)
+        if out is None:
+            return np.asarray(result, dtype=face_values.dtype)
+        out[:] = result
+        return out
+
+def _cross(a, b):
+    '''Row wise cross product, faster than np.cross on (n, 3) arrays'''
+    result = np.empty_like(a)
+    result[:, 0] = a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1]
+    result[:, 1] = a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2]
+    result[:, 2] = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    return result
+
+def corner_angles(edges, double_areas):
+    '''Interior angle of every triangle corner, shape=(n_faces, 3). edges[i] goes from corner i to i+1'''
+    angles = np.empty((len(double_areas), 3), dtype=double_areas.dtype)
+    for i in range(3):
+        # both edges leave the corner: the next one and the previous one reversed
+        dot = -np.einsum('ij,ij->i', edges[i], edges[(i + 2) % 3])
+        np.arctan2(double_areas, dot, out=angles[:, i])
+    return angles
+
+def calc_vertex_normals(np_verts, np_faces, incidence=None, weighting='NONE', dtype=None, out=None):
+    '''
+    Face and vertex normals of a triangle mesh.
+    incidence: VertexFaceIncidence to reuse between calls with the same topology
+    weighting: 'NONE' every face counts the same, 'AREA' by face area, 'ANGLE' by corner angle
+    dtype: computation precision (np.float32 halves memory traffic)
+    out: preallocated (n_verts, 3) array to store the vertex normals
+    '''
+    if dtype is not None:
+        np_verts = np.asarray(np_verts, dtype=dtype)
+    if incidence is None:
+        incidence = VertexFaceIncidence(np_faces, len(np_verts))
+    corners = [np_verts[np_faces[:, i]] for i in range(3)]
+    edges = [corners[(i + 1) % 3] - corners[i] for i in range(3)]
+    f_normals = _cross(edges[0], -edges[2])
+    if weighting == 'AREA':
+        # not normalized cross product length is twice the area
+        v_normals = incidence.accumulate(f_normals, out=out)
+        normalize_v3(f_normals)
+    else:
+        double_areas = np.sqrt(np.einsum('ij,ij->i', f_normals, f_normals))
+        normalize_v3(f_normals)
+        weights = corner_angles(edges, double_areas) if weighting == 'ANGLE' else None
+        v_normals = incidence.accumulate(f_normals, corner_weights=weights, out=out)
+    return f_normals, normalize_v3(v_normals)
+
+def calc_normals(triangle_mesh, v_normals=True, output_numpy=True, as_array=False, incidence=None):
+    if as_array:
+        np_verts, np_faces = triangle_mesh
+    else:
+        np_verts = np.asarray(triangle_mesh.vertices)
+        np_faces = np.asarray(triangle_mesh.triangles)
+    if v_normals:
+        f_normals, norm = calc_vertex_normals(np_verts, np_faces, incidence=incidence)
+        if output_numpy:
+            return f_normals, norm
+
+        return f_normals.tolist(), norm.tolist()
+
+    f_normals = face_normals(np_verts, np_faces)
+
+    return f_normals if output_numpy else  f_normals.tolist()
+
+def face_normals(np_verts, np_faces):
+    v_pols = np_verts[np_faces]
+    return normalize_v3(_cross(v_pols[:, 1] - v_pols[:, 0], v_pols[:, 2] - v_pols[:, 0]))
+
+def face_centers(np_verts, np_faces):
+    return np.sum(np_verts[np_faces], axis=1) / 3
+
+def calc_centers(triangle_mesh, output_numpy=True):
+
+    center = face_centers(np.asarray(triangle_mesh.vertices), np.asarray(triangle_mesh.triangles))
+
+    return center if output_numpy else  center.tolist()
+
+def calc_mesh_tris_areas(mesh, output_numpy=True):
+    if output_numpy:
+        return calc_tris_areas(np.asarray(mesh.vertices)[np.asarray(mesh.triangles)])
+    return calc_tris_areas(np.asarray(mesh.vertices)[np.asarray(mesh.triangles)]).tolist()
+
+
+def calc_tris_areas(v_pols):
+    perp = _cross(v_pols[:, 1]- v_pols[:, 0], v_pols[:, 2]- v_pols[:,0])/2
+    return np.linalg.norm(perp, axis=1)/2
@@ -0,0 +1,14 @@
+# Initializer of the worker processes, executed with runpy.run_path.
+# Workers are plain Python processes without Blender: the add-on package is
+# replaced by an empty package with the same path, so its bpy free modules
+# (sverchok_open3d.core...) can be imported without running the add-on __init__.
+import os
+import sys
+import types
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if 'sverchok_open3d' not in sys.modules:
+    package = types.ModuleType('sverchok_open3d')
+    package.__path__ = [ADDON_DIR]
+    sys.modules['sverchok_open3d'] = package
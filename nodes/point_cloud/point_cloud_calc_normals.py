@@ -1,6 +1,5 @@
 
 import numpy as np
-import copy
 import bpy
 from bpy.props import FloatProperty, EnumProperty, BoolProperty, IntProperty
 from mathutils import Matrix
@@ -13,9 +12,11 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 
 from sverchok_open3d.dependencies import open3d as o3d
-from sverchok_open3d.utils.point_cloud import calc_point_cloud_normals
+from sverchok_open3d.utils.cow import to_cow
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.utils.point_cloud import estimated_normals
 
-class SvO3PointCloudCalcNormalsNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3PointCloudCalcNormalsNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ParallelNode):
     """
     Triggers: Point Cloud Calc Normals
     Tooltip:  Calculate Normals of Point Cloud
@@ -64,16 +65,22 @@ class SvO3PointCloudCalcNormalsNode(bpy.types.Node, SverchCustomTreeNode, SvRecu
     def draw_buttons_ext(self, context, layout):
         self.draw_buttons(context, layout)
         layout.prop(self, 'output_numpy')
+        self.draw_parallel(layout)
 
 
     def process_data(self, params):
 
-        point_clouds_out, normals_out = [], []
+        # Open3D estimates the normals over a point cloud with only the points (and the
+        # previous normals to keep the orientation), colors are shared with the input
+        pcds, qualities = [], []
         for pcd, quality in zip(*params):
-            new_pcd = copy.deepcopy(pcd)
+            pcds.append(to_cow(pcd))
+            qualities.append(quality)
 
-            calc_point_cloud_normals(new_pcd, quality, self.normal_method)
-            normals_out.append(np.asarray(new_pcd.normals) if self.output_numpy else np.asarray(new_pcd.normals).tolist())
+        point_clouds_out, normals_out = [], []
+        for new_pcd, normals in zip(pcds, estimated_normals(pcds, qualities, self.normal_method, self.map_objects)):
+            new_pcd.set_attribute('normals', normals)
+            normals_out.append(normals if self.output_numpy else normals.tolist())
             point_clouds_out.append(new_pcd)
 
 
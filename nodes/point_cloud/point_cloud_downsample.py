@@ -12,8 +12,10 @@ from sverchok.utils.sv_logging import sv_logger
 from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.core.open3d_ops import downsample_point_cloud
 
-class SvO3PointCloudDownSampleNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3PointCloudDownSampleNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ParallelNode):
     """
     Triggers: Point Cloud Out
     Tooltip: Point Cloud Out
@@ -52,6 +54,11 @@ class SvO3PointCloudDownSampleNode(bpy.types.Node, SverchCustomTreeNode, SvRecur
         name="Approximate_class",
         default=False,
         update=updateNode)
+    output_numpy: BoolProperty(
+        name="Output NumPy",
+        description="Output the Index as an int32 NumPy array (Python lists are slow for big point clouds)",
+        default=False,
+        update=updateNode)
 
     def sv_init(self, context):
         self.width = 200
@@ -80,28 +87,32 @@ class SvO3PointCloudDownSampleNode(bpy.types.Node, SverchCustomTreeNode, SvRecur
         layout.prop(self, 'list_match')
         layout.prop(self, 'method')
         layout.prop(self, 'approximate_class')
+        if self.method == 'VOXEL_AND_TRACE':
+            layout.prop(self, 'output_numpy')
+        self.draw_parallel(layout)
 
     def rclick_menu(self, context, layout):
         layout.prop_menu_enum(self, "list_match", text="List Match")
 
     def process_data(self, params):
 
-        pcd_out, index_out = [], []
+        calls = []
         for pcd, nth, voxel_size, bbox in zip(*params):
-            if self.method == 'UNIFORM':
-                new_pcd = pcd.uniform_down_sample(nth)
-            elif self.method == 'VOXEL':
-                new_pcd = pcd.voxel_down_sample(voxel_size)
-            else:
+            min_bound, max_bound = None, None
+            if self.method == 'VOXEL_AND_TRACE':
                 np_bbox = np.array(bbox)
                 if len(bbox) <2:
                     raise  Exception('No valid bounding box given')
                 min_bound = np.amin(np_bbox, axis=0)
                 max_bound = np.amax(np_bbox, axis=0)
-                new_pcd, new_index, _ = pcd.voxel_down_sample_and_trace(voxel_size, min_bound, max_bound, approximate_class=self.approximate_class)
-                index_out.append(new_index.tolist())
+            calls.append(((pcd, self.method, nth, voxel_size, min_bound, max_bound, self.approximate_class), {}))
 
+        pcd_out, index_out = [], []
+        for new_pcd, new_index in self.map_objects(downsample_point_cloud, calls):
             pcd_out.append(new_pcd)
+            if self.method == 'VOXEL_AND_TRACE':
+                # original indices of every voxel, padded with -1
+                index_out.append(np.asarray(new_index, dtype=np.int32) if self.output_numpy else new_index.tolist())
 
         return pcd_out, index_out
 
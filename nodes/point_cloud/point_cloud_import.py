@@ -13,8 +13,10 @@ from sverchok.utils.logging import info, exception
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok.utils.dummy_nodes import add_dummy
+from sverchok_open3d.utils.import_cache import import_key, lookup, store
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3PointCloudImportNode(bpy.types.Node, SverchCustomTreeNode):
+class SvO3PointCloudImportNode(bpy.types.Node, SverchCustomTreeNode, SvO3ProfiledNode):
     """
     Triggers: Point Cloud Import
     Tooltip: Point Cloud Import
@@ -59,11 +61,15 @@ class SvO3PointCloudImportNode(bpy.types.Node, SverchCustomTreeNode):
         point_clouds_out = []
         for files in files_s:
             for file in files:
-                pcd = o3d.io.read_point_cloud(
-                    file,
-                    remove_nan_points=self.remove_nan_points,
-                    remove_infinite_points=self.remove_infinite_points,
-                    print_progress=self.print_progress)
+                key = import_key(file, 'point_cloud', dict(remove_nan_points=self.remove_nan_points,
+                                                          remove_infinite_points=self.remove_infinite_points))
+                pcd = lookup(key)
+                if pcd is None:
+                    pcd = store(key, o3d.io.read_point_cloud(
+                        file,
+                        remove_nan_points=self.remove_nan_points,
+                        remove_infinite_points=self.remove_infinite_points,
+                        print_progress=self.print_progress))
                 point_clouds_out.append(pcd)
 
 
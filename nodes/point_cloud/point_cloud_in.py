@@ -14,8 +14,9 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.point_cloud import calc_point_cloud_normals
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3PointCloudInNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3PointCloudInNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: Point Cloud In
     Tooltip: Point Cloud In
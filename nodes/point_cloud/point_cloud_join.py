@@ -1,5 +1,4 @@
 import numpy as np
-import copy
 import bpy
 from mathutils import Matrix
 
@@ -8,8 +7,11 @@ from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode
 from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.cow import CowPointCloud, to_cow, shared_instances
+from sverchok_open3d.core.join import join_point_clouds
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3PointCloudJoinNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3PointCloudJoinNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: O3D Point Cloud Join
     Tooltip: Open3D  Point Cloud Join
@@ -29,35 +31,12 @@ class SvO3PointCloudJoinNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNo
 
     def process_data(self, params):
         pcd_in = params[0]
-        new_pcd = copy.deepcopy(pcd_in[0])
-        new_pcd.points = o3d.utility.Vector3dVector(
-            np.concatenate([np.asarray(pcd.points) for pcd in pcd_in])
-            )
-
-        has_normals = [pcd.has_normals() for pcd in pcd_in]
-        if all(has_normals):
-            new_pcd.normals = o3d.utility.Vector3dVector(
-                np.concatenate([np.asarray(pcd.normals)  for pcd in pcd_in])
-                )
-        elif any(has_normals):
-            new_pcd.normals = o3d.utility.Vector3dVector(
-                np.concatenate([np.asarray(pcd.normals) if pcd.has_normals() else np.zeros((len(pcd.points), 3), dtype='float')  for pcd in pcd_in])
-                )
-
-
-        has_colors = [pcd.has_colors() for pcd in pcd_in]
-        if all(has_colors):
-            new_pcd.colors = o3d.utility.Vector3dVector(
-                np.concatenate([np.asarray(pcd.colors)  for pcd in pcd_in])
-                )
-        elif any(has_colors):
-            new_pcd.colors = o3d.utility.Vector3dVector(
-                np.concatenate([np.asarray(pcd.colors) if pcd.has_colors else np.zeros((len(pcd.colors), 3), dtype='float')
-                                for pcd in pcd_in])
-                )
-
-
-        return [new_pcd]
+        instances = shared_instances(pcd_in)
+        if instances is not None:
+            # instances of one point cloud join by their matrices, the points are not repeated
+            return [instances]
+        joined = join_point_clouds([to_cow(pcd).arrays() for pcd in pcd_in])
+        return [CowPointCloud().update(joined)]
 
 
 
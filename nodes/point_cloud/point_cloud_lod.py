@@ -0,0 +1,150 @@
+import numpy as np
+
+import bpy
+from bpy.props import FloatProperty, EnumProperty, BoolProperty, IntProperty
+
+import sverchok
+from sverchok.node_tree import SverchCustomTreeNode
+from sverchok.data_structure import updateNode
+from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
+
+from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.cow import CowPointCloud
+from sverchok_open3d.utils.derived_attributes import point_cloud_pyramid
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
+from sverchok_open3d.core.lod import select_points, frustum_planes, MAX_DEPTH
+
+class SvO3PointCloudLODNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
+    """
+    Triggers: Point Cloud LOD Octree Budget Display
+    Tooltip: At most Budget voxel averaged points of a Point Cloud, denser close to the camera (cached octree)
+    """
+    bl_idname = 'SvO3PointCloudLODNode'
+    bl_label = 'Point Cloud LOD'
+    bl_icon = 'OUTLINER_OB_POINTCLOUD'
+    sv_icon = 'SV_O3_POINT_CLOUD_OUT'
+    sv_dependencies = ['open3d']
+
+    modes = [
+        ('LEVEL', "Level", "The most detailed octree level that fits in the budget", 0),
+        ('DISTANCE', "Distance", "More detail close to the location", 1),
+        ('CAMERA', "Camera", "More detail close to the camera, only the points in its view", 2),
+    ]
+    def update_sockets(self, context):
+        self.inputs['Location'].hide_safe = self.mode != 'DISTANCE'
+        self.inputs['Camera Matrix'].hide_safe = self.mode != 'CAMERA'
+        updateNode(self, context)
+    mode: EnumProperty(
+        name="Mode",
+        items=modes,
+        default='CAMERA',
+        update=update_sockets)
+    budget: IntProperty(
+        name="Budget",
+        description="Maximum number of points",
+        default=100000, min=1,
+        update=updateNode)
+    depth: IntProperty(
+        name="Depth",
+        description="Octree levels, the finest one splits the bounding cube in 2^Depth voxels per axis",
+        default=10, min=1, max=MAX_DEPTH,
+        update=updateNode)
+    field_of_view: FloatProperty(
+        name="Field of View",
+        description="Camera angle along the larger side of the image",
+        default=np.radians(39.6), min=0.001, max=np.pi - 0.001,
+        subtype='ANGLE',
+        update=updateNode)
+    aspect_ratio: FloatProperty(
+        name="Aspect Ratio",
+        description="Image width over height",
+        default=16 / 9, min=0.001,
+        update=updateNode)
+    clip_end: FloatProperty(
+        name="Clip End",
+        default=1000.0, min=0.0,
+        update=updateNode)
+    output_numpy: BoolProperty(
+        name="Output NumPy",
+        description="Output NumPy arrays (Python lists are slow for big point clouds)",
+        default=True,
+        update=updateNode)
+
+    def sv_init(self, context):
+        self.width = 200
+        self.inputs.new('SvO3PointCloudSocket', 'O3D Point Cloud').is_mandatory = True
+        budget = self.inputs.new('SvStringsSocket', "Budget")
+        budget.prop_name = 'budget'
+        budget.nesting_level = 1
+        budget.pre_processing = 'ONE_ITEM'
+        location = self.inputs.new('SvVerticesSocket', "Location")
+        location.nesting_level = 3
+        location.default_mode = 'EMPTY_LIST'
+        location.hide_safe = True
+        camera = self.inputs.new('SvMatrixSocket', "Camera Matrix")
+        camera.nesting_level = 1
+        camera.default_mode = 'EMPTY_LIST'
+
+        self.outputs.new('SvO3PointCloudSocket', 'O3D Point Cloud')
+        self.outputs.new('SvVerticesSocket', "Vertices")
+        self.outputs.new('SvVerticesSocket', "Normals")
+        self.outputs.new('SvColorSocket', "Colors")
+        self.outputs.new('SvStringsSocket', "Level")
+
+    def draw_buttons(self, context, layout):
+        layout.prop(self, 'mode')
+        layout.prop(self, 'depth')
+        if self.mode == 'CAMERA':
+            layout.prop(self, 'field_of_view')
+            layout.prop(self, 'aspect_ratio')
+
+    def draw_buttons_ext(self, context, layout):
+        layout.prop(self, 'list_match')
+        self.draw_buttons(context, layout)
+        if self.mode == 'CAMERA':
+            layout.prop(self, 'clip_end')
+        layout.prop(self, 'output_numpy')
+
+    def rclick_menu(self, context, layout):
+        layout.prop_menu_enum(self, "list_match", text="List Match")
+
+    def view(self, location, camera):
+        '''(eye, frustum planes) of the mode, None when not given'''
+        if self.mode == 'DISTANCE' and len(location):
+            return np.asarray(location[0], dtype=np.float64), None
+        if self.mode == 'CAMERA' and np.shape(camera) == (4, 4):
+            matrix = np.array(camera, dtype=np.float64)
+            planes = frustum_planes(matrix, self.field_of_view, self.aspect_ratio, far=self.clip_end)
+            return matrix[:3, 3], planes
+        return None, None
+
+    def process_data(self, params):
+        # the pyramid is cached by the points (and colors and normals) buffers,
+        # moving the camera only runs the selection
+        pcd_out, verts_out, normals_out, colors_out, level_out = [], [], [], [], []
+        for pcd, budget, location, camera in zip(*params):
+            pyramid = point_cloud_pyramid(pcd, self.depth)
+            eye, planes = self.view(location, camera)
+            arrays, levels = select_points(pyramid, int(budget), eye, planes)
+            pcd_out.append(CowPointCloud.from_arrays(**arrays))
+
+            colors = arrays.get('colors')
+            if colors is not None and self.outputs['Colors'].is_linked:
+                colors_a = np.ones((colors.shape[0], 4))
+                colors_a[:, :3] = colors
+                colors = colors_a
+            for out, arr in ((verts_out, arrays['points']), (normals_out, arrays.get('normals')),
+                             (colors_out, colors), (level_out, levels)):
+                if arr is None:
+                    out.append([])
+                else:
+                    out.append(arr if self.output_numpy else arr.tolist())
+
+        return pcd_out, verts_out, normals_out, colors_out, level_out
+
+
+def register():
+    bpy.utils.register_class(SvO3PointCloudLODNode)
+
+def unregister():
+    bpy.utils.unregister_class(SvO3PointCloudLODNode)
@@ -13,8 +13,10 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.cow import to_o3d
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3PointCloudMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3PointCloudMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: O3D Point Cloud Mask
     Tooltip: Point Cloud Mask
@@ -60,6 +62,7 @@ class SvO3PointCloudMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNo
         pcd_out = []
 
         for pcd, indexes, mask in zip(*params):
+            pcd = to_o3d(pcd)
 
             if self.filter_method == 'INDEX':
                 new_pcd = pcd.select_by_index(indexes)
@@ -0,0 +1,133 @@
+import numpy as np
+
+import bpy
+from bpy.props import FloatProperty, EnumProperty, BoolProperty, IntProperty
+
+import sverchok
+from sverchok.node_tree import SverchCustomTreeNode
+from sverchok.data_structure import updateNode
+from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
+
+from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.derived_attributes import point_cloud_index
+from sverchok_open3d.utils.parallel import get_worker_count
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
+from sverchok_open3d.core.spatial_index import knn_to_csr, csr_to_padded
+
+class SvO3PointCloudNeighborsNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
+    """
+    Triggers: KNN Radius Nearest Neighbors
+    Tooltip: Nearest neighbors of query points in a Point Cloud (KNN, radius or hybrid search)
+    """
+    bl_idname = 'SvO3PointCloudNeighborsNode'
+    bl_label = 'Point Cloud Neighbors'
+    bl_icon = 'OUTLINER_OB_POINTCLOUD'
+    sv_icon = 'SV_KDT_POINTS'
+    sv_dependencies = ['open3d']
+
+    modes = [
+        ('KNN', "KNN", "The K nearest points", 0),
+        ('RADIUS', "Radius", "Every point closer than the radius", 1),
+        ('HYBRID', "Hybrid", "At most K points closer than the radius", 2),
+    ]
+    output_formats = [
+        ('PADDED', "Padded", "One row per query, filled with -1 indices and inf distances", 0),
+        ('CSR', "CSR", "Flat indices and distances, the neighbors of query i are between Offsets[i] and Offsets[i+1]", 1),
+    ]
+    def update_sockets(self, context):
+        self.inputs['K'].hide_safe = self.mode == 'RADIUS'
+        self.inputs['Radius'].hide_safe = self.mode == 'KNN'
+        self.outputs['Offsets'].hide_safe = self.output_format != 'CSR'
+        updateNode(self, context)
+    mode: EnumProperty(
+        name="Mode",
+        items=modes,
+        default='KNN',
+        update=update_sockets)
+    output_format: EnumProperty(
+        name="Format",
+        items=output_formats,
+        default='PADDED',
+        update=update_sockets)
+    k: IntProperty(
+        name="K",
+        description="Neighbors per query (maximum in hybrid mode)",
+        default=8, min=1,
+        update=updateNode)
+    radius: FloatProperty(
+        name="Radius",
+        default=0.1, min=0.0,
+        update=updateNode)
+    output_numpy: BoolProperty(
+        name="Output NumPy",
+        description="Output NumPy arrays (Python lists are slow for big point clouds)",
+        default=True,
+        update=updateNode)
+
+    def sv_init(self, context):
+        self.width = 200
+        self.inputs.new('SvO3PointCloudSocket', 'O3D Point Cloud').is_mandatory = True
+        queries = self.inputs.new('SvVerticesSocket', "Vertices")
+        queries.nesting_level = 3
+        queries.default_mode = 'EMPTY_LIST'
+        k = self.inputs.new('SvStringsSocket', "K")
+        k.prop_name = 'k'
+        k.nesting_level = 1
+        k.pre_processing = 'ONE_ITEM'
+        radius = self.inputs.new('SvStringsSocket', "Radius")
+        radius.prop_name = 'radius'
+        radius.nesting_level = 1
+        radius.pre_processing = 'ONE_ITEM'
+        radius.hide_safe = True
+
+        self.outputs.new('SvStringsSocket', "Indices")
+        self.outputs.new('SvStringsSocket', "Distances")
+        self.outputs.new('SvStringsSocket', "Offsets").hide_safe = True
+
+    def draw_buttons(self, context, layout):
+        layout.prop(self, 'mode')
+        layout.prop(self, 'output_format')
+
+    def draw_buttons_ext(self, context, layout):
+        layout.prop(self, 'list_match')
+        self.draw_buttons(context, layout)
+        layout.prop(self, 'output_numpy')
+
+    def rclick_menu(self, context, layout):
+        layout.prop_menu_enum(self, "list_match", text="List Match")
+
+    def process_data(self, params):
+        # without query points every point of the cloud looks for its neighbors
+        workers = get_worker_count()
+        indices_out, distances_out, offsets_out = [], [], []
+        for pcd, vertices, k, radius in zip(*params):
+            index = point_cloud_index(pcd)
+            query_points = np.asarray(vertices, dtype=np.float64) if len(vertices) else None
+            if self.mode == 'KNN':
+                distances, indices = index.knn(int(k), query_points, workers=workers)
+                offsets = []
+                if self.output_format == 'CSR':
+                    indices, distances, offsets = knn_to_csr(distances, indices)
+            else:
+                max_neighbors = int(k) if self.mode == 'HYBRID' else 0
+                indices, distances, offsets = index.radius(radius, query_points, max_neighbors, workers=workers)
+                if self.output_format == 'PADDED':
+                    distances, indices = csr_to_padded(indices, distances, offsets)
+                    offsets = []
+            if self.output_numpy:
+                indices_out.append(indices)
+                distances_out.append(distances)
+                offsets_out.append(offsets)
+            else:
+                indices_out.append(indices.tolist())
+                distances_out.append(distances.tolist())
+                offsets_out.append(offsets if isinstance(offsets, list) else offsets.tolist())
+
+        return indices_out, distances_out, offsets_out
+
+
+def register():
+    bpy.utils.register_class(SvO3PointCloudNeighborsNode)
+
+def unregister():
+    bpy.utils.unregister_class(SvO3PointCloudNeighborsNode)
@@ -11,8 +11,11 @@ from sverchok.data_structure import updateNode, zip_long_repeat, fullList
 from sverchok.utils.sv_logging import sv_logger
 from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.derived_attributes import nearest_neighbor_distance
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
+from sverchok_open3d.utils.cow import CowInstances
 
-class SvO3PointCloudOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3PointCloudOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: Point Cloud Out
     Tooltip: Point Cloud Out
@@ -36,6 +39,16 @@ class SvO3PointCloudOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNod
         name="Output Numpy",
         default=False,
         update=updateNode)
+    def update_sockets(self, context):
+        if 'Matrices' not in self.outputs:
+            self.outputs.new('SvMatrixSocket', "Matrices")
+        self.outputs['Matrices'].hide_safe = self.expand_instances
+        updateNode(self, context)
+    expand_instances: BoolProperty(
+        name="Expand Instances",
+        description="Output instances as flat point clouds, otherwise output their shared point cloud once and their matrices",
+        default=True,
+        update=update_sockets)
 
     def sv_init(self, context):
         self.width = 180
@@ -45,13 +58,22 @@ class SvO3PointCloudOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNod
         self.outputs.new('SvVerticesSocket', "Normals")
         self.outputs.new('SvColorSocket', "Colors")
         self.outputs.new('SvStringsSocket', "Nearest Neighbor Distance")
+        self.outputs.new('SvMatrixSocket', "Matrices").hide_safe = True
     def draw_buttons_ext(self, context, layout):
         layout.prop(self, 'output_numpy')
+        layout.prop(self, 'expand_instances')
 
     def process_data(self, params):
 
-        verts_out, normals_out, color_out, near_distance = [], [], [], []
+        verts_out, normals_out, color_out, near_distance, matrices_out = [], [], [], [], []
         for pcd in params[0]:
+            if isinstance(pcd, CowInstances) and not self.expand_instances:
+                # viewers repeat the points for every matrix, the flat buffers are never built
+                matrices_out.append([Matrix(matrix) for matrix in pcd.matrices])
+                pcd = pcd.base
+            else:
+                # one list of matrices per object, the rest are drawn once where they are
+                matrices_out.append([Matrix()])
             if self.outputs['Vertices'].is_linked:
                 verts_out.append(np.asarray(pcd.points) if self.output_numpy else np.asarray(pcd.points).tolist())
             if pcd.has_normals and self.outputs['Normals'].is_linked:
@@ -66,14 +88,14 @@ class SvO3PointCloudOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNod
             else:
                 color_out.append([])
             if self.outputs['Nearest Neighbor Distance'].is_linked:
-                near_distance.append(
-                    np.asarray(pcd.compute_nearest_neighbor_distance())
-                    if self.output_numpy else
-                    np.asarray(pcd.compute_nearest_neighbor_distance()).tolist())
+                distances = nearest_neighbor_distance(pcd)
+                near_distance.append(distances if self.output_numpy else distances.tolist())
 
 
 
-        return verts_out, normals_out, color_out, near_distance
+        results = verts_out, normals_out, color_out, near_distance, matrices_out
+        # nodes saved before the Matrices output
+        return results if 'Matrices' in self.outputs else results[:-1]
 
 
 
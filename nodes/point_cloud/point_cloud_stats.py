@@ -0,0 +1,86 @@
+import numpy as np
+
+import bpy
+from bpy.props import BoolProperty, IntProperty
+
+import sverchok
+from sverchok.node_tree import SverchCustomTreeNode
+from sverchok.data_structure import updateNode
+from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
+
+from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.derived_attributes import point_cloud_statistics
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
+
+DEFAULT_PERCENTILES = [5, 25, 50, 75, 95]
+
+class SvO3PointCloudStatsNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
+    """
+    Triggers: Point Cloud Statistics Density Distance
+    Tooltip: Nearest neighbor distance statistics, local density and bounds of a Point Cloud
+    """
+    bl_idname = 'SvO3PointCloudStatsNode'
+    bl_label = 'Point Cloud Statistics'
+    bl_icon = 'OUTLINER_OB_POINTCLOUD'
+    sv_icon = 'SV_O3_POINT_CLOUD_OUT'
+    sv_dependencies = ['open3d']
+
+    density_neighbors: IntProperty(
+        name="Density Neighbors",
+        description="Neighbors counted in the sphere that gives the local density of every point",
+        default=8, min=1,
+        update=updateNode)
+    output_numpy: BoolProperty(
+        name="Output NumPy",
+        description="Output NumPy arrays",
+        default=True,
+        update=updateNode)
+
+    def sv_init(self, context):
+        self.inputs.new('SvO3PointCloudSocket', 'O3D Point Cloud').is_mandatory = True
+        neighbors = self.inputs.new('SvStringsSocket', "Density Neighbors")
+        neighbors.prop_name = 'density_neighbors'
+        neighbors.nesting_level = 1
+        neighbors.pre_processing = 'ONE_ITEM'
+        percentiles = self.inputs.new('SvStringsSocket', "Percentiles")
+        percentiles.nesting_level = 2
+        percentiles.default_mode = 'EMPTY_LIST'
+
+        self.outputs.new('SvStringsSocket', "Mean Distance")
+        self.outputs.new('SvStringsSocket', "Std Distance")
+        self.outputs.new('SvStringsSocket', "Percentiles")
+        self.outputs.new('SvStringsSocket', "NN Distance")
+        self.outputs.new('SvStringsSocket', "Density")
+        self.outputs.new('SvVerticesSocket', "Bounding Box")
+
+    def draw_buttons_ext(self, context, layout):
+        layout.prop(self, 'list_match')
+        layout.prop(self, 'output_numpy')
+
+    def process_data(self, params):
+        # statistics are cached by the points buffer, unchanged point clouds cost a lookup
+        mean_out, std_out, percentiles_out, distance_out, density_out, bbox_out = [], [], [], [], [], []
+        for pcd, density_neighbors, percentiles in zip(*params):
+            nn_distance, mean_std, values, density, bounds = point_cloud_statistics(
+                pcd, int(density_neighbors), percentiles if len(percentiles) else DEFAULT_PERCENTILES)
+            mean_out.append([float(mean_std[0])])
+            std_out.append([float(mean_std[1])])
+            if self.output_numpy:
+                percentiles_out.append(values)
+                distance_out.append(nn_distance)
+                density_out.append(density)
+                bbox_out.append(bounds)
+            else:
+                percentiles_out.append(values.tolist())
+                distance_out.append(nn_distance.tolist())
+                density_out.append(density.tolist())
+                bbox_out.append(bounds.tolist())
+
+        return mean_out, std_out, percentiles_out, distance_out, density_out, bbox_out
+
+
+def register():
+    bpy.utils.register_class(SvO3PointCloudStatsNode)
+
+def unregister():
+    bpy.utils.unregister_class(SvO3PointCloudStatsNode)
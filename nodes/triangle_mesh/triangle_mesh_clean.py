@@ -1,5 +1,4 @@
 
-import copy
 import numpy as np
 
 import bpy
@@ -12,8 +11,10 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import clean_doubled_faces, triangle_mesh_viewer_map
+from sverchok_open3d.utils.cow import to_o3d
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3TriangleMeshCleanNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshCleanNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: Triangle Mesh Clean
     Tooltip: Open3d Triangle Mesh Clean
@@ -83,9 +84,18 @@ class SvO3TriangleMeshCleanNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiv
     def process_data(self, params):
 
         mesh_out = []
+        needs_copy = any([
+            self.normalize_normals, self.orient_triangles,
+            self.remove_duplicated_vertices, self.remove_non_manifold_edges,
+            self.remove_degenerate_triangles, self.remove_duplicated_triangles,
+            self.remove_unreferenced_vertices])
 
         for mesh in params[0]:
-            mn = copy.deepcopy(mesh)
+            if not needs_copy:
+                mesh_out.append(mesh)
+                continue
+            # Open3D cleaning methods work in place
+            mn = to_o3d(mesh, copy_data=True)
 
             if self.normalize_normals:
                 mn = mn.normalize_normals()
@@ -1,5 +1,4 @@
 
-import copy
 import numpy as np
 
 import bpy
@@ -11,8 +10,10 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.cow import to_o3d
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3TriangleMeshDeformAsRigidNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshDeformAsRigidNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: ARAP As Rigid as Possible
     Tooltip: Deforms triangle Mesh as rigid as possible
@@ -86,8 +87,7 @@ class SvO3TriangleMeshDeformAsRigidNode(bpy.types.Node, SverchCustomTreeNode, Sv
         else:
             energy_mode = o3d.geometry.DeformAsRigidAsPossibleEnergy.Smoothed
         for mesh, vert_index, vert_pos, max_iterations, smoothed_alpha in zip(*params):
-            mesh_new = copy.deepcopy(mesh)
-            mesh_new = mesh.deform_as_rigid_as_possible(
+            mesh_new = to_o3d(mesh).deform_as_rigid_as_possible(
                 int_list(np.array(vert_index)),
                 vec_3f(np.array(vert_pos)),
                 max_iterations,
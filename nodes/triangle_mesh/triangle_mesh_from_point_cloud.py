@@ -12,8 +12,12 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.core.open3d_ops import triangle_mesh_from_point_cloud
+from sverchok_open3d.utils.cow import to_cow
+from sverchok_open3d.utils.point_cloud import estimated_normals
 
-class SvO3TriangleMeshFromPointCloudNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshFromPointCloudNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ParallelNode):
     """
     Triggers: Mesh from Point Cloud
     Tooltip: Mesh from Point Cloud
@@ -114,6 +118,7 @@ class SvO3TriangleMeshFromPointCloudNode(bpy.types.Node, SverchCustomTreeNode, S
         layout.prop(self, 'list_match')
         self.draw_buttons(context, layout)
         layout.prop(self, 'n_threads')
+        self.draw_parallel(layout)
 
     def rclick_menu(self, context, layout):
         '''right click sv_menu items'''
@@ -121,27 +126,19 @@ class SvO3TriangleMeshFromPointCloudNode(bpy.types.Node, SverchCustomTreeNode, S
         layout.prop_menu_enum(self, "list_match")
 
     def process_data(self, params):
-
+        params = list(zip(*params))
+        pcds = [param[0] for param in params]
+        if self.method != 'ALPHA':
+            # normals as Open3D would estimate them (30 neighbors), cached with the ones of the Calc Normals node
+            missing = [i for i, pcd in enumerate(pcds) if not pcd.has_normals()]
+            handles = [to_cow(pcds[i]) for i in missing]
+            for i, handle, normals in zip(missing, handles, estimated_normals(handles, [30] * len(handles), 'STANDARD', self.map_objects)):
+                handle.set_attribute('normals', normals)
+                pcds[i] = handle
+        calls = [((pcd, self.method, *param[1:], self.n_threads), {})
+                 for pcd, param in zip(pcds, params)]
         omesh, ovals = [], []
-        for pcd, alpha, radius, depth, scale, density_filter in zip(*params):
-            vals = []
-            if self.method == 'ALPHA':
-                mesh = o3d.geometry.TriangleMesh.create_from_point_cloud_alpha_shape(pcd, alpha)
-            elif self.method == 'BALL_PIVOTING':
-                radi = o3d.utility.DoubleVector(np.array([radius]))
-                if not pcd.has_normals():
-                    pcd.estimate_normals()
-                mesh = o3d.geometry.TriangleMesh.create_from_point_cloud_ball_pivoting(pcd, radi)
-            else:
-                if not pcd.has_normals():
-                    pcd.estimate_normals()
-                mesh, vals = o3d.geometry.TriangleMesh.create_from_point_cloud_poisson(pcd, depth=depth, scale=scale, n_threads=self.n_threads)
-                if density_filter > 0:
-                    vals = np.asarray(vals)
-                    mask = vals < density_filter
-                    mesh.remove_vertices_by_mask(mask)
-                    vals = vals[mask]
-
+        for mesh, vals in self.map_objects(triangle_mesh_from_point_cloud, calls):
             omesh.append(mesh)
             ovals.append(vals)
 
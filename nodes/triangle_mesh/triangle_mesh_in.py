@@ -1,4 +1,3 @@
-import copy
 import numpy as np
 
 import bpy
@@ -13,8 +12,58 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
-
-class SvO3TriangleMeshInNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+from sverchok_open3d.utils.cow import CowTriangleMesh, to_cow
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
+
+def check_offsets(offsets, total, name):
+    np_offsets = np.asarray(offsets, dtype=np.int64).ravel()
+    if (len(np_offsets) < 2 or np_offsets[0] != 0 or np_offsets[-1] != total
+            or np.any(np.diff(np_offsets) < 0)):
+        raise Exception(f'"{name}" must start with 0, be ascending and end with the buffer length ({total})')
+    return np_offsets
+
+def batch_buffer(data, offsets, dtype, name):
+    '''Concatenated attribute buffer aligned with the given offsets'''
+    np_data = np.asarray(data, dtype=dtype)
+    if len(np_data) != offsets[-1]:
+        raise Exception(f'"{name}" length ({len(np_data)}) does not match the offsets ({offsets[-1]})')
+    return np_data
+
+def triangle_meshes_from_buffers(vertices, faces, v_offsets, f_offsets,
+                                 verts_normals=None, verts_colors=None, f_normals=None,
+                                 uvs=None, material_id=None):
+    '''
+    Build one mesh per part out of concatenated (CSR like) buffers.
+    Faces index the concatenated vertices buffer, all the checks and conversions
+    run once over the whole buffers and every mesh holds views of them.
+    '''
+    v_counts = np.diff(v_offsets)
+    f_counts = np.diff(f_offsets)
+    if len(v_counts) != len(f_counts):
+        raise Exception('"Vertex Offsets" and "Face Offsets" define a different number of meshes')
+
+    local_faces = faces - np.repeat(v_offsets[:-1], f_counts)[:, np.newaxis]
+    part_len = np.repeat(v_counts, f_counts)[:, np.newaxis]
+    if np.any(local_faces < 0) or np.any(local_faces >= part_len):
+        raise Exception('Faces reference vertices of other meshes')
+    local_faces = local_faces.astype(np.int32)
+
+    vertex_attribs = {'vertices': vertices, 'vertex_normals': verts_normals, 'vertex_colors': verts_colors}
+    face_attribs = {'triangles': local_faces, 'triangle_normals': f_normals, 'triangle_material_ids': material_id}
+    split_attribs = {}
+    for name, data in vertex_attribs.items():
+        if data is not None:
+            split_attribs[name] = np.split(data, v_offsets[1:-1])
+    for name, data in face_attribs.items():
+        if data is not None:
+            split_attribs[name] = np.split(data, f_offsets[1:-1])
+    if uvs is not None:
+        split_attribs['triangle_uvs'] = np.split(uvs, f_offsets[1:-1] * 3)
+
+    return [CowTriangleMesh.from_arrays(**dict(zip(split_attribs.keys(), arrays)))
+            for arrays in zip(*split_attribs.values())]
+
+class SvO3TriangleMeshInNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: O3D Triangle Mesh In
     Tooltip: Open3D  Triangle Mesh In
@@ -25,7 +74,22 @@ class SvO3TriangleMeshInNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNo
     sv_dependencies = ['open3d']
 
     viewer_map = triangle_mesh_viewer_map
-    
+
+    def update_sockets(self, context):
+        if 'Vertex Offsets' not in self.inputs:
+            self.inputs.new('SvStringsSocket', "Vertex Offsets").nesting_level = 2
+            self.inputs.new('SvStringsSocket', "Face Offsets").nesting_level = 2
+        self.inputs['O3D Triangle Mesh'].hide_safe = self.batch_mode
+        self.inputs['Vertex Offsets'].hide_safe = not self.batch_mode
+        self.inputs['Face Offsets'].hide_safe = not self.batch_mode
+        updateNode(self, context)
+
+    batch_mode: BoolProperty(
+        name="Ragged Buffers",
+        description="Build many meshes from concatenated buffers and offsets (Vertices, Faces and attributes of all the meshes joined, faces indexing the joined vertices)",
+        default=False,
+        update=update_sockets)
+
     def sv_init(self, context):
 
         self.inputs.new('SvO3TriangleMeshSocket', "O3D Triangle Mesh")
@@ -41,65 +105,110 @@ class SvO3TriangleMeshInNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNo
             s.nesting_level = 3
         self.inputs[0].nesting_level = 1
         self.inputs[-1].nesting_level = 2
+        v_offsets = self.inputs.new('SvStringsSocket', "Vertex Offsets")
+        v_offsets.nesting_level = 2
+        v_offsets.hide_safe = True
+        f_offsets = self.inputs.new('SvStringsSocket', "Face Offsets")
+        f_offsets.nesting_level = 2
+        f_offsets.hide_safe = True
 
 
         self.outputs.new('SvO3TriangleMeshSocket', "O3D Triangle Mesh")
+
+    def draw_buttons(self, context, layout):
+        layout.prop(self, 'batch_mode')
+
     def draw_buttons_ext(self, context, layout):
+        self.draw_buttons(context, layout)
         layout.prop(self, 'list_match')
 
     def rclick_menu(self, context, layout):
         layout.prop_menu_enum(self, "list_match", text="List Match")
 
     def pre_setup(self):
+        if self.batch_mode:
+            if not all(self.inputs[name].is_linked for name in ['Vertices', 'Faces', 'Vertex Offsets', 'Face Offsets']):
+                raise Exception('"Vertices", "Faces", "Vertex Offsets" and "Face Offsets" inputs need to be linked')
+            return
         if not (self.inputs['Vertices'].is_linked or self.inputs['O3D Triangle Mesh'].is_linked) and self.outputs['O3D Triangle Mesh'].is_linked:
             raise Exception('"Vertices" or "O3D Triangle Mesh" inputs need to be linked')
 
+    def process_batch(self, params):
+        mesh_out = []
+        for _, vertices, verts_normals, verts_colors, faces, f_normals, uv_verts, uv_faces, material_id, v_offsets, f_offsets in zip(*params):
+            np_vertices = np.asarray(vertices, dtype=np.float64)
+            try:
+                np_faces = np.asarray(faces, dtype=np.int64)
+            except ValueError:
+                raise Exception('Only Triangular Faces Accepted')
+            if np_faces.ndim != 2 or np_faces.shape[1] != 3:
+                raise Exception('Only Triangular Faces Accepted')
+            v_offsets = check_offsets(v_offsets, len(np_vertices), 'Vertex Offsets')
+            f_offsets = check_offsets(f_offsets, len(np_faces), 'Face Offsets')
+
+            attribs = {}
+            if has_element(verts_normals):
+                attribs['verts_normals'] = batch_buffer(verts_normals, v_offsets, np.float64, 'Vertex Normals')
+            if has_element(verts_colors):
+                attribs['verts_colors'] = batch_buffer(np.asarray(verts_colors)[:, :3], v_offsets, np.float64, 'Vertex Colors')
+            if has_element(f_normals):
+                attribs['f_normals'] = batch_buffer(f_normals, f_offsets, np.float64, 'Face Normals')
+            if has_element(uv_verts) and has_element(uv_faces):
+                np_uv_faces = batch_buffer(uv_faces, f_offsets, np.int64, 'UV Faces')
+                attribs['uvs'] = np.asarray(uv_verts, dtype=np.float64)[np_uv_faces][:, :, :2].reshape(-1, 2)
+            if len(material_id) > 0:
+                attribs['material_id'] = batch_buffer(material_id, f_offsets, np.int32, 'Material Id')
+
+            mesh_out.extend(triangle_meshes_from_buffers(np_vertices, np_faces, v_offsets, f_offsets, **attribs))
+
+        return mesh_out
+
     def process_data(self, params):
+        if self.batch_mode:
+            return self.process_batch(params)
 
         mesh_out = []
         matched = numpy_full_list_cycle
-        vec_3f = o3d.utility.Vector3dVector
-        vec_3i = o3d.utility.Vector3iVector
-        for base_mesh, vertices, verts_normals, verts_colors, faces, f_normals, uv_verts, uv_faces, material_id in zip(*params):
+        for base_mesh, vertices, verts_normals, verts_colors, faces, f_normals, uv_verts, uv_faces, material_id in zip(*params[:9]):
             if base_mesh:
-                mesh = copy.deepcopy(base_mesh)
+                # attributes that are not given stay shared with the base mesh
+                mesh = to_cow(base_mesh)
             else:
-                mesh = o3d.geometry.TriangleMesh()
+                mesh = CowTriangleMesh()
 
             if has_element(vertices):
-                np_vertices = np.array(vertices)
-                mesh.vertices = vec_3f(np_vertices)
+                np_vertices = np.array(vertices, dtype=np.float64)
+                mesh.set_attribute('vertices', np_vertices, owned=True)
 
             if has_element(faces):
                 try:
-                    np_triangles = np.array(faces).astype(np.int32)
+                    # int32 as Open3D stores them, to_o3d does not need to convert them again
+                    np_triangles = np.array(faces, dtype=np.int32)
                 except ValueError:
                     raise Exception('Only Triangular Faces Accepted')
-                if np_triangles.shape[1] != 3:
+                if np_triangles.ndim != 2 or np_triangles.shape[1] != 3:
                     raise Exception('Only Triangular Faces Accepted')
-                mesh.triangles = vec_3i(np_triangles)
+                mesh.set_attribute('triangles', np_triangles, owned=True)
 
             vert_len = len(mesh.vertices)
             tri_len = len(mesh.triangles)
             if has_element(verts_normals):
-                mesh.vertex_normals = vec_3f(matched(np.array(verts_normals), vert_len))
+                mesh.set_attribute('vertex_normals', matched(np.array(verts_normals), vert_len), owned=True)
 
             if has_element(verts_colors):
-                mesh.vertex_colors = vec_3f(matched(np.array(verts_colors)[:, :3], vert_len))
+                mesh.set_attribute('vertex_colors', matched(np.array(verts_colors)[:, :3], vert_len), owned=True)
 
             if has_element(f_normals):
-                print(len(f_normals))
-                mesh.triangle_normals = vec_3f(matched(np.array(f_normals), tri_len))
+                mesh.set_attribute('triangle_normals', matched(np.array(f_normals), tri_len), owned=True)
 
             if has_element(uv_verts) and has_element(uv_faces):
                 np_uv_faces = np.array(uv_faces)
                 np_uv_verts = np.array(uv_verts)
                 uvs_0 = np_uv_verts[np_uv_faces][:, :, :2]
-                uvs = o3d.utility.Vector2dVector(matched(uvs_0, tri_len).reshape(-1, 2))
-                mesh.triangle_uvs = uvs
+                mesh.set_attribute('triangle_uvs', matched(uvs_0, tri_len).reshape(-1, 2), owned=True)
 
             if len(material_id) > 0:
-                mesh.triangle_material_ids = o3d.utility.IntVector(matched(np.array(material_id), tri_len))
+                mesh.set_attribute('triangle_material_ids', matched(np.array(material_id), tri_len).astype(np.int32), owned=True)
             mesh_out.append(mesh)
 
         return mesh_out
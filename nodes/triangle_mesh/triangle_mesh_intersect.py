@@ -13,8 +13,10 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.cow import to_o3d
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3TriangleMeshIntersectNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshIntersectNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: O3D Mesh Sampling
     Tooltip: Check if two meshes intersect
@@ -47,7 +49,7 @@ class SvO3TriangleMeshIntersectNode(bpy.types.Node, SverchCustomTreeNode, SvRecu
         bool_list = []
 
         for mesh_a, mesh_b in zip(*params):
-            bool_list.append(mesh_a.is_intersecting(mesh_b))
+            bool_list.append(to_o3d(mesh_a).is_intersecting(to_o3d(mesh_b)))
 
         return bool_list
 
@@ -1,6 +1,5 @@
 
 import numpy as np
-import copy
 import bpy
 from bpy.props import FloatProperty, EnumProperty, BoolProperty, IntProperty
 from mathutils import Matrix
@@ -13,8 +12,11 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.cow import CowTriangleMesh, to_cow, shared_instances
+from sverchok_open3d.core.join import join_triangle_meshes
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3TriangleMeshJoinNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshJoinNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: O3D Triangle Mesh Join
     Tooltip: Open3D  Triangle Mesh Join
@@ -47,66 +49,20 @@ class SvO3TriangleMeshJoinNode(bpy.types.Node, SverchCustomTreeNode, SvRecursive
 
     def process_data(self, params):
         mesh_in = params[0]
-        mesh_out = []
-        new_mesh = copy.deepcopy(mesh_in[0])
-        new_mesh.vertices = o3d.utility.Vector3dVector(
-            np.concatenate([np.asarray(mesh.vertices) for mesh in mesh_in])
-            )
-        triangles_len = np.cumsum([0]+[len(mesh.vertices) for mesh in mesh_in])
-
-        new_mesh.triangles = o3d.utility.Vector3iVector(
-            np.concatenate([np.asarray(mesh.triangles)+offset for mesh, offset in zip(mesh_in, triangles_len)])
-            )
-
-        has_triangle_normals = [mesh.has_triangle_normals for mesh in mesh_in]
-        if all(has_triangle_normals):
-            new_mesh.triangle_normals = o3d.utility.Vector3dVector(
-                np.concatenate([np.asarray(mesh.triangle_normals)  for mesh in mesh_in])
-                )
-        elif self.compute_faces_normals:
-            new_mesh.compute_triangle_normals(normalized=True)
-        #
-        has_vertex_normals = [mesh.has_vertex_normals() for mesh in mesh_in]
-        if all(has_vertex_normals):
-            new_mesh.triangle_normals = o3d.utility.Vector3dVector(
-                np.concatenate([np.asarray(mesh.vertex_normals)  for mesh in mesh_in])
-                )
-        elif self.compute_vertex_normals:
-            new_mesh.compute_vertex_normals(normalized=True)
-
-        has_vertex_colors = [mesh.has_vertex_colors() for mesh in mesh_in]
-        if all(has_vertex_colors):
-            new_mesh.vertex_colors = o3d.utility.Vector3dVector(
-                np.concatenate([np.asarray(mesh.vertex_colors)  for mesh in mesh_in])
-                )
-        elif any(has_vertex_colors):
-            new_mesh.vertex_colors = o3d.utility.Vector3dVector(
-                np.concatenate([np.asarray(mesh.vertex_colors) if mesh.has_vertex_colors else np.zeros((len(mesh.vertices),3), dtype='float')
-                                for mesh in mesh_in])
-                )
-        has_triangle_uvs = [mesh.has_triangle_uvs() for mesh in mesh_in]
-        if all(has_triangle_uvs):
-            new_mesh.triangle_uvs = o3d.utility.Vector2dVector(
-                np.concatenate([np.asarray(mesh.triangle_uvs)  for mesh in mesh_in])
-                )
-        elif any(has_triangle_uvs):
-            new_mesh.triangle_uvs = o3d.utility.Vector2dVector(
-                np.concatenate([np.asarray(mesh.triangle_uvs) if mesh.has_triangle_uvs else np.zeros((len(mesh.triangles)*3, 2), dtype='float')
-                for mesh in mesh_in])
-                )
-
-        has_triangle_material_ids = [mesh.has_triangle_material_ids() for mesh in mesh_in]
-        if all(has_triangle_material_ids):
-            new_mesh.triangle_material_ids = o3d.utility.IntVector(
-                np.concatenate([np.asarray(mesh.triangle_material_ids)  for mesh in mesh_in])
-                )
-        elif any(has_triangle_material_ids):
-            new_mesh.triangle_material_ids = o3d.utility.IntVector(
-                np.concatenate([np.asarray(mesh.triangle_material_ids) if mesh.has_triangle_uvs else np.zeros(len(mesh.triangles), dtype='int')
-                for mesh in mesh_in])
-                )
-
-        return [new_mesh]
+        instances = shared_instances(mesh_in)
+        if instances is not None:
+            # instances of one mesh join by their matrices, the mesh is not repeated
+            base = instances.base
+            if self.compute_vertex_normals or self.compute_faces_normals:
+                base = CowTriangleMesh().update(join_triangle_meshes(
+                    [base.arrays()],
+                    compute_vertex_normals=self.compute_vertex_normals,
+                    compute_faces_normals=self.compute_faces_normals))
+            return [type(instances)(base, instances.matrices)]
+        joined = join_triangle_meshes([to_cow(mesh).arrays() for mesh in mesh_in],
+                                      compute_vertex_normals=self.compute_vertex_normals,
+                                      compute_faces_normals=self.compute_faces_normals)
+        return [CowTriangleMesh().update(joined)]
 
 
 
@@ -6,32 +6,19 @@ from bpy.props import FloatProperty, EnumProperty, BoolProperty, IntProperty
 from mathutils import Matrix
 
 import sverchok
-import copy
 from sverchok.node_tree import SverchCustomTreeNode
-from sverchok.data_structure import updateNode, zip_long_repeat, numpy_full_list
+from sverchok.data_structure import updateNode, zip_long_repeat
 from sverchok.utils.sv_logging import sv_logger
 from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.cow import to_cow
+from sverchok_open3d.core.mask import calc_full_mask
+from sverchok_open3d.utils.derived_attributes import mask_engine
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-def calc_full_mask(mask, index, filter_method, invert, length):
-    if filter_method == 'INDEX':
-        if invert:
-            full_mask = np.zeros(length, dtype='bool')
-            full_mask[np.array(index)] = True
-        else:
-            full_mask = np.ones(length, dtype='bool')
-            full_mask[np.array(index)] = False
-    else:
-        if invert:
-            full_mask = numpy_full_list(np.array(mask).astype(bool), length)
-        else:
-            full_mask = numpy_full_list(np.invert(np.array(mask).astype(bool)), length)
-    return full_mask
-
-
-class SvO3TriangleMeshMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: O3D Mesh Sampling
     Tooltip: Points over Open3d mesh. Mesh to Point Cloud
@@ -52,6 +39,10 @@ class SvO3TriangleMeshMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursive
         ('MASK', "Mask", "Mask", 1),
     ]
     def update_sockets(self, context):
+        # nodes saved before the index outputs
+        if 'Triangle Indices' not in self.outputs:
+            self.outputs.new('SvStringsSocket', "Triangle Indices")
+            self.outputs.new('SvStringsSocket', "Vertex Indices")
         self.inputs['Index'].hide_safe = self.filter_method != 'INDEX'
         self.inputs['Mask'].hide_safe = self.filter_method != 'MASK'
         updateNode(self, context)
@@ -77,6 +68,11 @@ class SvO3TriangleMeshMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursive
         name="Index",
         default=0,
         update=updateNode)
+    output_numpy: BoolProperty(
+        name="Output NumPy",
+        description="Output NumPy arrays",
+        default=True,
+        update=updateNode)
 
 
     def sv_init(self, context):
@@ -90,6 +86,8 @@ class SvO3TriangleMeshMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursive
         mask.nesting_level = 2
 
         self.outputs.new('SvO3TriangleMeshSocket', "O3D Triangle Mesh")
+        self.outputs.new('SvStringsSocket', "Triangle Indices")
+        self.outputs.new('SvStringsSocket', "Vertex Indices")
 
     def draw_buttons(self, context, layout):
         layout.prop(self, 'method')
@@ -99,6 +97,7 @@ class SvO3TriangleMeshMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursive
             layout.prop(self, 'remove_unreferenced_vertices')
     def draw_buttons_ext(self, context, layout):
         layout.prop(self, 'list_match')
+        layout.prop(self, 'output_numpy')
 
     def rclick_menu(self, context, layout):
         '''right click sv_menu items'''
@@ -108,25 +107,35 @@ class SvO3TriangleMeshMaskNode(bpy.types.Node, SverchCustomTreeNode, SvRecursive
 
 
     def process_data(self, params):
-
-        mesh_out = []
-
+        # the engine is cached by the triangles buffer and remembers the last mask,
+        # the mesh is only built when its socket is linked
+        mesh_out, triangles_out, vertices_out = [], [], []
+        build_mesh = self.outputs['O3D Triangle Mesh'].is_linked
+        has_indices = 'Triangle Indices' in self.outputs
         for mesh, index, mask in zip(*params):
-            new_mesh = copy.deepcopy(mesh)
-
+            engine = mask_engine(mesh)
             if self.method == 'TRIANGLES':
                 full_mask = calc_full_mask(mask, index, self.filter_method, self.invert, len(mesh.triangles))
-                new_mesh.remove_triangles_by_mask(full_mask)
-                if self.remove_unreferenced_vertices:
-                    new_mesh.remove_unreferenced_vertices()
             else:
                 full_mask = calc_full_mask(mask, index, self.filter_method, self.invert, len(mesh.vertices))
-                new_mesh.remove_vertices_by_mask(full_mask)
-
-            mesh_out.append(new_mesh)
-
+            triangle_indices, vertex_indices = engine.view(self.method, full_mask, self.remove_unreferenced_vertices)
+            if build_mesh:
+                new_mesh = to_cow(mesh)
+                # untouched buffers stay shared with the input
+                new_mesh.update(engine.gather(new_mesh.arrays(), triangle_indices, vertex_indices))
+                mesh_out.append(new_mesh)
+            if not has_indices:
+                continue
+            if self.output_numpy:
+                triangles_out.append(triangle_indices)
+                vertices_out.append(vertex_indices)
+            else:
+                triangles_out.append(triangle_indices.tolist())
+                vertices_out.append(vertex_indices.tolist())
 
-        return mesh_out
+        if not has_indices:
+            return mesh_out
+        return mesh_out, triangles_out, vertices_out
 
 
 
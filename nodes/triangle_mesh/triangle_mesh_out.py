@@ -2,21 +2,23 @@
 import numpy as np
 
 import bpy
-from bpy.props import  BoolVectorProperty
+from bpy.props import  BoolVectorProperty, BoolProperty
 from mathutils import Matrix
 
 import sverchok
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, zip_long_repeat, fullList
 from sverchok.utils.sv_logging import sv_logger
-from sverchok.utils.sv_mesh_utils import polygons_to_edges_np
 from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
-from sverchok_open3d.utils.triangle_mesh import calc_normals, calc_centers, calc_mesh_tris_areas
+from sverchok_open3d.utils.derived_attributes import (
+    derived_cache, face_normals, vertex_and_face_normals, face_centers, face_areas, unique_edges)
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
+from sverchok_open3d.utils.cow import CowInstances
 
-class SvO3TriangleMeshOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: O3D Triangle Mesh Out
     Tooltip: O3D Triangle Mesh Out
@@ -32,6 +34,16 @@ class SvO3TriangleMeshOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveN
         description="Output NumPy arrays",
         # default=default_np,
         size=11, update=updateNode)
+    def update_sockets(self, context):
+        if 'Matrices' not in self.outputs:
+            self.outputs.new('SvMatrixSocket', "Matrices")
+        self.outputs['Matrices'].hide_safe = self.expand_instances
+        updateNode(self, context)
+    expand_instances: BoolProperty(
+        name="Expand Instances",
+        description="Output instances as flat geometry, otherwise output their shared geometry once and their matrices",
+        default=True,
+        update=update_sockets)
     def sv_init(self, context):
         self.inputs.new('SvO3TriangleMeshSocket', "O3D Triangle Mesh").is_mandatory = True
 
@@ -46,13 +58,16 @@ class SvO3TriangleMeshOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveN
         self.outputs.new('SvVerticesSocket', "UV Verts")
         self.outputs.new('SvStringsSocket', "UV Faces")
         self.outputs.new('SvStringsSocket', "Material Id")
-
+        self.outputs.new('SvMatrixSocket', "Matrices").hide_safe = True
 
     def draw_buttons_ext(self, context, layout):
+        layout.prop(self, 'expand_instances')
         layout.label(text="Ouput Numpy:")
         r = layout.column()
-        for i in range(len(self.outputs)):
+        for i in range(len(self.out_np)):
             r.prop(self, "out_np", index=i, text=self.outputs[i].name, toggle=True)
+        stats = derived_cache.stats()
+        layout.label(text=f"Derived cache: {stats['hits']} hits, {stats['misses']} misses")
 
     def process_data(self, params):
         outputs = self.outputs
@@ -62,16 +77,24 @@ class SvO3TriangleMeshOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveN
         edges_out = []
         faces_out, f_normals_out, f_centers_out, f_areas_out = [], [], [], []
         uv_verts_out, uv_faces_out, material_id_out = [], [], []
+        matrices_out = []
 
         for mesh in mesh_s:
+            if isinstance(mesh, CowInstances) and not self.expand_instances:
+                # viewers repeat the geometry for every matrix, the flat buffers are never built
+                matrices_out.append([Matrix(matrix) for matrix in mesh.matrices])
+                mesh = mesh.base
+            else:
+                # one list of matrices per object, the rest are drawn once where they are
+                matrices_out.append([Matrix()])
             if outputs['Vertices'].is_linked:
                 vertices_out.append(np.asarray(mesh.vertices) if self.out_np[0] else np.asarray(mesh.vertices).tolist())
 
             if (outputs['Faces'].is_linked or outputs['Edges'].is_linked) and mesh.has_triangles():
                 tris = np.asarray(mesh.triangles)
                 if  outputs['Edges'].is_linked:
-                    edges = polygons_to_edges_np([tris], unique_edges=True, output_numpy=self.out_np[1])[0]
-                    edges_out.append(edges)
+                    edges = unique_edges(mesh)
+                    edges_out.append(edges if self.out_np[1] else edges.tolist())
                 if  outputs['Faces'].is_linked:
                     faces_out.append(tris if self.out_np[2] else tris.tolist())
             else:
@@ -82,9 +105,9 @@ class SvO3TriangleMeshOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveN
             needs_f_normal_calc = needs_v_normal_calc or (outputs['Face Normal'].is_linked and not mesh.has_triangle_normals())
             if needs_f_normal_calc:
                 if needs_v_normal_calc:
-                    face_normals, v_normals = calc_normals(mesh, v_normals=True)
+                    f_normals, v_normals = vertex_and_face_normals(mesh)
                 else:
-                    face_normals = calc_normals(mesh, v_normals=False)
+                    f_normals = face_normals(mesh)
 
             if outputs['Vertex Normal'].is_linked:
                 if mesh.has_vertex_normals():
@@ -105,13 +128,15 @@ class SvO3TriangleMeshOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveN
                 if mesh.has_triangle_normals():
                     f_normals_out.append(np.asarray(mesh.triangle_normals) if self.out_np[5] else np.asarray(mesh.triangle_normals).tolist())
                 else:
-                    f_normals_out.append(face_normals if self.out_np[5] else face_normals.tolist())
+                    f_normals_out.append(f_normals if self.out_np[5] else f_normals.tolist())
 
 
             if outputs['Face Center'].is_linked:
-                f_centers_out.append(calc_centers(mesh, output_numpy=self.out_np[6]))
+                centers = face_centers(mesh)
+                f_centers_out.append(centers if self.out_np[6] else centers.tolist())
             if outputs['Face Area'].is_linked:
-                f_areas_out.append(calc_mesh_tris_areas(mesh, output_numpy=self.out_np[7]))
+                areas = face_areas(mesh)
+                f_areas_out.append(areas if self.out_np[7] else areas.tolist())
 
             if mesh.has_triangle_uvs() and (outputs['UV Verts'].is_linked or outputs['UV Faces'].is_linked):
                 uvs = np.asarray(mesh.triangle_uvs)
@@ -130,11 +155,13 @@ class SvO3TriangleMeshOutNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveN
                 material_id_out.append([])
 
 
-        return (vertices_out, edges_out, faces_out,
-                verts_normals_out, verts_colors_out,
-                f_normals_out, f_centers_out, f_areas_out,
-                uv_verts_out, uv_faces_out,
-                material_id_out)
+        results = (vertices_out, edges_out, faces_out,
+                   verts_normals_out, verts_colors_out,
+                   f_normals_out, f_centers_out, f_areas_out,
+                   uv_verts_out, uv_faces_out,
+                   material_id_out, matrices_out)
+        # nodes saved before the Matrices output
+        return results if 'Matrices' in outputs else results[:-1]
 
 def register():
     bpy.utils.register_class(SvO3TriangleMeshOutNode)
@@ -1,5 +1,4 @@
 
-import copy
 import bpy
 from bpy.props import EnumProperty, IntProperty
 from mathutils import Matrix
@@ -10,8 +9,10 @@ from sverchok.data_structure import updateNode
 from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.core.open3d_ops import sample_triangle_mesh
 
-class SvO3TriangleMeshSamplingNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshSamplingNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ParallelNode):
     """
     Triggers: O3D Mesh Sampling
     Tooltip: Points over Open3d mesh. Mesh to Point Cloud
@@ -80,38 +81,15 @@ class SvO3TriangleMeshSamplingNode(bpy.types.Node, SverchCustomTreeNode, SvRecur
         self.draw_buttons(context, layout)
         if self.method == 'POISSON':
             layout.prop(self, 'init_factor')
+        self.draw_parallel(layout)
 
     def rclick_menu(self, context, layout):
         layout.prop_menu_enum(self, "list_match", text="List Match")
 
     def process_data(self, params):
-
-        pcd_out = []
-
-        for mesh, points_num, seed in zip(*params):
-
-            if self.normal_method == 'TRIANGLES':
-                use_triangle_normal = True
-            elif self.normal_method == 'VERTEX':
-                use_triangle_normal = False
-                mesh = copy.deepcopy(mesh)
-                mesh.compute_vertex_normals()
-            else:
-                use_triangle_normal = False
-            if self.method == 'POISSON':
-                pcd = mesh.sample_points_poisson_disk(
-                    points_num,
-                    init_factor=self.init_factor,
-                    use_triangle_normal=use_triangle_normal,
-                    seed=seed)
-            else:
-                pcd = mesh.sample_points_uniformly(
-                    number_of_points=points_num,
-                    use_triangle_normal=use_triangle_normal,
-                    seed=seed)
-            pcd_out.append(pcd)
-
-        return pcd_out
+        calls = [((mesh, self.method, self.normal_method, points_num, seed, self.init_factor), {})
+                 for mesh, points_num, seed in zip(*params)]
+        return self.map_objects(sample_triangle_mesh, calls)
 
 
 
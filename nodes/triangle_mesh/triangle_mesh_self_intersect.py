@@ -13,8 +13,10 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.cow import to_o3d
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3TriangleMeshSelfIntersectNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshSelfIntersectNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: Triangle Mesh Sharpen
     Tooltip: Open3d Triangle Mesh Sharpen
@@ -60,6 +62,7 @@ class SvO3TriangleMeshSelfIntersectNode(bpy.types.Node, SverchCustomTreeNode, Sv
 
         self_intersect, intersecting_tris = [], []
         for mesh in params[0]:
+            mesh = to_o3d(mesh)
             is_self_intersecting = mesh.is_self_intersecting()
             self_intersect.append(is_self_intersecting)
             if is_self_intersecting:
@@ -4,7 +4,6 @@ import numpy as np
 import bpy
 from bpy.props import FloatProperty, EnumProperty, BoolProperty, IntProperty
 from mathutils import Matrix
-import copy
 import sverchok
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, zip_long_repeat, fullList
@@ -13,8 +12,12 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.cow import CowTriangleMesh, to_cow, to_o3d
+from sverchok_open3d.core.open3d_ops import cluster_connected_triangles
+from sverchok_open3d.core.separate import split_by_cluster
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
-class SvO3TriangleMeshSeparateNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshSeparateNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: Separate Loose Parts
     Tooltip: Open3d Triangle Mesh Separate Loose Parts
@@ -48,22 +51,16 @@ class SvO3TriangleMeshSeparateNode(bpy.types.Node, SverchCustomTreeNode, SvRecur
 
         mesh_out, area_out, number_out = [], [], []
         for mesh in params[0]:
-            meshes = []
-            indexes, number, area = mesh.cluster_connected_triangles()
+            indexes, number, area = cluster_connected_triangles(to_o3d(mesh))
             if self.join:
-                area_out.extend(np.asarray(area).tolist())
-                number_out.extend(np.asarray(number).tolist())
+                area_out.extend(area.tolist())
+                number_out.extend(number.tolist())
             else:
-                area_out.append(np.asarray(area).tolist())
-                number_out.append(np.asarray(number).tolist())
-            np_indexes = np.asarray(indexes)
-            for i, a in enumerate(area):
-                new_mesh = copy.deepcopy(mesh)
-                new_mesh.remove_triangles_by_mask(np_indexes!=i)
-                new_mesh.remove_unreferenced_vertices()
-
-
-                meshes.append(new_mesh)
+                area_out.append(area.tolist())
+                number_out.append(number.tolist())
+            # all the parts come from one sort of the triangles, not from a copy of the mesh per part
+            meshes = [CowTriangleMesh.from_arrays(**arrays)
+                      for arrays in split_by_cluster(to_cow(mesh).arrays(), indexes, len(number))]
             if self.join:
                 mesh_out.extend(meshes)
             else:
@@ -12,9 +12,11 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.core.open3d_ops import sharpen_triangle_mesh
 
 
-class SvO3TriangleMeshSharpenNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshSharpenNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ParallelNode):
     """
     Triggers: Triangle Mesh Sharpen
     Tooltip: Open3d Triangle Mesh Sharpen
@@ -52,6 +54,7 @@ class SvO3TriangleMeshSharpenNode(bpy.types.Node, SverchCustomTreeNode, SvRecurs
 
     def draw_buttons_ext(self, context, layout):
         layout.prop(self, 'list_match')
+        self.draw_parallel(layout)
 
 
     def rclick_menu(self, context, layout):
@@ -60,16 +63,16 @@ class SvO3TriangleMeshSharpenNode(bpy.types.Node, SverchCustomTreeNode, SvRecurs
 
     def process_data(self, params):
 
-        mesh_out = []
-
-        for mesh, iterations, strength in zip(*params):
-            if iterations < 1:
-                mesh_new = mesh
-            else:
-                mesh_new = mesh.filter_sharpen(number_of_iterations=iterations, strength=strength)
-
-            mesh_out.append(mesh_new)
+        mesh_out = [mesh for mesh, *_ in zip(*params)]
+        # meshes with no iterations are passed through
+        indices, calls = [], []
+        for i, (mesh, iterations, strength) in enumerate(zip(*params)):
+            if iterations > 0:
+                indices.append(i)
+                calls.append(((mesh, iterations, strength), {}))
 
+        for i, mesh_new in zip(indices, self.map_objects(sharpen_triangle_mesh, calls)):
+            mesh_out[i] = mesh_new
 
         return mesh_out
 
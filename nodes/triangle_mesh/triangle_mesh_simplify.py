@@ -4,7 +4,6 @@ import numpy as np
 import bpy
 from bpy.props import FloatProperty, EnumProperty, BoolProperty, IntProperty
 from mathutils import Matrix
-import copy
 import sverchok
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, zip_long_repeat, fullList
@@ -13,9 +12,11 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.core.open3d_ops import simplify_triangle_mesh
 
 
-class SvO3TriangleMeshSimplifyNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshSimplifyNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ParallelNode):
     """
     Triggers: O3D Mesh Sampling
     Tooltip: Points over Open3d mesh. Mesh to Point Cloud
@@ -94,34 +95,16 @@ class SvO3TriangleMeshSimplifyNode(bpy.types.Node, SverchCustomTreeNode, SvRecur
     def draw_buttons_ext(self, context, layout):
         layout.prop(self, 'list_match')
         self.draw_buttons(context, layout)
+        self.draw_parallel(layout)
 
     def rclick_menu(self, context, layout):
         layout.prop_menu_enum(self, "list_match", text="List Match")
 
 
     def process_data(self, params):
-
-        mesh_out = []
-
-        for mesh, num_of_triangles, boundary_weight, voxel_size, distance in zip(*params):
-            mesh_new = copy.deepcopy(mesh)
-            if self.method == 'quadric_decimation':
-                mesh_new = mesh_new.simplify_quadric_decimation(num_of_triangles, boundary_weight=boundary_weight)
-
-            elif self.method == 'vertex_clustering':
-                if self.contraction == 'Average':
-                    contraction = o3d.geometry.SimplificationContraction.Average
-                else:
-                    contraction = o3d.geometry.SimplificationContraction.Quadric
-                mesh_new = mesh_new.simplify_vertex_clustering(voxel_size, contraction=contraction)
-            else:
-                mesh_new = mesh_new.merge_close_vertices(distance)
-                mesh_new = mesh_new.remove_degenerate_triangles()
-                mesh_new = mesh_new.remove_duplicated_triangles()
-            mesh_out.append(mesh_new)
-
-
-        return mesh_out
+        calls = [((mesh, self.method, num_of_triangles, boundary_weight, voxel_size, distance, self.contraction), {})
+                 for mesh, num_of_triangles, boundary_weight, voxel_size, distance in zip(*params)]
+        return self.map_objects(simplify_triangle_mesh, calls)
 
 def register():
     bpy.utils.register_class(SvO3TriangleMeshSimplifyNode)
@@ -13,8 +13,10 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.core.open3d_ops import smooth_triangle_mesh
 
-class SvO3TriangleMeshSmoothNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshSmoothNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ParallelNode):
     """
     Triggers: Triangle Mesh Smooth
     Tooltip: Open3d Triangle Mesh Smooth
@@ -75,6 +77,7 @@ class SvO3TriangleMeshSmoothNode(bpy.types.Node, SverchCustomTreeNode, SvRecursi
     def draw_buttons_ext(self, context, layout):
         layout.prop(self, 'list_match')
         self.draw_buttons(context, layout)
+        self.draw_parallel(layout)
 
     def rclick_menu(self, context, layout):
         layout.prop_menu_enum(self, "list_match", text="List Match")
@@ -82,21 +85,16 @@ class SvO3TriangleMeshSmoothNode(bpy.types.Node, SverchCustomTreeNode, SvRecursi
 
     def process_data(self, params):
 
-        mesh_out = []
-
-        for mesh, iterations, filter_lambda, filter_mu in zip(*params):
-            if iterations < 1:
-                mesh_new = mesh
-            else:
-                if self.method == 'simple':
-                    mesh_new = mesh.filter_smooth_simple(number_of_iterations=iterations)
-                elif self.method == 'laplacian':
-                    mesh_new = mesh.filter_smooth_laplacian(number_of_iterations=iterations)#, lambda=filter_lamda)
-                else:
-                    mesh_new = mesh.filter_smooth_taubin(number_of_iterations=iterations)#,lambda=filter_lamda, mu=filter_mu)
-
-            mesh_out.append(mesh_new)
+        mesh_out = [mesh for mesh, *_ in zip(*params)]
+        # meshes with no iterations are passed through
+        indices, calls = [], []
+        for i, (mesh, iterations, filter_lambda, filter_mu) in enumerate(zip(*params)):
+            if iterations > 0:
+                indices.append(i)
+                calls.append(((mesh, self.method, iterations), {}))#, lambda=filter_lamda, mu=filter_mu
 
+        for i, mesh_new in zip(indices, self.map_objects(smooth_triangle_mesh, calls)):
+            mesh_out[i] = mesh_new
 
         return mesh_out
 
@@ -11,8 +11,10 @@ from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 from sverchok_open3d.dependencies import open3d as o3d
 from sverchok_open3d.utils.triangle_mesh import triangle_mesh_viewer_map
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.core.open3d_ops import subdivide_triangle_mesh
 
-class SvO3TriangleMeshSubdivideNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3TriangleMeshSubdivideNode(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ParallelNode):
     """
     Triggers: Triangle Mesh Subdivide
     Tooltip: Open3d Triangle Mesh Subdivide
@@ -62,19 +64,14 @@ class SvO3TriangleMeshSubdivideNode(bpy.types.Node, SverchCustomTreeNode, SvRecu
     def draw_buttons_ext(self, context, layout):
         self.draw_buttons(context, layout)
         layout.prop(self, 'list_match')
+        self.draw_parallel(layout)
 
     def rclick_menu(self, context, layout):
         layout.prop_menu_enum(self, "list_match", text="List Match")
 
     def process_data(self, params):
-        meshes = []
-        for mesh, iterations in zip(*params):
-            if self.method == 'loop':
-                meshes.append(mesh.subdivide_loop(number_of_iterations=iterations))
-            else:
-                meshes.append(mesh.subdivide_midpoint(number_of_iterations=iterations))
-
-        return meshes
+        calls = [((mesh, self.method, iterations), {}) for mesh, iterations in zip(*params)]
+        return self.map_objects(subdivide_triangle_mesh, calls)
 
 def register():
     bpy.utils.register_class(SvO3TriangleMeshSubdivideNode)
@@ -1,4 +1,5 @@
 
+import os
 import numpy as np
 
 import bpy
@@ -13,9 +14,18 @@ from sverchok.utils.sv_logging import sv_logger
 
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.cow import to_cow, CowInstances
+from sverchok_open3d.utils.parallel import submit_in_threads
+from sverchok_open3d.core.open3d_ops import write_geometry
+from sverchok_open3d.core.native_format import write_native, EXTENSION as NATIVE_EXTENSION
+from sverchok_open3d.core.instancing import expand_instances
 
-class SvO3ExportOperator(bpy.types.Operator):
+def write_instances(write, path, kind, arrays, matrices, *args, **kwargs):
+    '''Write the flat geometry of instances, expanded in the export thread'''
+    return write(path, kind, expand_instances(arrays, matrices), *args, **kwargs)
 
+class SvO3ExportOperator(bpy.types.Operator):
+    '''Write the geometry in the background, press Esc to cancel the files not started yet'''
     bl_idname = "node.sv_export_open3d"
     bl_label = "Open3d Export"
     bl_options = {'INTERNAL', 'REGISTER'}
@@ -27,6 +37,50 @@ class SvO3ExportOperator(bpy.types.Operator):
     idtree: StringProperty(default='')
     idname: StringProperty(default='')
 
+    def export_jobs(self, node, folder_path):
+        '''(file path, function, (args, kwargs)) of every object of the node input'''
+        if node.export_type == 'point_cloud':
+            socket = node.inputs['O3D Point Cloud']
+            base_name = node.base_name or "sv_point_cloud"
+            extension = ".ply"
+            mesh_options = {}
+        else:
+            socket = node.inputs['O3D Triangle Mesh']
+            base_name = node.base_name or "sv_triangle_mesh"
+            extension = ".obj"
+            mesh_options = dict(
+                write_vertex_normals=node.write_vertex_normals,
+                write_vertex_colors=node.write_vertex_colors,
+                write_triangle_uvs=node.write_triangle_uvs)
+        if node.file_format == 'NATIVE':
+            extension = NATIVE_EXTENSION
+        # attributes left out of native files, as Open3D does with the mesh options
+        skip = [option[len('write_'):] for option, write in mesh_options.items() if not write]
+
+        jobs = []
+        for i, geometry in enumerate(socket.do_flatten(socket.sv_get())):
+            # snapshot: the handle shares the buffers, later changes of the tree copy them
+            if isinstance(geometry, CowInstances) and not geometry.expanded:
+                handle, matrices = geometry.base.shallow_copy(), geometry.matrices
+            else:
+                handle, matrices = to_cow(geometry).shallow_copy(), None
+            file_path = os.path.join(folder_path, f"{base_name}_{i:05d}{extension}")
+            if node.file_format == 'NATIVE':
+                arrays = {name: arr for name, arr in handle.arrays().items() if name not in skip}
+                write, kwargs = write_native, dict(compress=node.native_compression)
+            else:
+                arrays = handle.arrays()
+                write, kwargs = write_geometry, dict(write_ascii=node.write_ascii,
+                                                     compressed=node.compressed,
+                                                     print_progress=node.print_progress,
+                                                     **mesh_options)
+            if matrices is None:
+                jobs.append((file_path, write, ((file_path, handle.o3d_type_name, arrays), kwargs)))
+            else:
+                call = ((write, file_path, handle.o3d_type_name, arrays, matrices), kwargs)
+                jobs.append((file_path, write_instances, call))
+        return jobs
+
     def execute(self, context):
         tree = bpy.data.node_groups[self.idtree]
         node = bpy.data.node_groups[self.idtree].nodes[self.idname]
@@ -34,48 +88,62 @@ class SvO3ExportOperator(bpy.types.Operator):
         if not node.inputs['Folder Path'].is_linked:
             self.report({'WARNING'}, "Folder path is not specified")
             return {'FINISHED'}
-
+        socket = node.inputs['O3D Point Cloud' if node.export_type == 'point_cloud' else 'O3D Triangle Mesh']
+        if not socket.is_linked:
+            self.report({'WARNING'}, f"{socket.name[4:]} to be exported is not specified")
+            return {'FINISHED'}
 
         folder_path = node.inputs[0].sv_get()[0][0]
-        base_name = node.base_name
-        if node.export_type == 'point_cloud':
-            if not node.inputs['O3D Point Cloud'].is_linked:
-                self.report({'WARNING'}, "Point Cloud to be exported is not specified")
-                return {'FINISHED'}
-            point_cloud_in = node.inputs['O3D Point Cloud'].sv_get()
-
-            if not base_name:
-                base_name = "sv_point_cloud"
-            pcd_flat = node.inputs['O3D Point Cloud'].do_flatten(point_cloud_in)
-
-            for i, pcd in enumerate(pcd_flat):
-                file_path = folder_path + base_name + "_"  + "%05d" % i + ".ply"
-                o3d.io.write_point_cloud(file_path, pcd, write_ascii=node.write_ascii, compressed=node.compressed, print_progress=node.print_progress)
-
-                self.report({'INFO'}, f"Saved object #{i} to {file_path}")
-        else:
-            if not node.inputs['Triangle Mesh'].is_linked:
-                self.report({'WARNING'}, "Triangle Mesh to be exported is not specified")
-                return {'FINISHED'}
-            mesh_in = node.inputs['O3D Triangle Mesh'].sv_get()
-            if not base_name:
-                base_name = "sv_triangle_mesh"
-            mesh_flat = node.inputs['O3D Triangle Mesh'].do_flatten(mesh_in)
-            for i, mesh in enumerate(mesh_flat):
-                file_path = folder_path + base_name + "_"  + "%05d" % i + ".obj"
-                o3d.io.write_triangle_mesh(
-                    file_path,
-                    mesh,
-                    write_ascii=node.write_ascii,
-                    compressed=node.compressed,
-                    write_vertex_normals=node.write_vertex_normals,
-                    write_vertex_colors=node.write_vertex_colors,
-                    write_triangle_uvs=node.write_triangle_uvs,
-                    print_progress=node.print_progress)
-
-                self.report({'INFO'}, f"Saved object #{i} to {file_path}")
-
-        return {'FINISHED'}
+        jobs = self.export_jobs(node, folder_path)
+        if not jobs:
+            return {'FINISHED'}
+        self.paths = [path for path, _, _ in jobs]
+        self.futures = []
+        for _, func, call in jobs:
+            self.futures.extend(submit_in_threads(func, [call]))
+        self.reported = set()
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.1, window=context.window)
+        wm.progress_begin(0, len(self.futures))
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def report_done(self):
+        for i, future in enumerate(self.futures):
+            if i in self.reported or not future.done() or future.cancelled():
+                continue
+            self.reported.add(i)
+            error = future.exception()
+            if error is None:
+                self.report({'INFO'}, f"Saved object #{i} to {self.paths[i]}")
+            else:
+                self.report({'ERROR'}, f"Object #{i} not saved to {self.paths[i]}: {error}")
+
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            cancelled = sum(future.cancel() for future in self.futures)
+            self.report_done()
+            self.report({'WARNING'}, f"Export cancelled, {cancelled} of {len(self.futures)} files not written")
+            self.finish(context)
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        self.report_done()
+        done = sum(future.done() for future in self.futures)
+        context.window_manager.progress_update(done)
+        context.workspace.status_text_set(f"Open3D Export: {done} / {len(self.futures)} files written, Esc to cancel")
+        if done == len(self.futures):
+            self.finish(context)
+            return {'FINISHED'}
+        return {'PASS_THROUGH'}
 
 class SvO3ExportNode(bpy.types.Node, SverchCustomTreeNode):
     """
@@ -91,8 +159,12 @@ class SvO3ExportNode(bpy.types.Node, SverchCustomTreeNode):
         ('triangle_mesh', "Triangle Mesh", "Triangle Mesh", 0),
         ('point_cloud', "Point Cloud", "Point Cloud", 1),
     ]
+    file_formats = [
+        ('OPEN3D', "Open3D", "PLY point clouds and OBJ meshes written by Open3D", 0),
+        ('NATIVE', "Native", "Binary .svo3d file of the add-on, fastest to save and reload", 1),
+    ]
     def update_sockets(self, context):
-        self.inputs["Point Cloud"].hide_safe = self.export_type == 'triangle_mesh'
+        self.inputs["O3D Point Cloud"].hide_safe = self.export_type == 'triangle_mesh'
         self.inputs["O3D Triangle Mesh"].hide_safe = self.export_type == 'point_cloud'
     export_type: EnumProperty(
         name="Export",
@@ -100,6 +172,16 @@ class SvO3ExportNode(bpy.types.Node, SverchCustomTreeNode):
         default='triangle_mesh',
         update=update_sockets)
 
+    file_format: EnumProperty(
+        name="Format",
+        items=file_formats,
+        default='OPEN3D',
+        update=updateNode)
+    native_compression: BoolProperty(
+        name="Compress Blocks",
+        description="Compress every attribute with zlib, smaller files but they can not be memory mapped",
+        default=False,
+        update=updateNode)
     write_ascii: BoolProperty(
         name="Write Ascii",
         default=True,
@@ -141,8 +223,12 @@ class SvO3ExportNode(bpy.types.Node, SverchCustomTreeNode):
 
     def draw_buttons(self, context, layout):
         layout.prop(self, 'export_type')
-        layout.prop(self, 'write_ascii')
-        layout.prop(self, 'compressed')
+        layout.prop(self, 'file_format')
+        if self.file_format == 'NATIVE':
+            layout.prop(self, 'native_compression')
+        else:
+            layout.prop(self, 'write_ascii')
+            layout.prop(self, 'compressed')
         if self.export_type == 'triangle_mesh':
             layout.prop(self, 'write_vertex_normals')
             layout.prop(self, 'write_vertex_colors')
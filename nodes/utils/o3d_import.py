@@ -1,4 +1,5 @@
-
+import os
+import time
 import numpy as np
 
 import bpy
@@ -12,8 +13,40 @@ from sverchok.utils.sv_logging import sv_logger
 
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.cow import CowPointCloud, CowTriangleMesh
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.utils.import_cache import import_key, lookup, store
+from sverchok_open3d.core.streaming import open_stream, read_chunk, read_tiles, read_whole, tile_grid, read_header_counts
+from sverchok_open3d.core.open3d_ops import read_geometry
+from sverchok_open3d.core.native_format import read_native, is_native
+
+def read_native_geometry(file, import_type):
+    '''Handle over the memory mapped blocks of a .svo3d file and the seconds spent'''
+    start = time.perf_counter()
+    kind, arrays = read_native(file)
+    if kind != ('PointCloud' if import_type == 'point_cloud' else 'TriangleMesh'):
+        raise Exception(f'{file} contains a {kind}')
+    handle = (CowPointCloud if kind == 'PointCloud' else CowTriangleMesh).from_arrays(**arrays)
+    return handle, time.perf_counter() - start
+
+def header_counts(file):
+    try:
+        return read_header_counts(file)
+    except (OSError, ValueError, IndexError):
+        return None, None
+
+def read_order(files, counts, pending):
+    '''
+    Pending files, the biggest first so the parallel modes end at the same time.
+    The elements in the headers tell the work of every file, the file size is used
+    when a header does not give them
+    '''
+    elements = [sum(c or 0 for c in counts[i]) for i in pending]
+    if not all(elements):
+        elements = [os.path.getsize(files[i]) for i in pending]
+    return [i for _, i in sorted(zip(elements, pending), key=lambda item: item[0], reverse=True)]
 
-class SvO3ImportNode(bpy.types.Node, SverchCustomTreeNode):
+class SvO3ImportNode(bpy.types.Node, SverchCustomTreeNode, SvO3ParallelNode):
     """
     Triggers: Point Cloud or TriangleMesh
     Tooltip: Import from file Point Cloud or TriangleMesh
@@ -27,9 +60,26 @@ class SvO3ImportNode(bpy.types.Node, SverchCustomTreeNode):
         ('triangle_mesh', "Triangle Mesh", "Triangle Mesh", 0),
         ('point_cloud', "Point Cloud", "Point Cloud", 1),
     ]
+    stream_modes = [
+        ('CHUNKS', "Chunks", "Consecutive blocks of points of the file", 0),
+        ('TILES', "Tiles", "Square tiles over the XY plane", 1),
+        ('WHOLE', "Whole File", "Read every chunk into one point cloud per file, with Voxel decimation only the occupied voxels are kept in memory", 2),
+    ]
+    decimation_methods = [
+        ('NONE', "None", "Keep all the points", 0),
+        ('UNIFORM', "Uniform", "Keep every Nth point of the file", 1),
+        ('VOXEL', "Voxel", "Average the points of every voxel of the chunk or tile", 2),
+    ]
     def update_sockets(self, context):
         self.outputs["O3D Point Cloud"].hide_safe = self.import_type == 'triangle_mesh'
         self.outputs["O3D Triangle Mesh"].hide_safe = self.import_type == 'point_cloud'
+        streaming = self.import_type == 'point_cloud' and self.streaming
+        if 'Chunk Index' in self.inputs:
+            self.inputs['Chunk Index'].hide_safe = not streaming or self.stream_mode == 'WHOLE'
+            self.outputs['Chunk Count'].hide_safe = not streaming
+        if 'Voxel Trace' in self.outputs:
+            self.outputs['Voxel Trace'].hide_safe = not (streaming and self.stream_mode == 'WHOLE' and self.voxel_trace)
+        updateNode(self, context)
     import_type: EnumProperty(
         name="Import",
         items=import_types,
@@ -52,10 +102,61 @@ class SvO3ImportNode(bpy.types.Node, SverchCustomTreeNode):
         name="Print Progress in console",
         default=False,
         update=updateNode)
+    use_cache: BoolProperty(
+        name="Cache",
+        description="Keep the read geometry until the file or the reader options change",
+        default=True,
+        update=updateNode)
+    streaming: BoolProperty(
+        name="Stream",
+        description="Memory map binary PLY or PCD files and read only the chunks or tiles asked in Chunk Index",
+        default=False,
+        update=update_sockets)
+    stream_mode: EnumProperty(
+        name="Split",
+        items=stream_modes,
+        default='CHUNKS',
+        update=update_sockets)
+    chunk_size: IntProperty(
+        name="Chunk Size",
+        description="Points read at once, sets the memory used while streaming",
+        default=1000000,
+        min=1,
+        update=updateNode)
+    tile_size: FloatProperty(
+        name="Tile Size",
+        default=10.0,
+        min=0.0001,
+        update=updateNode)
+    decimation: EnumProperty(
+        name="Decimation",
+        items=decimation_methods,
+        default='NONE',
+        update=updateNode)
+    every_nth: IntProperty(
+        name="Every Nth.",
+        default=10,
+        min=1,
+        update=updateNode)
+    voxel_size: FloatProperty(
+        name="Voxel Size",
+        default=0.05,
+        min=0.000001,
+        update=updateNode)
+    voxel_trace: BoolProperty(
+        name="Voxel Trace",
+        description="Output the voxel (int32) of every point of the file, -1 for the removed points",
+        default=False,
+        update=update_sockets)
     def sv_init(self, context):
         self.inputs.new('SvFilePathSocket', "File Path")
+        self.inputs.new('SvStringsSocket', "Chunk Index").hide_safe = True
         self.outputs.new('SvO3PointCloudSocket', 'O3D Point Cloud')
         self.outputs.new('SvO3TriangleMeshSocket', "O3D Triangle Mesh").hide_safe = True
+        self.outputs.new('SvStringsSocket', "Chunk Count").hide_safe = True
+        self.outputs.new('SvStringsSocket', "Header Counts")
+        self.outputs.new('SvStringsSocket', "Read Time")
+        self.outputs.new('SvStringsSocket', "Voxel Trace").hide_safe = True
 
 
     def draw_buttons(self, context, layout):
@@ -64,9 +165,28 @@ class SvO3ImportNode(bpy.types.Node, SverchCustomTreeNode):
         if self.import_type == 'point_cloud':
             layout.prop(self, 'remove_nan_points')
             layout.prop(self, 'remove_infinite_points')
+            layout.prop(self, 'streaming')
+            if self.streaming:
+                layout.prop(self, 'stream_mode')
+                layout.prop(self, 'chunk_size')
+                if self.stream_mode == 'TILES':
+                    layout.prop(self, 'tile_size')
+                layout.prop(self, 'decimation')
+                if self.decimation == 'UNIFORM':
+                    layout.prop(self, 'every_nth')
+                elif self.decimation == 'VOXEL':
+                    layout.prop(self, 'voxel_size')
+                    if self.stream_mode == 'WHOLE':
+                        layout.prop(self, 'voxel_trace')
         else:
             layout.prop(self, 'enable_post_processing')
         layout.prop(self, 'print_progress')
+        if not (self.import_type == 'point_cloud' and self.streaming):
+            layout.prop(self, 'use_cache')
+
+    def draw_buttons_ext(self, context, layout):
+        self.draw_buttons(context, layout)
+        self.draw_parallel(layout)
 
     def process(self):
 
@@ -77,26 +197,98 @@ class SvO3ImportNode(bpy.types.Node, SverchCustomTreeNode):
             return
 
         files_s = self.inputs['File Path'].sv_get()
+        if self.import_type == 'point_cloud' and self.streaming:
+            self.process_streaming(files_s)
+            return
+
+        files = [file for files in files_s for file in files]
+        # header pass: element counts of every file before any payload is decoded,
+        # they order the reads and are given in Header Counts
+        counts = [header_counts(file) for file in files]
+        geometries, times = [None] * len(files), [0.0] * len(files)
+        keys = [None] * len(files)
+        if self.use_cache:
+            if self.import_type == 'point_cloud':
+                key_options = dict(remove_nan_points=self.remove_nan_points,
+                                   remove_infinite_points=self.remove_infinite_points)
+            else:
+                key_options = dict(enable_post_processing=self.enable_post_processing)
+            keys = [None if is_native(file) else import_key(file, self.import_type, key_options)
+                    for file in files]
+            geometries = [None if key is None else lookup(key) for key in keys]
+        # native files are memory mapped, faster than any cache or worker
+        for i, file in enumerate(files):
+            if is_native(file):
+                geometries[i], times[i] = read_native_geometry(file, self.import_type)
+        order = read_order(files, counts, [i for i, geometry in enumerate(geometries) if geometry is None])
+        calls = [((files[i], self.import_type),
+                  dict(remove_nan_points=self.remove_nan_points,
+                       remove_infinite_points=self.remove_infinite_points,
+                       enable_post_processing=self.enable_post_processing,
+                       print_progress=self.print_progress))
+                 for i in order]
+
+        for i, (geometry, seconds) in zip(order, self.map_objects(read_geometry, calls)):
+            geometries[i] = geometry if keys[i] is None else store(keys[i], geometry)
+            times[i] = seconds
+            sv_logger.debug(f'Open3D Import: {files[i]} {counts[i]} read in {seconds:.3f}s')
+
+        if self.import_type == 'point_cloud':
+            self.outputs['O3D Point Cloud'].sv_set(geometries)
+            self.outputs['O3D Triangle Mesh'].sv_set([])
+        else:
+            self.outputs['O3D Point Cloud'].sv_set([])
+            self.outputs['O3D Triangle Mesh'].sv_set(geometries)
+        # nodes saved before the parallel import have no info sockets
+        if 'Header Counts' in self.outputs:
+            self.outputs['Header Counts'].sv_set([[list(c) for c in counts]])
+            self.outputs['Read Time'].sv_set([times])
+
+    def process_streaming(self, files_s):
+        # an empty Chunk Index reads the first chunk (or tile) only, reading every one
+        # of a huge file is what streaming avoids. Whole File mode reads them all
+        # nodes saved before streaming have no Chunk Index socket
+        index_socket = self.inputs.get('Chunk Index')
+        index_s = index_socket.sv_get(default=[[]]) if index_socket else [[]]
+        indices = [int(i) for i in index_s[0]] if index_s else []
+        options = dict(
+            method=self.decimation,
+            every_nth=self.every_nth,
+            voxel_size=self.voxel_size,
+            remove_nan=self.remove_nan_points,
+            remove_infinite=self.remove_infinite_points)
 
-        point_clouds_out, mesh_out = [], []
+        point_clouds_out, counts_out, traces_out = [], [], []
         for files in files_s:
+            counts = []
             for file in files:
-                if self.import_type == 'point_cloud':
-                    pcd = o3d.io.read_point_cloud(
-                        file,
-                        remove_nan_points=self.remove_nan_points,
-                        remove_infinite_points=self.remove_infinite_points,
-                        print_progress=self.print_progress)
-                    point_clouds_out.append(pcd)
+                stream = open_stream(file)
+                if self.stream_mode == 'WHOLE':
+                    count = stream.chunk_count(self.chunk_size)
+                    trace = self.voxel_trace and self.decimation == 'VOXEL'
+                    arrays, voxels = read_whole(stream, self.chunk_size, trace=trace, **options)
+                    arrays_list = [arrays]
+                    if trace:
+                        traces_out.append(voxels)
+                elif self.stream_mode == 'TILES':
+                    _, tiles_x, tiles_y = tile_grid(stream, self.tile_size, self.chunk_size)
+                    count = tiles_x * tiles_y
+                    file_indices = indices or [0][:count]
+                    arrays_list = read_tiles(stream, file_indices, self.tile_size, self.chunk_size, **options)
                 else:
-                    mesh = o3d.io.read_triangle_mesh(
-                        file,
-                        enable_post_processing =self.enable_post_processing ,
-                        print_progress=self.print_progress)
-                    mesh_out.append(mesh)
+                    count = stream.chunk_count(self.chunk_size)
+                    file_indices = indices or [0][:count]
+                    arrays_list = [read_chunk(stream, i, self.chunk_size, **options) for i in file_indices]
+                point_clouds_out.extend(CowPointCloud.from_arrays(**arrays) for arrays in arrays_list)
+                counts.append(count)
+            counts_out.append(counts)
 
         self.outputs['O3D Point Cloud'].sv_set(point_clouds_out)
-        self.outputs['O3D Triangle Mesh'].sv_set(mesh_out)
+        self.outputs['O3D Triangle Mesh'].sv_set([])
+        if 'Chunk Count' in self.outputs:
+            self.outputs['Chunk Count'].sv_set(counts_out)
+        if 'Voxel Trace' in self.outputs:
+            self.outputs['Voxel Trace'].sv_set(traces_out)
 
 
 
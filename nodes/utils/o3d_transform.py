@@ -4,19 +4,21 @@ import numpy as np
 import bpy
 from bpy.props import FloatProperty, EnumProperty, BoolProperty, IntProperty
 from mathutils import Matrix
-import copy
 import sverchok
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, zip_long_repeat, numpy_full_list_cycle, changable_sockets, get_other_socket
 from sverchok.utils.field.scalar import SvScalarField
 from sverchok.utils.field.vector import SvVectorField
 from sverchok.utils.sv_logging import sv_logger
-from sverchok.utils.modules.matrix_utils import matrix_apply_np
 from sverchok.utils.nodes_mixins.recursive_nodes import SvRecursiveNode
 
 import numpy as np
 from sverchok_open3d.dependencies import open3d as o3d
-from sverchok_open3d.utils.triangle_mesh import calc_normals
+from sverchok_open3d.utils.cow import to_cow, is_triangle_mesh, instances_of, CowInstances
+from sverchok_open3d.core.transform import vector_transform, number_transform, scalar_field_transform
+from sverchok_open3d.core.instancing import iterated_matrix
+from sverchok_open3d.utils.derived_attributes import vertex_normals, mesh_topology
+from sverchok_open3d.utils.nodes_mixins import SvO3ProfiledNode
 
 transformation_dict = {
 'SvVerticesSocket': 'VECTOR',
@@ -47,56 +49,7 @@ def transform_mode(transformation):
 
     return transformation_mode
 
-def vector_transform(af_verts, transformation, transformation_mode, iterations, coeff):
-    if transformation_mode == 'MATRIX':
-        matrix = transformation
-        for i in range(iterations):
-            af_verts += (matrix_apply_np(af_verts, matrix)-af_verts)*coeff[i%len(coeff)]
-    elif transformation_mode == 'VECTOR':
-        offset_verts = numpy_full_list_cycle(np.array(transformation), af_verts.shape[0])
-        for i in range(iterations):
-            af_verts += offset_verts * coeff[i%len(coeff)]
-    elif transformation_mode == 'VECTOR_FIELD':
-        for i in range(iterations):
-            i_coeff = coeff[i%len(coeff)]
-            xs, ys, zs = transformation.evaluate_grid(af_verts[:, 0], af_verts[:, 1], af_verts[:, 2])
-            af_verts[:, 0] += xs * i_coeff
-            af_verts[:, 1] += ys * i_coeff
-            af_verts[:, 2] += zs * i_coeff
-
-    return af_verts
-
-
-def number_transform(tris, transformation, verts, np_mask, use_mask, iterations, coeff):
-    if len(transformation) == len(verts) and use_mask:
-        offset_vals = (np.array(transformation)[np_mask])[:, np.newaxis]
-    else:
-        if use_mask:
-            offset_vals = numpy_full_list_cycle(np.array(transformation), verts[np_mask].shape[0])[:, np.newaxis]
-        else:
-            offset_vals = numpy_full_list_cycle(np.array(transformation), verts.shape[0])[:, np.newaxis]
-
-
-    for i in range(iterations):
-        _, v_normals = calc_normals([verts, tris], v_normals=True, output_numpy=True, as_array=True)
-        if use_mask:
-            verts[np_mask] += v_normals[np_mask] * offset_vals * coeff[i%len(coeff)]
-        else:
-            verts += v_normals * offset_vals * coeff[i%len(coeff)]
-    return verts
-
-def scalar_field_transform(tris, transformation, verts, np_mask, use_mask, iterations, coeff):
-    for i in range(iterations):
-        _, v_normals = calc_normals([verts, tris], v_normals=True, output_numpy=True, as_array=True)
-        if use_mask:
-            offset_vals = transformation.evaluate_grid(verts[np_mask, 0], verts[np_mask, 1], verts[np_mask, 2])
-            verts[np_mask] += v_normals[np_mask] * offset_vals[:, np.newaxis] * coeff[i%len(coeff)]
-        else:
-            offset_vals = transformation.evaluate_grid(verts[:, 0], verts[:, 1], verts[:, 2])
-            verts += v_normals * offset_vals[:, np.newaxis] * coeff[i%len(coeff)]
-    return verts
-
-class SvO3Transform(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
+class SvO3Transform(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode, SvO3ProfiledNode):
     """
     Triggers: Open 3D Geometry Transform
     Tooltip: Apply Matrixes, Vector Fields and Scalar Fields to Open 3d Geometry
@@ -127,6 +80,11 @@ class SvO3Transform(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
         name="Coefficient",
         default=1,
         update=updateNode)
+    output_instances: BoolProperty(
+        name="Instances",
+        description="With matrices output one geometry shared by all its matrices instead of a copy per matrix",
+        default=False,
+        update=updateNode)
 
     def sv_init(self, context):
         self.width = 200
@@ -149,6 +107,10 @@ class SvO3Transform(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
 
         self.outputs.new('SvStringsSocket', "O3D Geometry")
 
+    def draw_buttons(self, context, layout):
+        if self.method == 'MATRIX':
+            layout.prop(self, 'output_instances')
+
     def sv_update(self):
         '''adapt socket type to input type'''
         if 'O3D Geometry' in self.inputs and self.inputs['O3D Geometry'].links:
@@ -173,23 +135,56 @@ class SvO3Transform(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
         else:
             self.inputs['Transformation'].nesting_level = 1
 
+    def input_positions(self, count):
+        '''Position in the O3D Geometry input of the geometry of every matched pair, None if unknown'''
+        geometries = self.inputs['O3D Geometry'].sv_get(default=[], deepcopy=False)
+        if not geometries or any(isinstance(geometry, (list, tuple)) for geometry in geometries):
+            return None
+        pairs = np.arange(count)
+        if self.list_match == 'CYCLE':
+            return pairs % len(geometries)
+        if self.list_match in ('REPEAT', 'SHORT'):
+            return np.minimum(pairs, len(geometries) - 1)
+        return None
+
+    def process_instances(self, params):
+        '''One instances handle per input geometry holding all its matrices, no buffer is copied'''
+        # list matching repeats the geometries for the matrices, the pairs are grouped back
+        # by input position (the same object can be given twice)
+        positions = self.input_positions(len(params[0]))
+        if positions is None:
+            positions = range(len(params[0]))
+        groups = {}
+        for position, (mesh, transformation, mask, iterations, coeff) in zip(positions, zip(*params)):
+            matrix = iterated_matrix(transformation, iterations, coeff)
+            groups.setdefault(int(position), (mesh, []))[1].append(matrix)
+        return [instances_of(mesh, np.stack(matrices)) for mesh, matrices in groups.values()]
+
     def process_data(self, params):
         mesh_out = []
         transformation_mode = self.method
-        geometry_type = type(params[0][0])
 
-        if geometry_type == o3d.cpu.pybind.geometry.TriangleMesh:
+        use_mask = any(len(mask) > 0 for mask in params[2])
+        if transformation_mode == 'MATRIX' and not use_mask:
+            if self.output_instances:
+                return self.process_instances(params)
+            if all(isinstance(mesh, CowInstances) for mesh in params[0]):
+                # instances stay instances, only their matrices change
+                return [mesh.transformed(iterated_matrix(transformation, iterations, coeff))
+                        for mesh, transformation, mask, iterations, coeff in zip(*params)]
+
+        if is_triangle_mesh(params[0][0]):
             geo_type = 'TRIS'
-        elif geometry_type == o3d.cpu.pybind.geometry.PointCloud:
+            verts_attr = 'vertices'
+        else:
             geo_type = 'POINT_CLOUD'
+            verts_attr = 'points'
 
         for mesh, transformation, mask, iterations, coeff in zip(*params):
-            new_mesh = copy.deepcopy(mesh)
+            # only the vertices buffer is copied, the rest is shared with the input
+            new_mesh = to_cow(mesh)
+            verts = new_mesh.writable(verts_attr)
             use_mask = len(mask) > 0
-            if geo_type == 'TRIS':
-                verts = np.asarray(new_mesh.vertices)
-            else:
-                verts = np.asarray(new_mesh.points)
             if use_mask:
                 np_mask = numpy_full_list_cycle(np.array(mask).astype('bool'), len(verts))
                 af_verts = verts[np_mask]
@@ -200,22 +195,18 @@ class SvO3Transform(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
                 af_verts = vector_transform(af_verts, transformation, transformation_mode, iterations, coeff)
                 if use_mask:
                     verts[np_mask] = af_verts
-                else:
-                    verts = af_verts
 
             else:
                 if geo_type == 'TRIS':
-                    tris = np.asarray(mesh.triangles)
+                    topology = mesh_topology(mesh)
+                    # first iteration normals are the ones of the input mesh, shared by the derived cache
+                    first_normals = vertex_normals(mesh)
                     if transformation_mode == 'NUMBER':
-                        verts = number_transform(tris, transformation, verts, np_mask, use_mask, iterations, coeff)
+                        number_transform(topology, transformation, verts, np_mask, use_mask, iterations, coeff, first_normals)
                     else:
-                        verts = scalar_field_transform(tris, transformation, verts, np_mask, use_mask, iterations, coeff)
+                        scalar_field_transform(topology, transformation, verts, np_mask, use_mask, iterations, coeff, first_normals)
                 else:
                     raise Exception('Transformation along normal is not implemented for Point Clouds')
-            if geo_type == 'TRIS':
-                new_mesh.vertices = o3d.utility.Vector3dVector(verts)
-            else:
-                new_mesh.points = o3d.utility.Vector3dVector(verts)
 
             mesh_out.append(new_mesh)
 
@@ -223,7 +214,6 @@ class SvO3Transform(bpy.types.Node, SverchCustomTreeNode, SvRecursiveNode):
         return mesh_out
 
 
-
 def register():
     bpy.utils.register_class(SvO3Transform)
 
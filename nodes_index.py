@@ -13,6 +13,9 @@ def nodes_index():
                     ("point_cloud.point_cloud_mask", "SvO3PointCloudMaskNode"),
                     ("point_cloud.point_cloud_join", "SvO3PointCloudJoinNode"),
                     ("point_cloud.point_cloud_calc_normals", "SvO3PointCloudCalcNormalsNode"),
+                    ("point_cloud.point_cloud_neighbors", "SvO3PointCloudNeighborsNode"),
+                    ("point_cloud.point_cloud_stats", "SvO3PointCloudStatsNode"),
+                    ("point_cloud.point_cloud_lod", "SvO3PointCloudLODNode"),
                     ]},
                 {"Triangle Mesh": [
                     ({'icon_name': 'SV_DELAUNAY'}, ),
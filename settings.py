@@ -12,6 +12,11 @@ import sverchok_open3d
 from sverchok.dependencies import draw_message
 from sverchok_open3d.dependencies import ex_dependencies
 from sverchok.utils.context_managers import addon_preferences
+from sverchok_open3d.utils.derived_attributes import set_cache_size
+from sverchok_open3d.utils.parallel import set_worker_count, shutdown_pool
+from sverchok_open3d.utils.import_cache import set_import_cache_size, set_disk_cache
+from sverchok_open3d.utils.profiling import set_overlay
+from sverchok_open3d.core.profiling import set_profiling
 
 COMMITS_LINK = 'https://api.github.com/repos/vicdoval/sverchok-open3d/commits'
 ADDON_NAME = sverchok_open3d.__name__
@@ -42,12 +47,78 @@ def sv_draw_update_menu_in_panel(self, context):
     box.label(text=ADDON_PRETTY_NAME)
     update_addon_ui(box)
 
+def update_cache_size(self, context):
+    set_cache_size(self.derived_cache_size)
+
+def update_worker_count(self, context):
+    set_worker_count(self.worker_count)
+
+def update_import_cache(self, context):
+    set_import_cache_size(self.import_cache_size)
+    set_disk_cache(self.import_disk_cache, bpy.path.abspath(self.import_cache_dir), self.import_disk_cache_size)
+
+def update_profiling(self, context):
+    set_profiling(self.profiling, self.profiling_history)
+    set_overlay(self.profiling and self.profiling_overlay)
+
+def apply_preferences():
+    with addon_preferences(ADDON_NAME) as prefs:
+        if prefs is not None:
+            set_cache_size(prefs.derived_cache_size)
+            set_worker_count(prefs.worker_count)
+            update_import_cache(prefs, None)
+            update_profiling(prefs, None)
+
 class SvO3Preferences(AddonPreferences):
     bl_idname = __package__
 
     available_new_version: bpy.props.BoolProperty(default=False)
     dload_archive_name: bpy.props.StringProperty(name="archive name", default=MASTER_BRANCH_NAME) # default = "master"
     dload_archive_path: bpy.props.StringProperty(name="archive path", default=ARCHIVE_LINK)
+    derived_cache_size: bpy.props.IntProperty(
+        name="Derived Attributes Cache (MB)",
+        description="Memory used to keep normals, centers, areas and edges computed by the nodes",
+        default=256, min=0,
+        update=update_cache_size)
+    worker_count: bpy.props.IntProperty(
+        name="Worker Processes",
+        description="Processes used by the nodes in parallel mode (0 = one per CPU)",
+        default=0, min=0,
+        update=update_worker_count)
+    import_cache_size: bpy.props.IntProperty(
+        name="Import Cache (MB)",
+        description="Memory used to keep the geometry read by the import nodes",
+        default=512, min=0,
+        update=update_import_cache)
+    import_disk_cache: bpy.props.BoolProperty(
+        name="Disk Import Cache",
+        description="Keep the imported geometry also on disk as NumPy blocks, files are not parsed again when reopening a .blend",
+        default=False,
+        update=update_import_cache)
+    import_cache_dir: bpy.props.StringProperty(
+        name="Disk Cache Folder",
+        description="Folder of the disk import cache, a temporary folder when empty",
+        subtype='DIR_PATH',
+        default='',
+        update=update_import_cache)
+    import_disk_cache_size: bpy.props.IntProperty(
+        name="Disk Import Cache (MB)",
+        default=4096, min=0,
+        update=update_import_cache)
+    profiling: bpy.props.BoolProperty(
+        name="Profile Nodes",
+        description="Record wall time, Open3D time, element counts and memory peak of every update of the Open3D nodes",
+        default=False,
+        update=update_profiling)
+    profiling_overlay: bpy.props.BoolProperty(
+        name="Show in Node Editor",
+        description="Draw the last record above every profiled node",
+        default=True,
+        update=update_profiling)
+    profiling_history: bpy.props.IntProperty(
+        name="Updates Kept per Node",
+        default=32, min=1,
+        update=update_profiling)
 
     def draw(self, context):
         layout = self.layout
@@ -63,6 +134,24 @@ class SvO3Preferences(AddonPreferences):
         box.label(text="Dependencies:")
         draw_message(box, "sverchok", dependencies=ex_dependencies)
         draw_message(box, "open3d", dependencies=ex_dependencies)
+        box = layout.box()
+        box.label(text="Performance:")
+        box.prop(self, 'derived_cache_size')
+        box.prop(self, 'worker_count')
+        box.prop(self, 'import_cache_size')
+        box.prop(self, 'import_disk_cache')
+        if self.import_disk_cache:
+            box.prop(self, 'import_cache_dir')
+            box.prop(self, 'import_disk_cache_size')
+        box = layout.box()
+        box.label(text="Profiling:")
+        box.prop(self, 'profiling')
+        if self.profiling:
+            box.prop(self, 'profiling_overlay')
+            box.prop(self, 'profiling_history')
+            row = box.row()
+            row.operator('node.sv_o3d_profile_clear')
+            row.operator('node.sv_o3d_profile_export')
         row = layout.row()
         row.operator('node.sv_show_latest_commits').commits_link = COMMITS_LINK
         if not self.available_new_version:
@@ -77,9 +166,12 @@ class SvO3Preferences(AddonPreferences):
 
 def register():
     bpy.utils.register_class(SvO3Preferences)
+    apply_preferences()
     #bpy.types.SV_PT_SverchokUtilsPanel.append(sv_draw_update_menu_in_panel)
 
 def unregister():
+    shutdown_pool()
+    set_profiling(False)
     bpy.utils.unregister_class(SvO3Preferences)
     #bpy.types.SV_PT_SverchokUtilsPanel.remove(sv_draw_update_menu_in_panel)
 
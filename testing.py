@@ -5,9 +5,13 @@ import unittest
 from io import StringIO
 from contextlib import contextmanager
 
+import numpy as np
+
 import sverchok
 from sverchok.utils.sv_logging import sv_logger
 import sverchok_open3d
+from sverchok_open3d.utils.cow import CowTriangleMesh, to_cow
+from sverchok_open3d.core.transform import vector_transform
 
 try:
     import coverage
@@ -34,6 +38,14 @@ def get_tests_path():
     sv_ex_init = sverchok_open3d.__file__
     return join(dirname(sv_ex_init), "tests")
 
+def moved_handle(arrays, offset):
+    '''What Open3d Transform does: the vertices are copied, the triangles stay shared (read-only)'''
+    mesh = to_cow(CowTriangleMesh.from_arrays(**arrays))
+    matrix = np.eye(4)
+    matrix[:3, 3] = offset
+    vector_transform(mesh.writable('vertices'), matrix, 'MATRIX', 1, [1.0])
+    return mesh
+
 def run_all_tests(pattern=None):
     if pattern is None:
         pattern = "*_tests.py"
@@ -0,0 +1,29 @@
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+
+from sverchok_open3d.testing import moved_handle
+from sverchok_open3d.utils.cow import to_cow, to_o3d, CowTriangleMesh
+from sverchok_open3d.benchmarks.meshes import grid_mesh
+
+
+class CowGeometryTestCase(SverchokTestCase):
+    def test_transformed_handle_to_open3d(self):
+        arrays = grid_mesh(32)
+        mesh = moved_handle(arrays, [1, 2, 3])
+        self.assertFalse(mesh.triangles.flags.writeable)
+        for copy_data in (False, True):
+            with self.subTest(copy_data=copy_data):
+                geometry = to_o3d(mesh, copy_data=copy_data)
+                np.testing.assert_allclose(np.asarray(geometry.vertices), arrays['vertices'] + [1, 2, 3])
+                np.testing.assert_array_equal(np.asarray(geometry.triangles), arrays['triangles'])
+                smoothed = geometry.filter_smooth_simple(number_of_iterations=1)
+                self.assertEqual(len(smoothed.vertices), len(arrays['vertices']))
+
+    def test_stamp(self):
+        mesh = to_cow(CowTriangleMesh.from_arrays(**grid_mesh(32)))
+        copy = mesh.shallow_copy()
+        self.assertEqual(copy.stamp(), mesh.stamp())
+        copy.writable('vertices')
+        self.assertNotEqual(copy.stamp(['vertices']), mesh.stamp(['vertices']))
+        self.assertEqual(copy.stamp(['triangles']), mesh.stamp(['triangles']))
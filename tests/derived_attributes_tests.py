@@ -0,0 +1,35 @@
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+
+from sverchok_open3d.utils.cow import CowTriangleMesh, to_cow
+from sverchok_open3d.utils.derived_attributes import face_normals, vertex_normals
+from sverchok_open3d.core.open3d_ops import geometry_from_arrays
+from sverchok_open3d.core.triangle_mesh import calc_vertex_normals
+from sverchok_open3d.benchmarks.meshes import grid_mesh
+
+
+class DerivedAttributesTestCase(SverchokTestCase):
+    def test_shared_by_shallow_copies(self):
+        mesh = to_cow(CowTriangleMesh.from_arrays(**grid_mesh(200)))
+        self.assertIs(face_normals(to_cow(mesh)), face_normals(mesh))
+
+    def test_writable_buffer_changed_in_place(self):
+        mesh = to_cow(CowTriangleMesh.from_arrays(**grid_mesh(20000)))
+        mesh.writable('vertices')
+        before = face_normals(mesh)
+        # the buffer is requested again to write after reading derived data
+        verts = mesh.writable('vertices')
+        verts[1] += 5
+        expected = calc_vertex_normals(verts, mesh.triangles)[0]
+        np.testing.assert_allclose(face_normals(mesh), expected)
+        self.assertFalse(np.allclose(before, expected))
+
+    def test_open3d_geometry_changed_in_place(self):
+        arrays = grid_mesh(20000)
+        geometry = geometry_from_arrays('TriangleMesh', arrays)
+        before = vertex_normals(geometry)
+        np.asarray(geometry.vertices)[1] += 5
+        expected = calc_vertex_normals(np.asarray(geometry.vertices), arrays['triangles'])[1]
+        np.testing.assert_allclose(vertex_normals(geometry), expected)
+        self.assertFalse(np.allclose(before, expected))
@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+
+from sverchok_open3d.testing import moved_handle
+from sverchok_open3d.utils.cow import instances_of
+from sverchok_open3d.core.open3d_ops import write_geometry, read_geometry
+from sverchok_open3d.nodes.utils.o3d_export import write_instances
+from sverchok_open3d.benchmarks.meshes import grid_mesh
+
+
+class ExportTestCase(SverchokTestCase):
+    def test_export_handle(self):
+        # the arrays the export operator sends to the writer threads
+        arrays = grid_mesh(32)
+        mesh = moved_handle(arrays, [1, 2, 3])
+        matrices = np.tile(np.eye(4), (2, 1, 1))
+        matrices[1, :3, 3] = [0, 0, 1]
+        instances = instances_of(mesh, matrices)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'mesh.ply')
+            write_geometry(path, 'TriangleMesh', mesh.shallow_copy().arrays())
+            geometry, _ = read_geometry(path, 'triangle_mesh')
+            np.testing.assert_allclose(np.asarray(geometry.vertices), arrays['vertices'] + [1, 2, 3], rtol=1e-6)
+            np.testing.assert_array_equal(np.asarray(geometry.triangles), arrays['triangles'])
+
+            path = os.path.join(folder, 'instances.ply')
+            write_instances(write_geometry, path, 'TriangleMesh', instances.base.arrays(), instances.matrices)
+            geometry, _ = read_geometry(path, 'triangle_mesh')
+            np.testing.assert_allclose(np.asarray(geometry.vertices), instances.vertices, rtol=1e-6)
+            np.testing.assert_array_equal(np.asarray(geometry.triangles), instances.triangles)
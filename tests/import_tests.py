@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+
+from sverchok_open3d.utils.cow import to_o3d
+from sverchok_open3d.core.open3d_ops import write_geometry, read_geometry, smooth_triangle_mesh
+from sverchok_open3d.core.native_format import write_native
+from sverchok_open3d.nodes.utils.o3d_import import read_native_geometry
+from sverchok_open3d.benchmarks.meshes import grid_mesh
+
+
+class ImportTestCase(SverchokTestCase):
+    def test_imported_handle(self):
+        # the blocks of native files are read-only memory maps
+        arrays = grid_mesh(32)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'mesh.svo3d')
+            write_native(path, 'TriangleMesh', arrays)
+            mesh, _ = read_native_geometry(path, 'triangle_mesh')
+            smoothed = smooth_triangle_mesh(to_o3d(mesh), 'simple', 1)
+            self.assertEqual(len(smoothed.vertices), len(arrays['vertices']))
+            export_path = os.path.join(folder, 'mesh.ply')
+            write_geometry(export_path, 'TriangleMesh', mesh.shallow_copy().arrays())
+            geometry, _ = read_geometry(export_path, 'triangle_mesh')
+            np.testing.assert_array_equal(np.asarray(geometry.triangles), arrays['triangles'])
+            # the memory maps keep the file open until the handle is gone
+            del mesh
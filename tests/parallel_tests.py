@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from sverchok.utils.testing import SverchokTestCase
+
+from sverchok_open3d.testing import moved_handle
+from sverchok_open3d.core.open3d_ops import smooth_triangle_mesh
+from sverchok_open3d.utils.nodes_mixins import SvO3ParallelNode
+from sverchok_open3d.benchmarks.meshes import grid_mesh
+
+
+class ParallelModesTestCase(SverchokTestCase):
+    def test_map_objects_transformed_handles(self):
+        arrays = grid_mesh(32)
+        meshes = [moved_handle(arrays, [i, 0, 0]) for i in range(3)]
+        calls = [((mesh, 'simple', 1), {}) for mesh in meshes]
+        for mode in ('NONE', 'THREADS'):
+            with self.subTest(parallel_mode=mode):
+                node = SimpleNamespace(parallel_mode=mode)
+                results = SvO3ParallelNode.map_objects(node, smooth_triangle_mesh, calls)
+                self.assertEqual(len(results), len(meshes))
+                for i, result in enumerate(results):
+                    # the grid is symmetric, the offset survives the smoothing
+                    self.assertAlmostEqual(np.asarray(result.vertices)[:, 0].mean(), 0.5 + i)
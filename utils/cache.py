@@ -0,0 +1,123 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+# Caches of data derived from geometry buffers.
+# Entries are keyed by the identity of the buffers they were computed from
+# (memory address and shape plus the version of copy-on-write handles, or a
+# digest of the content of other buffers) and they are dropped as soon as the
+# object owning those buffers is garbage collected, so a new buffer allocated
+# at the same address can not be mistaken by an old one.
+
+def root_base(arr):
+    '''Object owning the memory of a NumPy array (array, Open3D vector, mmap...)'''
+    owner = arr
+    while isinstance(owner, np.ndarray) and owner.base is not None:
+        owner = owner.base
+    return owner
+
+def buffer_identity(arr):
+    '''Address and layout of a buffer'''
+    arr = np.asarray(arr)
+    return (arr.__array_interface__['data'][0], arr.shape, arr.strides, arr.dtype.str)
+
+def buffer_fingerprint(arr):
+    '''Identity and digest of the whole content of a buffer, for buffers that can change in place'''
+    arr = np.asarray(arr)
+    digest = hashlib.blake2b(np.ascontiguousarray(arr), digest_size=16).digest()
+    return buffer_identity(arr) + (digest,)
+
+def nbytes_of(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes_of(v) for v in value)
+    return getattr(value, 'nbytes', 0)
+
+
+class BufferCache:
+    '''
+    LRU cache bounded in bytes. Every entry is bound to the life of one or more
+    owner objects (see root_base), when any of them dies the entry is removed.
+    '''
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        '''Cached value or None'''
+        entry = self._entries.get(key)
+        if entry is not None and all(ref() is not None for ref in entry[2]):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return None
+
+    def put(self, key, value, owners, nbytes=nbytes_of):
+        try:
+            refs = [weakref.ref(owner, lambda ref, key=key: self._owner_died(key, ref)) for owner in owners]
+        except TypeError:
+            # owner can not be tracked, the value can not be safely reused
+            return
+        size = nbytes(value)
+        if size > self.max_bytes:
+            return
+        self.discard(key)
+        self._entries[key] = (value, size, refs)
+        self._bytes += size
+        self._shrink()
+
+    def get(self, key, owners, compute, nbytes=nbytes_of):
+        value = self.lookup(key)
+        if value is None:
+            value = compute()
+            self.put(key, value, owners, nbytes)
+        return value
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _owner_died(self, key, ref):
+        entry = self._entries.get(key)
+        if entry is not None and any(r is ref for r in entry[2]):
+            self.discard(key)
+
+    def _shrink(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._shrink()
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,337 @@
+import copy
+import numpy as np
+
+from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.core.attributes import TRIANGLE_MESH_ATTRIBUTES, POINT_CLOUD_ATTRIBUTES
+from sverchok_open3d.core.profiling import native_call
+from sverchok_open3d.core.instancing import as_matrices, expand_instances
+from sverchok_open3d.core.open3d_ops import o3d_vector
+from sverchok_open3d.utils.cache import buffer_identity
+
+# Copy-on-write geometry handles.
+# A handle keeps every attribute of an Open3D geometry as a NumPy buffer.
+# Buffers are shared (read-only) with the geometry they were taken from until
+# a node asks for a writable one, then only that buffer is copied.
+# Handles mimic the read API of TriangleMesh / PointCloud (np.asarray(mesh.vertices),
+# mesh.has_vertex_normals()...) so nodes that only read data accept both types.
+
+def _read_only(arr):
+    view = arr.view()
+    view.flags.writeable = False
+    return view
+
+class CowGeometry:
+    attributes = {}
+    o3d_type_name = ''
+
+    def __init__(self, source=None):
+        self._arrays = {}
+        self._owned = set()
+        self._versions = {}
+        self._o3d = None
+        # keeps the buffers of the original Open3D geometry alive
+        self._source = source
+
+    @classmethod
+    def from_arrays(cls, **arrays):
+        '''Handle sharing the given buffers (read-only)'''
+        handle = cls()
+        for name, arr in arrays.items():
+            if name not in cls.attributes:
+                raise KeyError(f'Unknown attribute {name}')
+            if len(arr) > 0:
+                handle._arrays[name] = _read_only(arr)
+        return handle
+
+    @classmethod
+    def from_o3d(cls, geometry):
+        handle = cls(source=geometry)
+        for name in cls.attributes:
+            arr = np.asarray(getattr(geometry, name))
+            if len(arr) > 0:
+                handle._arrays[name] = _read_only(arr)
+        handle._o3d = geometry
+        return handle
+
+    def __getattr__(self, name):
+        attributes = type(self).attributes
+        if name in attributes:
+            arr = self.__dict__.get('_arrays', {}).get(name)
+            if arr is None:
+                dtype, width = attributes[name]
+                return np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+            return arr
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name in type(self).attributes:
+            self.set_attribute(name, value)
+        else:
+            object.__setattr__(self, name, value)
+
+    def set_attribute(self, name, value, owned=False):
+        '''Replace an attribute. Buffers not owned are stored as read-only views'''
+        arr = np.asarray(value)
+        if len(arr) == 0:
+            self._arrays.pop(name, None)
+            self._owned.discard(name)
+        elif owned:
+            self._arrays[name] = arr
+            self._owned.add(name)
+        else:
+            self._arrays[name] = _read_only(arr)
+            self._owned.discard(name)
+        self._touch(name)
+
+    def writable(self, name):
+        '''
+        Writable buffer of the attribute, copied the first time it is requested.
+        Every call counts as a change of the attribute (see stamp), request it again
+        to write after reading data derived from it
+        '''
+        if name not in self._owned:
+            dtype, _ = type(self).attributes[name]
+            arr = self._arrays.get(name)
+            if arr is None:
+                raise KeyError(f'Geometry has no {name}')
+            self._arrays[name] = np.array(arr, dtype=dtype)
+            self._owned.add(name)
+        self._touch(name)
+        return self._arrays[name]
+
+    def arrays(self):
+        '''Attribute buffers as the dict the core kernels work with'''
+        return dict(self._arrays)
+
+    def update(self, arrays):
+        '''
+        Store the dict returned by a core kernel: buffers that are the same objects stay shared,
+        new writable buffers become owned by the handle and missing attributes are removed
+        '''
+        for name in list(self._arrays):
+            if name not in arrays:
+                self.set_attribute(name, [])
+        for name, arr in arrays.items():
+            if arr is not self._arrays.get(name):
+                self.set_attribute(name, arr, owned=np.asarray(arr).flags.writeable)
+        return self
+
+    def _touch(self, name):
+        self._versions[name] = self._versions.get(name, 0) + 1
+        self._o3d = None
+
+    def stamp(self, names=None):
+        '''
+        Identity of the current content of the given attributes: buffer identity and the version
+        of the attribute, that goes up on every set_attribute / writable call. Handles sharing
+        a buffer (shallow copies) give the same stamp until one of them changes it
+        '''
+        if names is None:
+            names = type(self).attributes
+        stamp = []
+        for name in names:
+            arr = self._arrays.get(name)
+            stamp.append((name, None if arr is None else buffer_identity(arr), self._versions.get(name, 0)))
+        return tuple(stamp)
+
+    def shallow_copy(self):
+        new = type(self)(source=self._source)
+        new._arrays = dict(self._arrays)
+        new._versions = dict(self._versions)
+        # buffers owned by this handle are shared now, the copy must not write them
+        for name in self._owned:
+            new._arrays[name] = _read_only(self._arrays[name])
+            self._arrays[name] = new._arrays[name]
+        self._owned = set()
+        new._o3d = self._o3d
+        return new
+
+    def __copy__(self):
+        return self.shallow_copy()
+
+    def __deepcopy__(self, memo):
+        return self.shallow_copy()
+
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self._arrays.values())
+
+    @native_call
+    def to_o3d(self):
+        '''Open3D geometry with the handle data. The result is cached, do not modify it'''
+        if self._o3d is None:
+            geometry = getattr(o3d.geometry, self.o3d_type_name)()
+            for name, arr in self._arrays.items():
+                dtype, width = type(self).attributes[name]
+                setattr(geometry, name, o3d_vector(arr, dtype, width))
+            self._o3d = geometry
+        return self._o3d
+
+    def __repr__(self):
+        sizes = ', '.join(f'{name}: {len(arr)}' for name, arr in self._arrays.items())
+        return f'<{type(self).__name__} {sizes}>'
+
+
+class CowTriangleMesh(CowGeometry):
+    attributes = TRIANGLE_MESH_ATTRIBUTES
+    o3d_type_name = 'TriangleMesh'
+
+    def has_vertices(self):
+        return len(self.vertices) > 0
+
+    def has_triangles(self):
+        return self.has_vertices() and len(self.triangles) > 0
+
+    def has_vertex_normals(self):
+        return self.has_vertices() and len(self.vertex_normals) == len(self.vertices)
+
+    def has_vertex_colors(self):
+        return self.has_vertices() and len(self.vertex_colors) == len(self.vertices)
+
+    def has_triangle_normals(self):
+        return self.has_triangles() and len(self.triangle_normals) == len(self.triangles)
+
+    def has_triangle_uvs(self):
+        return self.has_triangles() and len(self.triangle_uvs) == 3 * len(self.triangles)
+
+    def has_triangle_material_ids(self):
+        return self.has_triangles() and len(self.triangle_material_ids) == len(self.triangles)
+
+
+class CowPointCloud(CowGeometry):
+    attributes = POINT_CLOUD_ATTRIBUTES
+    o3d_type_name = 'PointCloud'
+
+    def has_points(self):
+        return len(self.points) > 0
+
+    def has_normals(self):
+        return self.has_points() and len(self.normals) == len(self.points)
+
+    def has_colors(self):
+        return self.has_points() and len(self.colors) == len(self.points)
+
+
+class CowInstances:
+    '''
+    Instances of a geometry: one shared base handle and an (N, 4, 4) matrix per instance.
+    Nodes that understand instances read base and matrices, for the rest the handle
+    behaves as the flat geometry, whose buffers are built the first time they are read.
+    Use to_cow to get a flat handle to modify
+    '''
+    flat_type = None
+
+    def __init__(self, base, matrices):
+        super().__init__()
+        self.base = base
+        self.matrices = _read_only(as_matrices(matrices))
+        self.__dict__['_arrays'] = None
+
+    @property
+    def _arrays(self):
+        arrays = self.__dict__['_arrays']
+        if arrays is None:
+            expanded = expand_instances(self.base.arrays(), self.matrices)
+            arrays = {name: _read_only(arr) for name, arr in expanded.items() if len(arr) > 0}
+            self.__dict__['_arrays'] = arrays
+        return arrays
+
+    @_arrays.setter
+    def _arrays(self, value):
+        self.__dict__['_arrays'] = value
+
+    def __getattr__(self, name):
+        if name in type(self).attributes:
+            self._arrays
+        return super().__getattr__(name)
+
+    @property
+    def expanded(self):
+        return self.__dict__['_arrays'] is not None
+
+    def transformed(self, matrices):
+        '''Instances moved by one matrix, or by one matrix per instance'''
+        return type(self)(self.base, as_matrices(matrices) @ self.matrices)
+
+    def flat(self):
+        '''Handle of the flat geometry sharing the expanded buffers'''
+        return self.flat_type.from_arrays(**self._arrays)
+
+    def shallow_copy(self):
+        new = type(self)(self.base, self.matrices)
+        if self.expanded:
+            new.__dict__['_arrays'] = dict(self.__dict__['_arrays'])
+        return new
+
+    def nbytes(self):
+        flat = sum(arr.nbytes for arr in self.__dict__['_arrays'].values()) if self.expanded else 0
+        return self.base.nbytes() + self.matrices.nbytes + flat
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {len(self.matrices)} x {self.base!r}>'
+
+class CowTriangleMeshInstances(CowInstances, CowTriangleMesh):
+    flat_type = CowTriangleMesh
+
+class CowPointCloudInstances(CowInstances, CowPointCloud):
+    flat_type = CowPointCloud
+
+def instances_of(geometry, matrices):
+    '''Instances of a geometry (handle, Open3D geometry or instances) by an (N, 4, 4) array of matrices'''
+    if isinstance(geometry, CowInstances):
+        matrices = as_matrices(matrices)
+        # every new matrix applied to every previous instance
+        return type(geometry)(geometry.base, (matrices[:, np.newaxis] @ geometry.matrices).reshape(-1, 4, 4))
+    base = to_cow(geometry)
+    if isinstance(base, CowTriangleMesh):
+        return CowTriangleMeshInstances(base, matrices)
+    return CowPointCloudInstances(base, matrices)
+
+def shared_instances(geometries):
+    '''Instances with the matrices of all the geometries if they are instances of the same base, else None'''
+    if not geometries or not all(isinstance(geometry, CowInstances) for geometry in geometries):
+        return None
+    base = geometries[0].base
+    buffers = base.arrays()
+    for geometry in geometries:
+        # handles taken from the same geometry share its buffer objects
+        other = geometry.base.arrays()
+        if other.keys() != buffers.keys() or any(other[name] is not arr for name, arr in buffers.items()):
+            return None
+    if len(geometries) == 1:
+        return geometries[0]
+    return type(geometries[0])(base, np.concatenate([geometry.matrices for geometry in geometries]))
+
+def is_triangle_mesh(geometry):
+    return isinstance(geometry, (CowTriangleMesh, o3d.geometry.TriangleMesh))
+
+def is_point_cloud(geometry):
+    return isinstance(geometry, (CowPointCloud, o3d.geometry.PointCloud))
+
+def to_cow(geometry):
+    '''New handle sharing all the buffers of the geometry'''
+    if isinstance(geometry, CowInstances):
+        return geometry.flat()
+    if isinstance(geometry, CowGeometry):
+        return geometry.shallow_copy()
+    if isinstance(geometry, o3d.geometry.TriangleMesh):
+        return CowTriangleMesh.from_o3d(geometry)
+    if isinstance(geometry, o3d.geometry.PointCloud):
+        return CowPointCloud.from_o3d(geometry)
+    raise TypeError(f'Unsupported geometry: {type(geometry)}')
+
+def to_o3d(geometry, copy_data=False):
+    '''
+    Open3D geometry of a handle or Open3D geometry.
+    Use copy_data=True when the result is going to be modified in place
+    '''
+    if isinstance(geometry, CowGeometry):
+        if copy_data:
+            cached = geometry._o3d
+            geometry._o3d = None
+            new_geometry = geometry.to_o3d()
+            geometry._o3d = cached
+            return new_geometry
+        return geometry.to_o3d()
+    if copy_data:
+        return copy.deepcopy(geometry)
+    return geometry
@@ -0,0 +1,117 @@
+import numpy as np
+
+from sverchok_open3d.utils.cache import BufferCache, buffer_fingerprint, root_base
+from sverchok_open3d.utils.cow import CowGeometry
+from sverchok_open3d.utils.triangle_mesh import calc_normals, calc_centers, calc_mesh_tris_areas
+from sverchok_open3d.core.topology import MeshTopology, unique_edges as calc_unique_edges
+from sverchok_open3d.core.spatial_index import SpatialIndex, point_statistics
+from sverchok_open3d.core.lod import PointPyramid
+from sverchok_open3d.core.mask import MaskEngine
+
+# Attributes derived from the mesh buffers shared by all nodes.
+# Returned arrays are read-only, copy them before modifying.
+
+derived_cache = BufferCache('Derived Attributes', 256 * 2**20)
+
+def _read_only(value):
+    if isinstance(value, tuple):
+        return tuple(_read_only(v) for v in value)
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    return value
+
+def _key(geometry, attribute, depends_on):
+    '''
+    Handles are keyed by their stamp, the version of an attribute goes up when it is changed.
+    Open3D geometries can be changed in place, they are keyed by the digest of their buffers
+    '''
+    if isinstance(geometry, CowGeometry):
+        owners = [root_base(np.asarray(getattr(geometry, name))) for name in depends_on]
+        return (attribute, geometry.stamp(depends_on)), owners
+    key = [attribute]
+    for name in depends_on:
+        key.append(buffer_fingerprint(np.asarray(getattr(geometry, name))))
+    # Open3D returns a new wrapper of its buffers on every access,
+    # so the geometry itself is the owner of Open3D buffers
+    return tuple(key), [geometry] * len(depends_on)
+
+def _cached(mesh, attribute, depends_on, compute):
+    key, owners = _key(mesh, attribute, depends_on)
+    return derived_cache.get(key, owners, lambda: _read_only(compute()))
+
+def face_normals(mesh):
+    return _cached(mesh, 'face_normals', ('vertices', 'triangles'),
+                   lambda: calc_normals(mesh, v_normals=False))
+
+def vertex_and_face_normals(mesh):
+    '''Face normals and vertex normals computed in one pass'''
+    return _cached(mesh, 'vertex_and_face_normals', ('vertices', 'triangles'),
+                   lambda: calc_normals(mesh, v_normals=True))
+
+def vertex_normals(mesh):
+    return vertex_and_face_normals(mesh)[1]
+
+def face_centers(mesh):
+    return _cached(mesh, 'face_centers', ('vertices', 'triangles'),
+                   lambda: calc_centers(mesh))
+
+def face_areas(mesh):
+    return _cached(mesh, 'face_areas', ('vertices', 'triangles'),
+                   lambda: calc_mesh_tris_areas(mesh))
+
+def unique_edges(mesh):
+    return _cached(mesh, 'unique_edges', ('triangles',),
+                   lambda: calc_unique_edges(np.asarray(mesh.triangles), len(mesh.vertices)))
+
+def mesh_topology(mesh):
+    '''MeshTopology shared by all the meshes with the same triangles buffer'''
+    vertex_count = len(mesh.vertices)
+    return _cached(mesh, ('topology', vertex_count), ('triangles',),
+                   lambda: MeshTopology(np.asarray(mesh.triangles), vertex_count))
+
+def mask_engine(mesh):
+    '''MaskEngine of the triangles, shared while the topology does not change'''
+    vertex_count = len(mesh.vertices)
+    return _cached(mesh, ('mask_engine', vertex_count), ('triangles',),
+                   lambda: MaskEngine(np.asarray(mesh.triangles), vertex_count))
+
+def point_cloud_index(pcd):
+    '''SpatialIndex of the points, rebuilt only when the points buffer changes'''
+    return _cached(pcd, 'spatial_index', ('points',),
+                   lambda: SpatialIndex(np.asarray(pcd.points)))
+
+def nearest_neighbor_distance(pcd):
+    return _cached(pcd, 'nearest_neighbor_distance', ('points',),
+                   lambda: point_cloud_index(pcd).nearest_neighbor_distance())
+
+def point_cloud_statistics(pcd, density_neighbors, percentiles):
+    '''core.spatial_index.point_statistics of the point cloud, computed once per points buffer'''
+    percentiles = tuple(float(p) for p in percentiles)
+    return _cached(pcd, ('statistics', density_neighbors, percentiles), ('points',),
+                   lambda: point_statistics(point_cloud_index(pcd), density_neighbors, percentiles))
+
+def point_cloud_pyramid(pcd, depth):
+    '''core.lod.PointPyramid of the points, colors and normals, rebuilt only when one of them changes'''
+    depends_on = ['points']
+    if pcd.has_colors():
+        depends_on.append('colors')
+    if pcd.has_normals():
+        depends_on.append('normals')
+    return _cached(pcd, ('lod_pyramid', depth), depends_on,
+                   lambda: PointPyramid({name: np.asarray(getattr(pcd, name)) for name in depends_on}, depth))
+
+def _normals_key(pcd, quality, method):
+    depends_on = ('points', 'normals') if pcd.has_normals() else ('points',)
+    return _key(pcd, ('estimated_normals', quality, method), depends_on)
+
+def lookup_estimated_normals(pcd, quality, method):
+    '''Normals estimated before for the same points (and previous normals) or None'''
+    key, _ = _normals_key(pcd, quality, method)
+    return derived_cache.lookup(key)
+
+def store_estimated_normals(pcd, quality, method, normals):
+    key, owners = _normals_key(pcd, quality, method)
+    derived_cache.put(key, _read_only(normals), owners)
+
+def set_cache_size(megabytes):
+    derived_cache.set_max_bytes(int(megabytes * 2**20))
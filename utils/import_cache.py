@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from sverchok_open3d.utils.cache import BufferCache
+from sverchok_open3d.utils.cow import CowTriangleMesh, CowPointCloud, to_cow
+from sverchok_open3d.core import array_store
+
+# Geometry read by the import nodes, keyed by the file (absolute path, size and
+# modification time) and the reader options. Entries are copy-on-write handles,
+# every hit returns a new handle sharing the cached buffers.
+# The optional disk tier keeps the decoded buffers as .npy blocks, so reopening
+# a .blend file does not parse the files again.
+
+import_cache = BufferCache('Import', 512 * 2**20)
+
+DEFAULT_DISK_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'sverchok_open3d_import_cache')
+_disk_cache_dir = None
+_disk_cache_max_bytes = 4 * 2**30
+
+def set_import_cache_size(megabytes):
+    import_cache.set_max_bytes(int(megabytes * 2**20))
+
+def set_disk_cache(enabled, directory='', megabytes=4096):
+    '''Enable the disk tier in the given directory (a temporary one if empty)'''
+    global _disk_cache_dir, _disk_cache_max_bytes
+    _disk_cache_dir = (directory or DEFAULT_DISK_CACHE_DIR) if enabled else None
+    _disk_cache_max_bytes = int(megabytes * 2**20)
+
+def import_key(path, import_type, options):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, import_type, tuple(sorted(options.items())))
+
+def _handle_from_arrays(kind, arrays):
+    handle_class = CowTriangleMesh if kind == 'TriangleMesh' else CowPointCloud
+    return handle_class.from_arrays(**arrays)
+
+def _handle_nbytes(handle):
+    return handle.nbytes()
+
+def lookup(key):
+    '''New handle of the cached geometry or None'''
+    handle = import_cache.lookup(key)
+    if handle is None and _disk_cache_dir is not None:
+        stored = array_store.load_arrays(_disk_cache_dir, key)
+        if stored is not None:
+            handle = _handle_from_arrays(*stored)
+            import_cache.put(key, handle, [], nbytes=_handle_nbytes)
+    return None if handle is None else handle.shallow_copy()
+
+def store(key, geometry):
+    '''Keep the read geometry, returns the handle to use in place of it'''
+    handle = to_cow(geometry)
+    import_cache.put(key, handle, [], nbytes=_handle_nbytes)
+    if _disk_cache_dir is not None:
+        try:
+            array_store.save_arrays(_disk_cache_dir, key, handle.o3d_type_name, handle.arrays())
+            array_store.prune(_disk_cache_dir, _disk_cache_max_bytes)
+        except OSError:
+            # the disk tier is only an optimization
+            pass
+    return handle.shallow_copy()
@@ -0,0 +1,54 @@
+from bpy.props import EnumProperty
+
+from sverchok.data_structure import updateNode
+
+from sverchok_open3d.utils.cow import CowGeometry, to_o3d
+from sverchok_open3d.utils.parallel import run_in_processes, run_in_threads
+from sverchok_open3d.utils.profiling import profiled
+from sverchok_open3d.core.profiling import native_time
+
+parallel_modes = [
+    ('NONE', "Serial", "Process the objects one after the other", 0),
+    ('PROCESSES', "Processes", "Send every object to a pool of worker processes, geometry travels through shared memory", 1),
+    ('THREADS', "Threads", "Run the objects in a pool of threads sharing the geometry, faster when Open3D releases the GIL", 2),
+]
+
+class SvO3ProfiledNode:
+    '''
+    Mixin of the Open3D nodes: their updates are recorded while profiling
+    is enabled in the add-on preferences (see utils.profiling)
+    '''
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        process = getattr(cls, 'process', None)
+        if process is not None and not getattr(process, 'sv_o3_profiled', False):
+            cls.process = profiled(process)
+
+class SvO3ParallelNode(SvO3ProfiledNode):
+    '''
+    Mixin for nodes whose objects can be processed independently.
+    process_data builds one (args, kwargs) per object and calls map_objects with a
+    function of sverchok_open3d.core taking and returning Open3D geometries.
+    '''
+    parallel_mode: EnumProperty(
+        name="Parallel",
+        description="Run the objects of the input lists in parallel",
+        items=parallel_modes,
+        default='NONE',
+        update=updateNode)
+
+    def draw_parallel(self, layout):
+        layout.prop(self, 'parallel_mode')
+
+    def map_objects(self, func, calls):
+        '''Results of func(*args, **kwargs) for every (args, kwargs) in calls, in the same order'''
+        if self.parallel_mode == 'PROCESSES' and len(calls) > 1:
+            # the calls of the workers are not seen by the profiler, count the whole run
+            with native_time():
+                return run_in_processes(func, calls)
+        # handles cache their Open3D geometry, build them here and not in the threads
+        calls = [([to_o3d(arg) if isinstance(arg, CowGeometry) else arg for arg in args], kwargs)
+                 for args, kwargs in calls]
+        if self.parallel_mode == 'THREADS' and len(calls) > 1:
+            return run_in_threads(func, calls)
+        return [func(*args, **kwargs) for args, kwargs in calls]
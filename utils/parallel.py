@@ -0,0 +1,142 @@
+import os
+import sys
+import runpy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import bpy
+
+from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.core import parallel as core_parallel
+from sverchok_open3d.utils.cow import CowGeometry, CowTriangleMesh, CowPointCloud, to_cow
+
+# Pools of the nodes parallel modes (see utils.nodes_mixins).
+# Worker processes are spawned (no fork of Blender), they run the functions of
+# sverchok_open3d.core and receive the geometry through shared memory.
+# Worker threads share the geometry with Blender, they only help with the
+# Open3D calls that release the GIL.
+
+BOOTSTRAP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core', 'worker_bootstrap.py')
+
+if bpy.app.version >= (2, 91, 0):
+    PYPATH = sys.executable
+else:
+    PYPATH = bpy.app.binary_path_python
+
+_worker_count = 0
+_pool = None
+_thread_pool = None
+
+def set_worker_count(count):
+    '''Number of worker processes, 0 to use one per CPU'''
+    global _worker_count
+    if count != _worker_count:
+        _worker_count = count
+        shutdown_pool()
+
+def get_worker_count():
+    return _worker_count or os.cpu_count() or 1
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        context = multiprocessing.get_context('spawn')
+        context.set_executable(PYPATH)
+        _pool = ProcessPoolExecutor(
+            max_workers=get_worker_count(),
+            mp_context=context,
+            initializer=runpy.run_path,
+            initargs=(BOOTSTRAP,))
+    return _pool
+
+def get_thread_pool():
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=get_worker_count(), thread_name_prefix='sv_o3d')
+    return _thread_pool
+
+def shutdown_pool():
+    global _pool, _thread_pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
+
+def describe(value):
+    if isinstance(value, CowGeometry):
+        return value.o3d_type_name, value.arrays()
+    if o3d is not None and isinstance(value, (o3d.geometry.TriangleMesh, o3d.geometry.PointCloud)):
+        handle = to_cow(value)
+        return handle.o3d_type_name, handle.arrays()
+    return None
+
+def build(kind, arrays):
+    handle = CowTriangleMesh() if kind == 'TriangleMesh' else CowPointCloud()
+    for name, arr in arrays.items():
+        handle.set_attribute(name, np.array(arr), owned=True)
+    return handle
+
+def _discard_result(future):
+    '''Free the shared memory of a result that is not going to be read'''
+    if future.cancel() or future.exception() is not None:
+        return
+    _, shm_name, _ = future.result()
+    if shm_name is not None:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        shm.close()
+        shm.unlink()
+
+def run_in_processes(func, calls):
+    '''
+    Run func(*args, **kwargs) for every (args, kwargs) of calls in the worker processes.
+    func must be importable from sverchok_open3d.core. Results keep the order of calls,
+    geometries come back as copy-on-write handles
+    '''
+    blocks, futures, results = [], [], []
+    try:
+        pool = get_pool()
+        for call in calls:
+            encoded, shm, layout = core_parallel.encode_shared(call, describe)
+            if shm is not None:
+                blocks.append(shm)
+            futures.append(pool.submit(core_parallel.call_shared, func, encoded, shm.name if shm else None, layout))
+        for future in futures:
+            encoded, shm_name, layout = future.result()
+            results.append(core_parallel.decode_shared(encoded, shm_name, layout, build, unlink=True))
+        return results
+    except BrokenProcessPool:
+        shutdown_pool()
+        raise Exception('A worker process crashed, try the serial mode')
+    finally:
+        for future in futures[len(results):]:
+            try:
+                _discard_result(future)
+            except Exception:
+                pass
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+def submit_in_threads(func, calls):
+    '''Futures of func(*args, **kwargs) for every (args, kwargs) of calls, run in the worker threads'''
+    pool = get_thread_pool()
+    return [pool.submit(func, *args, **kwargs) for args, kwargs in calls]
+
+def run_in_threads(func, calls):
+    '''
+    Run func(*args, **kwargs) for every (args, kwargs) of calls in the worker threads.
+    The arguments must be ready to use (Open3D geometries, not handles) and must not be
+    modified by func. Results keep the order of calls
+    '''
+    futures = submit_in_threads(func, calls)
+    try:
+        return [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
@@ -1,7 +1,17 @@
-from sverchok_open3d.dependencies import open3d as o3d
-import numpy as np
-def calc_point_cloud_normals(pcd, quality, method):
-    s_p = o3d.geometry.KDTreeSearchParamKNN(quality)
-    pcd.estimate_normals(search_param=s_p)
-    if method == 'TANGENT':
-        pcd.orient_normals_consistent_tangent_plane(quality)
+from sverchok_open3d.core.open3d_ops import calc_point_cloud_normals, point_cloud_normals
+from sverchok_open3d.utils.derived_attributes import lookup_estimated_normals, store_estimated_normals
+
+def estimated_normals(pcds, qualities, method, map_objects):
+    '''
+    Normals of every point cloud as Open3D estimate_normals gives them (read-only arrays).
+    Point clouds whose points (and previous normals) did not change reuse the last result,
+    the others are sent to map_objects (see SvO3ParallelNode)
+    '''
+    normals = [lookup_estimated_normals(pcd, quality, method) for pcd, quality in zip(pcds, qualities)]
+    missing = [i for i, arr in enumerate(normals) if arr is None]
+    calls = [((pcds[i].points, pcds[i].normals if pcds[i].has_normals() else None, qualities[i], method), {})
+             for i in missing]
+    for i, arr in zip(missing, map_objects(point_cloud_normals, calls)):
+        store_estimated_normals(pcds[i], qualities[i], method, arr)
+        normals[i] = arr
+    return normals
@@ -0,0 +1,178 @@
+from functools import wraps
+
+import numpy as np
+
+import bpy
+import blf
+
+from sverchok_open3d.dependencies import open3d as o3d
+from sverchok_open3d.utils.cow import CowGeometry, CowInstances, is_triangle_mesh
+from sverchok_open3d.core import profiling
+from sverchok_open3d.core.profiling import is_profiling, Measure
+
+# Blender side of core.profiling: the wrapper of the node updates, the node
+# editor overlay showing the last record of every node and the operators to
+# clear and export the records.
+
+_overlay_handle = None
+
+def geometry_elements(geometry):
+    if isinstance(geometry, CowInstances):
+        # counted without building the flat buffers
+        return geometry_elements(geometry.base) * len(geometry.matrices)
+    return len(geometry.vertices) if is_triangle_mesh(geometry) else len(geometry.points)
+
+def count_data(data):
+    '''(objects, elements) of socket data: geometries count their vertices or points, lists their items'''
+    if isinstance(data, CowGeometry) or (o3d is not None and isinstance(data, o3d.geometry.Geometry)):
+        return 1, geometry_elements(data)
+    if isinstance(data, np.ndarray):
+        return 1, len(data) if data.ndim else 1
+    if isinstance(data, (list, tuple)):
+        if not data:
+            return 0, 0
+        if not isinstance(data[0], (list, tuple, np.ndarray, CowGeometry)) and not (
+                o3d is not None and isinstance(data[0], o3d.geometry.Geometry)):
+            return 1, len(data)
+        objects, elements = 0, 0
+        for item in data:
+            item_objects, item_elements = count_data(item)
+            objects += item_objects
+            elements += item_elements
+        return objects, elements
+    return 1, 1
+
+def socket_counts(sockets):
+    objects, elements = 0, 0
+    for socket in sockets:
+        if not socket.is_linked:
+            continue
+        try:
+            data = socket.sv_get(default=None, deepcopy=False)
+        except Exception:
+            continue
+        if data is not None:
+            socket_objects, socket_elements = count_data(data)
+            objects += socket_objects
+            elements += socket_elements
+    return objects, elements
+
+def profiled(process):
+    '''Wrap the process method of a node class to record its updates'''
+    @wraps(process)
+    def wrapper(self):
+        if not is_profiling():
+            return process(self)
+        objects_in, elements_in = socket_counts(self.inputs)
+        with Measure() as measure:
+            result = process(self)
+        objects_out, elements_out = socket_counts(self.outputs)
+        profiling.record(
+            self.id_data.name, self.name, self.bl_idname,
+            wall_time=measure.wall_time,
+            native_time=measure.native_time,
+            objects_in=objects_in,
+            elements_in=elements_in,
+            objects_out=objects_out,
+            elements_out=elements_out,
+            peak_bytes=measure.peak_bytes)
+        return result
+    wrapper.sv_o3_profiled = True
+    return wrapper
+
+def overlay_lines(entry):
+    return [
+        f"{entry['wall_time'] * 1000:.1f} ms, Open3D {entry['native_time'] * 1000:.1f} ms",
+        f"in {entry['objects_in']} / {entry['elements_in']}, out {entry['objects_out']} / {entry['elements_out']}",
+        f"peak {entry['peak_bytes'] / 2**20:.1f} MB",
+    ]
+
+def node_location(node):
+    x, y = node.location
+    parent = node.parent
+    while parent is not None:
+        x += parent.location.x
+        y += parent.location.y
+        parent = parent.parent
+    return x, y
+
+def draw_overlay():
+    context = bpy.context
+    tree = getattr(context.space_data, 'edit_tree', None)
+    if tree is None or tree.bl_idname != 'SverchCustomTreeType':
+        return
+    region = context.region
+    scale = context.preferences.system.ui_scale
+    font_size = int(11 * scale)
+    try:
+        blf.size(0, font_size)
+    except TypeError:
+        blf.size(0, font_size, 72)
+    blf.color(0, 1.0, 0.85, 0.4, 1.0)
+    for node in tree.nodes:
+        entry = profiling.last_record(tree.name, node.name)
+        if entry is None:
+            continue
+        x, y = node_location(node)
+        x, y = region.view2d.view_to_region(x * scale, y * scale, clip=False)
+        for i, line in enumerate(reversed(overlay_lines(entry))):
+            blf.position(0, x, y + 6 * scale + i * (font_size + 3), 0)
+            blf.draw(0, line)
+
+def set_overlay(enabled):
+    global _overlay_handle
+    if enabled and _overlay_handle is None:
+        _overlay_handle = bpy.types.SpaceNodeEditor.draw_handler_add(draw_overlay, (), 'WINDOW', 'POST_PIXEL')
+    elif not enabled and _overlay_handle is not None:
+        bpy.types.SpaceNodeEditor.draw_handler_remove(_overlay_handle, 'WINDOW')
+        _overlay_handle = None
+
+class SvO3ProfileClearOperator(bpy.types.Operator):
+    '''Forget the profiling records of the Open3D nodes'''
+    bl_idname = "node.sv_o3d_profile_clear"
+    bl_label = "Clear Profiling Records"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        profiling.clear()
+        return {'FINISHED'}
+
+class SvO3ProfileExportOperator(bpy.types.Operator):
+    '''Save the profiling records of the Open3D nodes to compare tree versions'''
+    bl_idname = "node.sv_o3d_profile_export"
+    bl_label = "Export Profiling Records"
+    bl_options = {'INTERNAL'}
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    file_format: bpy.props.EnumProperty(
+        name="Format",
+        items=[('JSON', "JSON", "List of records", 0),
+               ('CSV', "CSV", "One row per record", 1)],
+        default='JSON')
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "sv_open3d_profile"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        if self.file_format == 'JSON':
+            path = bpy.path.ensure_ext(self.filepath, '.json')
+            profiling.export_json(path)
+        else:
+            path = bpy.path.ensure_ext(self.filepath, '.csv')
+            profiling.export_csv(path)
+        self.report({'INFO'}, f"Saved {len(profiling.all_records())} records to {path}")
+        return {'FINISHED'}
+
+classes = [SvO3ProfileClearOperator, SvO3ProfileExportOperator]
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    set_overlay(False)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)